@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+"""Measure the framework's own overhead against local stand-ins.
+
+Every benchmark runs against ``tools/fake_webdriver.py`` (no browser, no Appium), so the
+numbers cover session creation, ``load_context``, locator lookup, Robot keyword
+dispatch, report parsing and screenshot diffing only. Results are written as JSON and compared to a
+stored baseline; a best-of-N time slower than ``baseline * (1 + threshold)``
+fails the run (the minimum is far less sensitive to noisy CI neighbours than
+the median, which is still reported). Cold-start cases (``COLD_START``: new
+connections, YAML read from disk) depend on the runner's page cache and
+network stack more than on our code, so they get ``--cold-threshold``.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from fake_webdriver import start_server  # noqa: E402
+from resources.libs import env_loader  # noqa: E402
+from resources.libs.appium_helper import appium_helper  # noqa: E402
+
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+DEFAULT_OUTPUT = ROOT / "reports" / "benchmarks.json"
+COLD_START = {"session_create_http", "session_create_selenium", "load_context_cold"}
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    for _ in range(warmup):
+        func()
+    samples: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1 if len(samples) > 1 else 0], 4),
+        "min_ms": round(samples[0], 4),
+    }
+
+
+def bench_session_creation(remote_url: str, iterations: int) -> Dict[str, Dict[str, float]]:
+    from selenium import webdriver
+
+    http = requests.Session()
+
+    def raw_http() -> None:
+        response = http.post(f"{remote_url}/session", json={"capabilities": {"alwaysMatch": {}}})
+        session_id = response.json()["value"]["sessionId"]
+        http.delete(f"{remote_url}/session/{session_id}")
+
+    def selenium_remote() -> None:
+        options = webdriver.ChromeOptions()
+        driver = webdriver.Remote(command_executor=remote_url, options=options)
+        driver.quit()
+
+    return {
+        "session_create_http": measure(raw_http, iterations),
+        "session_create_selenium": measure(selenium_remote, iterations),
+    }
+
+
+def bench_load_context(iterations: int) -> Dict[str, Dict[str, float]]:
+    def cold() -> None:
+        env_loader._load_yaml.cache_clear()
+        env_loader.load_context("dev", "web")
+
+    def warm() -> None:
+        env_loader.load_context("dev", "web")
+
+    return {
+        "load_context_cold": measure(cold, iterations),
+        "load_context_warm": measure(warm, iterations),
+    }
+
+
+def bench_locator_lookup(remote_url: str, iterations: int) -> Dict[str, Dict[str, float]]:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+
+    driver = webdriver.Remote(command_executor=remote_url, options=webdriver.ChromeOptions())
+    helper = appium_helper()
+    helper.driver = driver
+    try:
+        return {
+            "locator_find_element": measure(lambda: driver.find_element(By.NAME, "q"), iterations),
+            "locator_appium_helper": measure(lambda: helper.find_element("xpath=//input[@name='q']"), iterations),
+            "locator_get_text": measure(lambda: helper.get_text("tag name=button"), iterations),
+        }
+    finally:
+        driver.quit()
+
+
+def bench_keyword_dispatch(iterations: int, keywords_per_test: int = 200) -> Dict[str, Dict[str, float]]:
+    from robot.running import TestSuite
+
+    suite = TestSuite(name="Dispatch")
+    test = suite.tests.create(name="Keywords")
+    for _ in range(keywords_per_test):
+        test.body.create_keyword("No Operation")
+        test.body.create_keyword("Should Be Equal", args=["a", "a"])
+
+    def run() -> None:
+        suite.run(output=None, log=None, report=None, stdout=io.StringIO(), stderr=io.StringIO())
+
+    result = measure(run, iterations, warmup=1)
+    per_keyword = 2 * keywords_per_test
+    result["per_keyword_us"] = round(result["median_ms"] * 1000.0 / per_keyword, 3)
+    return {"robot_keyword_dispatch": result}
+
+
+def bench_report_parsing(iterations: int, tests: int = 500) -> Dict[str, Dict[str, float]]:
+    from robot.api import ExecutionResult
+    from robot.running import TestSuite
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-report-"))
+    suite = TestSuite(name="Report")
+    for index in range(tests):
+        case = suite.tests.create(name=f"Case {index}", tags=["bench", f"group{index % 10}"])
+        case.body.create_keyword("Log", args=[f"message {index}"])
+        case.body.create_keyword("Should Be True", args=[f"{index % 17} != 0"])
+    output = workdir / "output.xml"
+    suite.run(output=str(output), log=None, report=None, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def parse() -> None:
+        result = ExecutionResult(str(output))
+        _ = result.suite.statistics.failed
+
+    return {"report_parse_output_xml": {**measure(parse, iterations, warmup=1), "tests": tests}}
+
+
+def bench_visual_diff(iterations: int) -> Dict[str, Dict[str, float]]:
+    from resources.libs import visual_diff
+
+    rng = np.random.default_rng(0)
+    baseline = rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+    actual = baseline.copy()
+    actual[400:520, 600:900] = 255  # one changed widget
+    ignore = ["0,0,1920,80"]
+    return {
+        "visual_diff_pixel_fullhd": measure(lambda: visual_diff.compare(actual, baseline, ignore=ignore), iterations),
+        "visual_diff_perceptual_fullhd": measure(
+            lambda: visual_diff.compare(actual, baseline, mode="perceptual", ignore=ignore), iterations
+        ),
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    threshold: float,
+    min_delta_ms: float = 0.1,
+    metric: str = "min_ms",
+    cold_threshold: float | None = None,
+) -> List[str]:
+    regressions: List[str] = []
+    for name, stats in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference or metric not in reference:
+            continue
+        ratio = stats[metric] / reference[metric] if reference[metric] else 1.0
+        stats[f"baseline_{metric}"] = reference[metric]
+        stats["ratio"] = round(ratio, 3)
+        allowed = cold_threshold if name in COLD_START and cold_threshold is not None else threshold
+        # Sub-microsecond jitter on tiny benchmarks is not a regression.
+        if ratio > 1.0 + allowed and stats[metric] - reference[metric] > min_delta_ms:
+            regressions.append(f"{name}: {reference[metric]:.3f}ms -> {stats[metric]:.3f}ms (x{ratio:.2f}, {metric})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark framework overhead against a fake WebDriver")
+    parser.add_argument("--iterations", "-n", type=int, default=50)
+    parser.add_argument("--output", "-o", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", "-b", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.5, help="Allowed median slowdown (0.5 = 50%%)")
+    parser.add_argument("--cold-threshold", type=float, default=1.5, help="Allowed slowdown for cold-start cases (session creation, cold load_context)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.1, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--metric", choices=["min_ms", "median_ms", "p95_ms"], default="min_ms", help="Statistic compared to the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--only", action="append", help="Run only benchmarks whose group matches (session, context, locator, keyword, report, visual)")
+    args = parser.parse_args()
+
+    server = start_server()
+    remote_url = server.url
+
+    groups = {
+        "session": lambda: bench_session_creation(remote_url, args.iterations),
+        "context": lambda: bench_load_context(args.iterations),
+        "locator": lambda: bench_locator_lookup(remote_url, args.iterations),
+        "keyword": lambda: bench_keyword_dispatch(max(args.iterations // 10, 3)),
+        "report": lambda: bench_report_parsing(max(args.iterations // 10, 3)),
+        "visual": lambda: bench_visual_diff(max(args.iterations // 5, 5)),
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        for group, run in groups.items():
+            if args.only and group not in args.only:
+                continue
+            print(f"⏱  {group}...")
+            results.update(run())
+    finally:
+        server.stop()
+
+    payload = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    regressions: List[str] = []
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"📌 Baseline updated: {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms, args.metric, args.cold_threshold)
+
+    payload["regressions"] = regressions
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+    for name, stats in results.items():
+        ratio = f"  x{stats['ratio']:.2f}" if "ratio" in stats else ""
+        print(f"  {name:<28} median {stats['median_ms']:>9.3f} ms  p95 {stats['p95_ms']:>9.3f} ms{ratio}")
+    print(f"📊 Results: {args.output}")
+
+    if regressions:
+        print("\n❌ Performance regressions:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
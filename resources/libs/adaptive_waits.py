@@ -0,0 +1,177 @@
+"""Per-locator wait times learned from earlier runs.
+
+Fixed ``${IMPLICIT_WAIT}``/``${EXPLICIT_TIMEOUT}`` values make every negative
+lookup pay the full implicit wait and let a broken page hang for the whole
+explicit timeout. This listener instead:
+
+* records, for every SeleniumLibrary wait / interaction keyword, the
+  resolved locator and how long it took (``waits.json`` in the output dir;
+  ``run_tests.py`` loads the listener with ``--record-waits`` or
+  ``--adaptive-waits``);
+* with ``E2E_ADAPTIVE_WAITS=1`` (``run_tests.py --adaptive-waits``) applies
+  the learned per-locator timeouts from ``config/learned_timeouts.yaml``:
+  wait keywords get a tight timeout, and interaction keywords first wait
+  explicitly for their element, since ``build_context`` turns implicit
+  waits off in that mode. Assertions (``Element Should Be Visible``,
+  ``Page Should Contain Element``) are left alone: they check at once, so
+  negative checks such as ``Run Keyword And Return Status`` stay instant.
+
+``tools/adaptive_timeouts.py`` turns the recorded runs into recommendations
+(p99 appearance time per platform/locator) and writes the YAML.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import statistics
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+LEARNED_FILE = BASE_DIR / "config" / "learned_timeouts.yaml"
+
+WAIT_KEYWORDS = {
+    "wait until element is visible",
+    "wait until element is enabled",
+    "wait until page contains element",
+    "wait until element contains",
+}
+INTERACTION_KEYWORDS = {
+    "click element",
+    "click button",
+    "click link",
+    "input text",
+    "input password",
+    "get text",
+}
+
+
+def adaptive_enabled() -> bool:
+    return os.getenv("E2E_ADAPTIVE_WAITS", "").lower() in ("1", "true", "yes")
+
+
+def load_learned(path: Path = LEARNED_FILE) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        return yaml.safe_load(handle) or {}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def recommend(
+    samples: Dict[str, Dict[str, List[float]]],
+    factor: float = 1.5,
+    padding: float = 0.5,
+    minimum: float = 1.0,
+    maximum: float = 30.0,
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """``{platform: {locator: [seconds...]}}`` -> ``{platform: {locator: {p50, p99, samples, timeout}}}``."""
+    learned: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for platform, locators in samples.items():
+        for locator, values in locators.items():
+            p99 = percentile(values, 99)
+            timeout = min(maximum, max(minimum, p99 * factor + padding))
+            learned.setdefault(platform, {})[locator] = {
+                "samples": len(values),
+                "p50": round(statistics.median(values), 3),
+                "p99": round(p99, 3),
+                "timeout": round(timeout, 1),
+            }
+    return learned
+
+
+def collect_samples(reports_dir: Path, last_runs: int = 30) -> Dict[str, Dict[str, List[float]]]:
+    """Passing wait/interaction durations per platform and locator from the newest ``waits.json`` files."""
+    files = sorted(reports_dir.glob("**/waits.json"), key=lambda path: path.stat().st_mtime)[-last_runs:]
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for path in files:
+        try:
+            run = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        for record in run.get("waits", []):
+            if record.get("status") == "PASS" and record.get("locator"):
+                samples.setdefault(record.get("platform") or "unknown", {}).setdefault(record["locator"], []).append(
+                    record["seconds"]
+                )
+    return samples
+
+
+class adaptive_waits:
+    """Robot Framework listener (API v2) recording and applying per-locator waits."""
+
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self, apply: str | None = None):
+        self.apply = adaptive_enabled() if apply is None else apply.lower() in ("1", "true", "yes", "apply")
+        self.learned = load_learned() if self.apply else {}
+        self.records: List[Dict[str, Any]] = []
+        self.output_dir: Path | None = None
+        self._restore: List[Any] = []
+
+    def start_suite(self, name, attrs):
+        if self.output_dir is None:
+            from robot.libraries.BuiltIn import BuiltIn
+
+            self.output_dir = Path(BuiltIn().get_variable_value("${OUTPUT DIR}"))
+
+    def start_keyword(self, name, attrs):
+        keyword = attrs["kwname"].lower()
+        if attrs["libname"] != "SeleniumLibrary" or not attrs["args"]:
+            return
+        if keyword not in WAIT_KEYWORDS and keyword not in INTERACTION_KEYWORDS:
+            return
+        if not self.apply:
+            self._restore.append(None)
+            return
+        from robot.libraries.BuiltIn import BuiltIn
+
+        builtin = BuiltIn()
+        selenium = builtin.get_library_instance("SeleniumLibrary")
+        locator = builtin.replace_variables(attrs["args"][0])
+        learned = self.learned.get(builtin.get_variable_value("${PLATFORM}") or "", {}).get(locator)
+        if keyword in WAIT_KEYWORDS:
+            # Keywords called without timeout= use the library default; narrow it for this call only.
+            self._restore.append(selenium.set_selenium_timeout(learned["timeout"]) if learned else None)
+        else:
+            self._restore.append(None)
+            timeout = learned["timeout"] if learned else selenium.timeout
+            try:
+                selenium.wait_until_page_contains_element(locator, timeout=timeout)
+            except Exception:  # noqa: BLE001 - the keyword itself reports the missing element
+                pass
+
+    def end_keyword(self, name, attrs):
+        keyword = attrs["kwname"].lower()
+        if attrs["libname"] != "SeleniumLibrary" or not attrs["args"]:
+            return
+        if keyword not in WAIT_KEYWORDS and keyword not in INTERACTION_KEYWORDS:
+            return
+        from robot.libraries.BuiltIn import BuiltIn
+
+        builtin = BuiltIn()
+        previous = self._restore.pop() if self._restore else None
+        if previous is not None:
+            builtin.get_library_instance("SeleniumLibrary").set_selenium_timeout(previous)
+        self.records.append(
+            {
+                "platform": builtin.get_variable_value("${PLATFORM}"),
+                "keyword": attrs["kwname"],
+                "locator": builtin.replace_variables(attrs["args"][0]),
+                "seconds": attrs["elapsedtime"] / 1000.0,
+                "status": attrs["status"],
+            }
+        )
+
+    def close(self):
+        if self.output_dir is not None and self.records:
+            payload = {"adaptive": self.apply, "waits": self.records}
+            (self.output_dir / "waits.json").write_text(json.dumps(payload, indent=1, ensure_ascii=False), encoding="utf-8")
@@ -1,5 +1,6 @@
 from appium import webdriver
 from appium.options.mac import Mac2Options
+from robot.api import logger
 from robot.libraries.BuiltIn import BuiltIn
 
 
@@ -13,11 +14,7 @@ class appium_helper:
     
     def create_mac_session(self, remote_url, capabilities):
         """Create an Appium session for Mac automation."""
-        # Debug output
-        print(f"DEBUG: Creating Mac session")
-        print(f"DEBUG: Remote URL: {remote_url}")
-        print(f"DEBUG: Capabilities type: {type(capabilities)}")
-        print(f"DEBUG: Capabilities: {capabilities}")
+        logger.debug(f"Creating Mac session at {remote_url} with {type(capabilities).__name__} capabilities: {capabilities}")
         
         options = Mac2Options()
         
@@ -38,7 +35,7 @@ class appium_helper:
                 else:
                     options.set_capability(key, value)
         
-        print(f"DEBUG: Final capabilities: {options.to_capabilities()}")
+        logger.debug(f"Final capabilities: {options.to_capabilities()}")
         
         self.driver = webdriver.Remote(remote_url, options=options)
         
@@ -0,0 +1,219 @@
+"""Asyncio facade over the W3C WebDriver wire protocol.
+
+The blocking Selenium/Appium clients need a thread per session. For smoke
+checks over large URL or app matrices this module drives many independent
+sessions from one event loop instead, using the endpoint and capabilities that
+``env_loader.load_context`` resolves for the selected environment/platform::
+
+    context = load_context("dev", "web")
+
+    async def check(session):
+        await session.get("https://example.com")
+        return await session.title()
+
+    results = asyncio.run(run_sessions(context, [check] * 50, concurrency=10))
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+import aiohttp
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# Capabilities defined by the W3C spec; everything else needs a vendor prefix.
+W3C_CAPABILITIES = {
+    "acceptInsecureCerts",
+    "browserName",
+    "browserVersion",
+    "pageLoadStrategy",
+    "platformName",
+    "proxy",
+    "setWindowRect",
+    "strictFileInteractability",
+    "timeouts",
+    "unhandledPromptBehavior",
+    "webSocketUrl",
+}
+
+
+class WebDriverError(Exception):
+    def __init__(self, status: int, error: str, message: str) -> None:
+        super().__init__(f"{error}: {message}")
+        self.status = status
+        self.error = error
+
+
+def w3c_capabilities(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a new-session payload; non-web platforms get ``appium:`` prefixes like AppiumOptions does.
+
+    The unprefixed ``desiredCapabilities`` ride along for JSON Wire Protocol
+    servers (WinAppDriver), which ignore the W3C ``capabilities`` block.
+    """
+    desired = dict(context.get("capabilities", {}))
+    caps = dict(desired)
+    if context.get("platform", "web") != "web":
+        caps = {
+            key if key in W3C_CAPABILITIES or ":" in key else f"appium:{key}": value
+            for key, value in caps.items()
+        }
+    return {"capabilities": {"alwaysMatch": caps, "firstMatch": [{}]}, "desiredCapabilities": desired}
+
+
+class AsyncSession:
+    """One remote session. Element references are plain element-id strings."""
+
+    def __init__(self, http: aiohttp.ClientSession, remote_url: str, session_id: str, capabilities: Dict[str, Any]):
+        self.http = http
+        self.remote_url = remote_url.rstrip("/")
+        self.session_id = session_id
+        self.capabilities = capabilities
+
+    @classmethod
+    async def create(
+        cls, http: aiohttp.ClientSession, remote_url: str, payload: Dict[str, Any]
+    ) -> "AsyncSession":
+        value = await _request(http, "POST", f"{remote_url.rstrip('/')}/session", payload)
+        return cls(http, remote_url, value["sessionId"], value.get("capabilities", {}))
+
+    async def command(self, method: str, path: str, payload: Dict[str, Any] | None = None) -> Any:
+        return await _request(self.http, method, f"{self.remote_url}/session/{self.session_id}{path}", payload)
+
+    async def get(self, url: str) -> None:
+        await self.command("POST", "/url", {"url": url})
+
+    async def current_url(self) -> str:
+        return await self.command("GET", "/url")
+
+    async def title(self) -> str:
+        return await self.command("GET", "/title")
+
+    async def page_source(self) -> str:
+        return await self.command("GET", "/source")
+
+    async def set_timeouts(self, implicit: float = 0, page_load: float | None = None) -> None:
+        payload: Dict[str, Any] = {"implicit": int(implicit * 1000)}
+        if page_load is not None:
+            payload["pageLoad"] = int(page_load * 1000)
+        await self.command("POST", "/timeouts", payload)
+
+    async def find(self, using: str, value: str) -> str:
+        found = await self.command("POST", "/element", {"using": using, "value": value})
+        return found[ELEMENT_KEY]
+
+    async def find_all(self, using: str, value: str) -> List[str]:
+        found = await self.command("POST", "/elements", {"using": using, "value": value})
+        return [item[ELEMENT_KEY] for item in found]
+
+    async def click(self, element_id: str) -> None:
+        await self.command("POST", f"/element/{element_id}/click", {})
+
+    async def send_keys(self, element_id: str, text: str) -> None:
+        await self.command("POST", f"/element/{element_id}/value", {"text": text, "value": list(text)})
+
+    async def text(self, element_id: str) -> str:
+        return await self.command("GET", f"/element/{element_id}/text")
+
+    async def attribute(self, element_id: str, name: str) -> Any:
+        return await self.command("GET", f"/element/{element_id}/attribute/{name}")
+
+    async def execute(self, script: str, *args: Any) -> Any:
+        return await self.command("POST", "/execute/sync", {"script": script, "args": list(args)})
+
+    async def quit(self) -> None:
+        await self.command("DELETE", "")
+
+
+@dataclass
+class SessionResult:
+    index: int
+    ok: bool
+    value: Any = None
+    error: str | None = None
+    session_id: str | None = None
+    session_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+
+Job = Callable[[AsyncSession], Awaitable[Any]]
+
+
+async def run_sessions(
+    context: Dict[str, Any],
+    jobs: Sequence[Job],
+    concurrency: int = 10,
+    session_timeout: float = 120.0,
+    quit_timeout: float = 15.0,
+    create_timeout: float = 60.0,
+) -> List[SessionResult]:
+    """Run each job in its own session, at most ``concurrency`` sessions at a time.
+
+    ``create_timeout`` bounds session creation and ``session_timeout`` the job.
+    An overrunning job is cancelled and its session is still deleted so grid
+    slots are returned; so is a session whose creation answered after
+    ``create_timeout`` (given ``quit_timeout`` more to arrive).
+    """
+    remote_url = context["remote_url"]
+    payload = w3c_capabilities(context)
+    timeouts = context.get("timeouts", {})
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency * 2)
+
+    async with aiohttp.ClientSession(connector=connector) as http:
+
+        async def run_one(index: int, job: Job) -> SessionResult:
+            async with semaphore:
+                started = time.perf_counter()
+                result = SessionResult(index=index, ok=False)
+                session: AsyncSession | None = None
+                creating = asyncio.ensure_future(AsyncSession.create(http, remote_url, payload))
+
+                async def body(session: AsyncSession) -> Any:
+                    if "implicit" in timeouts or "page_load" in timeouts:
+                        await session.set_timeouts(0, timeouts.get("page_load"))
+                    return await job(session)
+
+                try:
+                    # shield: a timed-out POST keeps running so the session it creates can be deleted
+                    session = await asyncio.wait_for(asyncio.shield(creating), timeout=create_timeout)
+                    result.session_id = session.session_id
+                    result.session_seconds = time.perf_counter() - started
+                    result.value = await asyncio.wait_for(body(session), timeout=session_timeout)
+                    result.ok = True
+                except asyncio.TimeoutError:
+                    limit = session_timeout if session is not None else create_timeout
+                    result.error = f"{'job' if session is not None else 'session creation'} timed out after {limit}s"
+                except Exception as exc:  # noqa: BLE001 - reported per session
+                    result.error = f"{type(exc).__name__}: {exc}"
+                finally:
+                    if session is None:
+                        try:
+                            session = await asyncio.wait_for(creating, timeout=quit_timeout)
+                            result.session_id = session.session_id
+                        except Exception:  # noqa: BLE001 - creation failed or never answered
+                            pass
+                    if session is not None:
+                        try:
+                            await asyncio.wait_for(session.quit(), timeout=quit_timeout)
+                        except Exception:  # noqa: BLE001 - best effort cleanup
+                            pass
+                    result.total_seconds = time.perf_counter() - started
+                return result
+
+        return list(await asyncio.gather(*(run_one(index, job) for index, job in enumerate(jobs))))
+
+
+async def _request(http: aiohttp.ClientSession, method: str, url: str, payload: Dict[str, Any] | None) -> Any:
+    async with http.request(method, url, json=payload) as response:
+        data = await response.json(content_type=None)
+    value = (data or {}).get("value")
+    if response.status >= 400:
+        details = value if isinstance(value, dict) else {}
+        raise WebDriverError(response.status, details.get("error", "unknown error"), details.get("message", str(value)))
+    if isinstance(data, dict) and "sessionId" in data and isinstance(value, dict) and "sessionId" not in value:
+        # JSON Wire Protocol servers (older WinAppDriver) put the id next to value.
+        value = {**value, "sessionId": data["sessionId"]}
+    return value
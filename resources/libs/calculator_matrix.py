@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import csv
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+import yaml
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_TABLE = ROOT / "resources" / "data" / "calculator_operations.csv"
+
+OPERATORS = ("+", "-", "*", "/")
+
+# Button names per platform. Mac2 exposes buttons by their `title`,
+# WinAppDriver by their accessible `Name`.
+KEYMAPS: Dict[str, Dict[str, str]] = {
+    "mac": {
+        **{str(digit): str(digit) for digit in range(10)},
+        "+": "+",
+        "-": "−",
+        "*": "×",
+        "/": "÷",
+        ".": ".",
+        "neg": "±",
+        "=": "=",
+        "clear": "AC",
+    },
+    "windows": {
+        "0": "Zero",
+        "1": "One",
+        "2": "Two",
+        "3": "Three",
+        "4": "Four",
+        "5": "Five",
+        "6": "Six",
+        "7": "Seven",
+        "8": "Eight",
+        "9": "Nine",
+        "+": "Plus",
+        "-": "Minus",
+        "*": "Multiply by",
+        "/": "Divide by",
+        ".": "Decimal separator",
+        "neg": "Positive negative",
+        "=": "Equals",
+        "clear": "Clear",
+    },
+}
+
+# decimal separator, grouping separator
+LOCALES: Dict[str, tuple[str, str]] = {
+    "en_US": (".", ","),
+    "zh_TW": (".", ","),
+    "de_DE": (",", "."),
+    "fr_FR": (",", " "),
+}
+
+# Calculators show at most this many significant digits.
+DISPLAY_DIGITS = {"mac": 16, "windows": 16}
+
+_DISPLAY_NOISE = re.compile(r"[^0-9eE+\-−.,  ]")
+
+
+@dataclass
+class OperationTable:
+    lhs: np.ndarray
+    op: np.ndarray
+    rhs: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.lhs)
+
+
+@dataclass
+class MatrixResult:
+    table: OperationTable
+    expected: np.ndarray
+    observed: np.ndarray
+    durations: np.ndarray
+    displays: List[str] = field(default_factory=list)
+    platform: str = "mac"
+    locale: str = "en_US"
+    rtol: float = 1e-8
+
+    @property
+    def passed(self) -> np.ndarray:
+        both_nan = np.isnan(self.expected) & np.isnan(self.observed)
+        return both_nan | np.isclose(self.observed, self.expected, rtol=self.rtol, atol=1e-9)
+
+    def failures(self) -> List[Dict[str, Any]]:
+        indices = np.flatnonzero(~self.passed)
+        rendered = format_expected(self.expected[indices], self.locale, self.platform)
+        return [
+            {
+                "case": int(index),
+                "expression": _expression(self.table, index),
+                "expected": text,
+                "display": self.displays[index] if self.displays else None,
+            }
+            for index, text in zip(indices, rendered)
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        ms = self.durations * 1000.0
+        total = float(self.durations.sum())
+        return {
+            "cases": len(self.table),
+            "passed": int(self.passed.sum()),
+            "failed": int((~self.passed).sum()),
+            "total_seconds": round(total, 3),
+            "cases_per_second": round(len(self.table) / total, 2) if total else None,
+            "case_ms": {
+                "p50": round(float(np.percentile(ms, 50)), 2) if len(ms) else None,
+                "p95": round(float(np.percentile(ms, 95)), 2) if len(ms) else None,
+                "max": round(float(ms.max()), 2) if len(ms) else None,
+            },
+        }
+
+    def write_json(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "summary": self.summary(),
+            "failures": self.failures(),
+            "durations_ms": np.round(self.durations * 1000.0, 3).tolist(),
+        }
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        return path
+
+
+def load_operations(path: str | Path = DEFAULT_TABLE) -> OperationTable:
+    """Read an operation table from CSV (lhs,op,rhs) or YAML.
+
+    YAML files either list ``cases`` explicitly or describe a ``generate``
+    block (``lhs``/``rhs`` integer ranges, ``ops``, ``count``, ``seed``) that is
+    expanded with NumPy, which is how thousand-case runs are declared.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Missing operation table: {path}")
+    if path.suffix.lower() == ".csv":
+        with path.open("r", encoding="utf-8", newline="") as handle:
+            rows = [row for row in csv.DictReader(handle) if row.get("lhs", "").strip()]
+        return _table(
+            [row["lhs"] for row in rows],
+            [row["op"].strip() for row in rows],
+            [row["rhs"] for row in rows],
+        )
+
+    with path.open("r", encoding="utf-8") as handle:
+        data = yaml.safe_load(handle) or {}
+    cases = data.get("cases", [])
+    table = _table([c["lhs"] for c in cases], [str(c["op"]) for c in cases], [c["rhs"] for c in cases])
+    spec = data.get("generate")
+    if spec:
+        table = _concat(table, _generate(spec))
+    return table
+
+
+def compute_expected(table: OperationTable) -> np.ndarray:
+    """Evaluate every row at once. Division by zero yields NaN."""
+    lhs, rhs, op = table.lhs, table.rhs, table.op
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quotient = np.where(rhs != 0, lhs / np.where(rhs == 0, 1.0, rhs), np.nan)
+    return np.select(
+        [op == "+", op == "-", op == "*", op == "/"],
+        [lhs + rhs, lhs - rhs, lhs * rhs, quotient],
+        default=np.nan,
+    )
+
+
+def format_expected(values: np.ndarray, locale: str = "en_US", platform: str = "mac") -> np.ndarray:
+    """Render values the way the calculator display shows them.
+
+    Rounding and the integral check are vectorized; the text itself is built
+    per value. NumPy has no locale-grouped number formatting, and the
+    ``np.char`` equivalent (``np.char.mod`` + ``partition`` + ``replace``)
+    measured ~35% slower than this loop for 6000 values: ``np.char`` calls
+    the same ``str`` methods element by element. At ~2 µs per value this is
+    noise next to the clicks a case costs.
+    """
+    decimal_sep, group_sep = LOCALES[locale]
+    digits = DISPLAY_DIGITS.get(platform, 16)
+    finite = np.isfinite(values)
+    safe = np.where(finite, values, 0.0)
+
+    magnitude = np.floor(np.log10(np.abs(np.where(safe == 0, 1.0, safe)))).astype(int)
+    decimals = np.clip(digits - 1 - magnitude, 0, digits)
+    rounded = np.round(safe, 0)
+    integral = np.abs(safe - rounded) < 10.0 ** -np.minimum(decimals, 12)
+
+    out = np.empty(values.shape, dtype=object)
+    for index in range(values.size):
+        if not finite[index]:
+            out[index] = "Not a number"
+            continue
+        if integral[index]:
+            text = f"{int(rounded[index]):,}"
+        else:
+            text = f"{safe[index]:,.{int(decimals[index])}f}".rstrip("0").rstrip(".")
+        out[index] = text.replace(",", "\x00").replace(".", decimal_sep).replace("\x00", group_sep)
+    return out
+
+
+def parse_display(texts: Sequence[str], locale: str = "en_US") -> np.ndarray:
+    """Convert raw display strings back to floats (NaN when unreadable).
+
+    Per row for the same reason as :func:`format_expected`: ``float()`` of a
+    cleaned string is the fastest parser available, and an unreadable
+    display must only lose its own row.
+    """
+    decimal_sep, group_sep = LOCALES[locale]
+    values = np.full(len(texts), np.nan)
+    for index, raw in enumerate(texts):
+        cleaned = _DISPLAY_NOISE.sub("", raw or "").strip().replace("−", "-")
+        cleaned = cleaned.replace(group_sep, "").replace(" ", "").replace(decimal_sep, ".")
+        try:
+            values[index] = float(cleaned)
+        except ValueError:
+            continue
+    return values
+
+
+def key_sequence(lhs: float, op: str, rhs: float, platform: str) -> List[str]:
+    keymap = KEYMAPS[platform]
+    return [
+        *_number_keys(lhs, keymap),
+        keymap[op],
+        *_number_keys(rhs, keymap),
+        keymap["="],
+    ]
+
+
+def run_matrix(
+    table: OperationTable,
+    press: Callable[[str], None],
+    read_display: Callable[[], str],
+    platform: str,
+    locale: str = "en_US",
+    reset: Callable[[], None] | None = None,
+) -> MatrixResult:
+    """Drive every case through one already-open calculator session.
+
+    ``press`` receives a button name from :data:`KEYMAPS`; callers are expected
+    to cache element lookups so that a warm session costs one click per key.
+    """
+    keymap = KEYMAPS[platform]
+    reset = reset or (lambda: press(keymap["clear"]))
+    expected = compute_expected(table)
+    durations = np.zeros(len(table))
+    displays: List[str] = []
+
+    for index in range(len(table)):
+        started = time.perf_counter()
+        reset()
+        for key in key_sequence(table.lhs[index], table.op[index], table.rhs[index], platform):
+            press(key)
+        displays.append(read_display())
+        durations[index] = time.perf_counter() - started
+
+    return MatrixResult(
+        table=table,
+        expected=expected,
+        observed=parse_display(displays, locale),
+        durations=durations,
+        displays=displays,
+        platform=platform,
+        locale=locale,
+    )
+
+
+def _number_keys(value: float, keymap: Dict[str, str]) -> List[str]:
+    text = np.format_float_positional(abs(float(value)), trim="-")
+    keys = [keymap[char] for char in text]
+    if value < 0:
+        keys.append(keymap["neg"])
+    return keys
+
+
+def _table(lhs: Sequence[Any], op: Sequence[str], rhs: Sequence[Any]) -> OperationTable:
+    ops = np.array([_normalize_op(item) for item in op], dtype="<U1")
+    return OperationTable(
+        lhs=np.asarray(lhs, dtype=np.float64),
+        op=ops,
+        rhs=np.asarray(rhs, dtype=np.float64),
+    )
+
+
+def _concat(left: OperationTable, right: OperationTable) -> OperationTable:
+    return OperationTable(
+        lhs=np.concatenate([left.lhs, right.lhs]),
+        op=np.concatenate([left.op, right.op]),
+        rhs=np.concatenate([left.rhs, right.rhs]),
+    )
+
+
+def _generate(spec: Dict[str, Any]) -> OperationTable:
+    rng = np.random.default_rng(spec.get("seed", 0))
+    count = int(spec.get("count", 100))
+    lhs_low, lhs_high = spec.get("lhs", [0, 99])
+    rhs_low, rhs_high = spec.get("rhs", [0, 99])
+    ops = np.array([_normalize_op(item) for item in spec.get("ops", OPERATORS)], dtype="<U1")
+    return OperationTable(
+        lhs=rng.integers(lhs_low, lhs_high, endpoint=True, size=count).astype(np.float64),
+        op=rng.choice(ops, size=count),
+        rhs=rng.integers(rhs_low, rhs_high, endpoint=True, size=count).astype(np.float64),
+    )
+
+
+def _normalize_op(op: str) -> str:
+    aliases = {"×": "*", "x": "*", "÷": "/", "−": "-"}
+    op = aliases.get(op.strip(), op.strip())
+    if op not in OPERATORS:
+        raise ValueError(f"Unsupported operator '{op}'")
+    return op
+
+
+def _expression(table: OperationTable, index: int) -> str:
+    return f"{table.lhs[index]:g} {table.op[index]} {table.rhs[index]:g}"
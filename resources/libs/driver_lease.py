@@ -0,0 +1,92 @@
+"""Client side of ``tools/driver_daemon.py``.
+
+When ``E2E_DRIVER_DAEMON`` (e.g. ``http://127.0.0.1:4799``) is set, the
+desktop fixtures in ``tests/python/conftest.py`` lease a warm session instead
+of cold-launching the app, and hand it back (the daemon resets the app)
+instead of quitting it. While held, a background thread renews the lease so
+the daemon never reclaims it from a long-running worker. Without the
+variable, or when the daemon does not answer, ``acquire`` returns ``None``
+and callers create their own session.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+import requests
+
+DAEMON_ENV = "E2E_DRIVER_DAEMON"
+
+
+@dataclass
+class Lease:
+    lease: str
+    session_id: str
+    remote_url: str
+    platform: str
+    capabilities: Dict[str, Any] = field(default_factory=dict)
+    renew_every: float = 0.0
+    released: threading.Event = field(default_factory=threading.Event, repr=False)
+
+
+def daemon_url() -> str | None:
+    url = os.getenv(DAEMON_ENV, "").strip()
+    return url.rstrip("/") or None
+
+
+def acquire(platform: str, timeout: float = 120) -> Lease | None:
+    url = daemon_url()
+    if url is None:
+        return None
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        response = requests.post(
+            f"{url}/lease", json={"platform": platform, "timeout": timeout, "owner": owner}, timeout=timeout + 10
+        )
+    except requests.ConnectionError:
+        return None
+    if response.status_code == 404:
+        return None  # daemon runs without a pool for this platform
+    response.raise_for_status()
+    data = response.json()
+    lease = Lease(
+        data["lease"], data["session_id"], data["remote_url"], data["platform"],
+        data.get("capabilities", {}), float(data.get("renew_every", 0)),
+    )
+    if lease.renew_every > 0:
+        threading.Thread(target=_keep_renewed, args=(url, lease), daemon=True).start()
+    return lease
+
+
+def _keep_renewed(url: str, lease: Lease) -> None:
+    while not lease.released.wait(lease.renew_every):
+        try:
+            response = requests.post(f"{url}/renew", json={"lease": lease.lease}, timeout=10)
+        except requests.RequestException:
+            continue  # daemon briefly unreachable; the next beat is still within max_lease
+        if response.status_code == 404:
+            return  # daemon restarted or already reclaimed the lease
+
+
+def release(lease: Lease) -> None:
+    lease.released.set()
+    url = daemon_url()
+    if url is not None:
+        requests.post(f"{url}/release", json={"lease": lease.lease}, timeout=10)
+
+
+def attach_appium(lease: Lease):
+    """Appium ``webdriver.Remote`` bound to the leased session (no new session is created)."""
+    from appium import webdriver
+    from appium.options.common import AppiumOptions
+
+    class LeasedRemote(webdriver.Remote):
+        def start_session(self, capabilities, browser_profile=None):
+            self.session_id = lease.session_id
+            self.caps = lease.capabilities
+
+    options = AppiumOptions().load_capabilities(lease.capabilities)
+    return LeasedRemote(lease.remote_url, options=options, direct_connection=False)
@@ -0,0 +1,93 @@
+"""Read text, attributes, visibility and geometry of many elements at once.
+
+``find_elements`` followed by ``.text`` / ``get_attribute`` / ``is_displayed``
+on each match costs one grid round trip per element and property. Here a
+single ``execute_script`` resolves the locator in the page and returns one
+compact row per match::
+
+    records = query_elements(driver, "h3", attributes=["href"])
+    assert records and records[0].visible
+    titles = [record.text for record in records]
+
+Robot: ``Query Elements    css:h3    attributes=href`` returns the same
+records as dictionaries.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Marker used by tools/fake_webdriver.py to recognise the query.
+SCRIPT_MARKER = "e2e:query-elements"
+
+QUERY_SCRIPT = """/* %s */
+const [strategy, selector, attributes, limit] = arguments;
+let nodes;
+if (strategy === "xpath") {
+  const snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  nodes = Array.from({length: snapshot.snapshotLength}, (_, i) => snapshot.snapshotItem(i));
+} else {
+  nodes = Array.from(document.querySelectorAll(selector));
+}
+if (limit > 0) nodes = nodes.slice(0, limit);
+return nodes.map((node) => {
+  const rect = node.getBoundingClientRect();
+  const style = window.getComputedStyle(node);
+  const visible = rect.width > 0 && rect.height > 0 && style.visibility !== "hidden"
+    && style.display !== "none" && Number(style.opacity) !== 0;
+  const text = (visible ? node.innerText : node.textContent) || "";
+  return [node.tagName.toLowerCase(), text.trim(), visible,
+          Math.round(rect.x), Math.round(rect.y), Math.round(rect.width), Math.round(rect.height),
+          attributes.map((name) => node.getAttribute(name))];
+});
+""" % SCRIPT_MARKER
+
+
+@dataclass
+class ElementRecord:
+    tag: str
+    text: str
+    visible: bool
+    rect: Tuple[int, int, int, int]  # x, y, width, height
+    attributes: Dict[str, str | None] = field(default_factory=dict)
+
+
+def split_locator(locator: str) -> Tuple[str, str]:
+    """``css:...`` / ``xpath:...`` / ``//...`` / plain CSS -> (strategy, selector)."""
+    prefix, _, rest = locator.partition(":")
+    if rest and prefix.strip().lower() in ("css", "xpath"):
+        return prefix.strip().lower(), rest.strip()
+    if locator.startswith(("/", "(")):
+        return "xpath", locator
+    return "css", locator
+
+
+def query_elements(driver, locator: str, attributes: Sequence[str] = (), limit: int = 0) -> List[ElementRecord]:
+    """Every match of ``locator`` (up to ``limit``; 0 = all) in one ``execute_script`` call."""
+    strategy, selector = split_locator(locator)
+    rows = driver.execute_script(QUERY_SCRIPT, strategy, selector, list(attributes), limit) or []
+    return [
+        ElementRecord(tag, text, bool(visible), (x, y, width, height), dict(zip(attributes, values)))
+        for tag, text, visible, x, y, width, height, values in rows
+    ]
+
+
+class element_query:
+    """Robot library: bulk element queries on the current SeleniumLibrary browser."""
+
+    ROBOT_LIBRARY_SCOPE = "GLOBAL"
+
+    def query_elements(self, locator: str, attributes: Any = "", limit: int = 0) -> List[Dict[str, Any]]:
+        """Text, ``attributes`` (comma separated or list), visibility and rect of every match.
+
+        Example: ``${rows}=    Query Elements    css:h3    attributes=href,title    limit=10``
+        """
+        from robot.libraries.BuiltIn import BuiltIn
+
+        names = [name.strip() for name in attributes.split(",") if name.strip()] if isinstance(attributes, str) else list(attributes)
+        driver = BuiltIn().get_library_instance("SeleniumLibrary").driver
+        return [asdict(record) for record in query_elements(driver, locator, names, int(limit))]
+
+    def visible_texts(self, locator: str, limit: int = 0) -> List[str]:
+        """Texts of the visible matches, in document order."""
+        return [row["text"] for row in self.query_elements(locator, limit=limit) if row["visible"]]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 import json
 import os
 import re
@@ -9,11 +10,12 @@ from typing import Any, Dict
 
 import yaml
 from dotenv import load_dotenv
-from robot.libraries.BuiltIn import BuiltIn
+from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
 
 ROOT = Path(__file__).resolve().parents[2]
 ENV_DIR = ROOT / "config" / "environments"
 DRIVER_DIR = ROOT / "config" / "drivers"
+PROFILE_DIR = DRIVER_DIR / "profiles"
 
 load_dotenv(ROOT / ".env", override=False)
 
@@ -49,40 +51,146 @@ def _expand_env(node: Any) -> Any:
     return node
 
 
+def read_config(path: Path | str) -> Dict[str, Any]:
+    """Any YAML under config/ with ``${ENV:NAME:-default}`` tokens resolved (not cached)."""
+    path = Path(path)
+    if not path.is_absolute():
+        path = ROOT / path
+    if not path.exists():
+        raise FileNotFoundError(f"Missing config: {path}")
+    with path.open("r", encoding="utf-8") as handle:
+        return _expand_env(yaml.safe_load(handle) or {})
+
+
 def load_context(environment: str = "dev", platform: str = "web", user_role: str | None = None) -> Dict[str, Any]:
+    context = build_context(environment, platform, user_role)
+    _set_robot_globals(context)
+    return context
+
+
+def build_context(environment: str = "dev", platform: str = "web", user_role: str | None = None) -> Dict[str, Any]:
+    """Resolve the context without touching Robot variables (safe from any thread)."""
     env_cfg = _load_yaml(ENV_DIR / f"{environment}.yaml")
+    # The parsed YAML is cached and shared between contexts: never mutate it.
     driver_cfg = _load_yaml(DRIVER_DIR / f"{platform}.yaml")
 
-    remote_overrides = env_cfg.get("remote_endpoints", {})
-    if platform in remote_overrides:
-        driver_cfg["remote_url"] = remote_overrides[platform]
+    remote_url = env_cfg.get("remote_endpoints", {}).get(platform, driver_cfg.get("remote_url"))
 
     merged_timeouts = {**env_cfg.get("timeouts", {}), **driver_cfg.get("timeouts", {})}
+    if os.getenv("E2E_ADAPTIVE_WAITS", "").lower() in ("1", "true", "yes"):
+        # Learned per-locator explicit waits replace the implicit wait (resources/libs/adaptive_waits.py).
+        merged_timeouts["implicit"] = 0
+
+    # Optional capability profiles, e.g. E2E_DRIVER_PROFILES=tracing. They live in their own
+    # file (config/drivers/profiles/<platform>.yaml) that is only parsed when profiles are requested.
+    capabilities = driver_cfg.get("capabilities", {})
+    profiles: list[str] = []
+    requested = _requested_profiles()
+    if requested and (PROFILE_DIR / f"{platform}.yaml").exists():
+        available_profiles = _load_yaml(PROFILE_DIR / f"{platform}.yaml")
+        profiles = [name for name in requested if name in available_profiles]
+        for name in profiles:
+            capabilities = _merged(capabilities, available_profiles[name].get("capabilities", {}))
 
     role = user_role or env_cfg.get("default_user_role", "standard")
-    credentials = env_cfg.get("credentials", {})
-    selected_user = credentials.get(role)
-    if not selected_user:
+    # A role may list several accounts (an account pool); the first one stands for the role.
+    credentials = {
+        name: users[0] if isinstance(users, list) else users
+        for name, users in env_cfg.get("credentials", {}).items()
+        if users
+    }
+    pool = account_pool(env_cfg, role)
+    if not pool:
         raise ValueError(f"No credentials for role '{role}' in {environment}.yaml")
+    # The account leased for this process (resources/libs/resource_leases.py), if any.
+    leased = os.getenv(leased_account_variable(role))
+    selected_user = next((user for user in pool if user.get("username") == leased), pool[0])
 
     context: Dict[str, Any] = {
         "environment": environment,
         "platform": platform,
-        "base_url": env_cfg.get("base_url"),
-        "api_base_url": env_cfg.get("api_base_url"),
-        "remote_url": driver_cfg.get("remote_url"),
+        # run_tests.py points these at record/replay stand-ins (http_fixtures in the env YAML)
+        "base_url": os.getenv("E2E_FIXTURE_BASE_URL") or env_cfg.get("base_url"),
+        "api_base_url": os.getenv("E2E_FIXTURE_API_BASE_URL") or env_cfg.get("api_base_url"),
+        "remote_url": remote_url,
         "browser": driver_cfg.get("browser", "chrome"),
-        "capabilities": driver_cfg.get("capabilities", {}),
+        "capabilities": capabilities,
         "timeouts": merged_timeouts,
+        "max_sessions": int(driver_cfg.get("max_sessions", 1)),
+        "profiles": profiles,
         "credentials": credentials,
         "selected_user": {"role": role, **selected_user},
+        "account_pool": pool,
     }
+    return context
+
+
+def account_pool(env_cfg: Dict[str, Any], role: str) -> list[Dict[str, Any]]:
+    """All accounts of ``role``: ``credentials.<role>`` is a single user or a list of users."""
+    users = env_cfg.get("credentials", {}).get(role) or []
+    return [dict(user) for user in (users if isinstance(users, list) else [users])]
+
 
+def environment_config(environment: str) -> Dict[str, Any]:
+    return _load_yaml(ENV_DIR / f"{environment}.yaml")
+
+
+def leased_account_variable(role: str) -> str:
+    """Environment variable naming the account leased for ``role`` (inherited by child processes)."""
+    return "E2E_ACCOUNT_" + re.sub(r"[^A-Za-z0-9]+", "_", role).upper()
+
+
+def web_driver_options(capabilities: Dict[str, Any]):
+    """Selenium options object for Open Browser (``desired_capabilities`` is ignored by Selenium 4)."""
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.common.options import ArgOptions
+
+    caps = copy.deepcopy(capabilities)
+    chrome = caps.pop("goog:chromeOptions", None)
+    options = ChromeOptions() if chrome is not None or caps.get("browserName") == "chrome" else ArgOptions()
+    for argument in (chrome or {}).pop("args", []):
+        options.add_argument(argument)
+    for name, value in (chrome or {}).items():
+        options.add_experimental_option(name, value)
+    for name, value in caps.items():
+        options.set_capability(name, value)
+    return options
+
+
+def _requested_profiles() -> list[str]:
+    return [name.strip() for name in os.getenv("E2E_DRIVER_PROFILES", "").split(",") if name.strip()]
+
+
+def _merged(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+    """``base`` with ``overlay`` merged in, as a new dict; neither input is modified."""
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merged(merged[key], value)
+        elif isinstance(value, list) and isinstance(merged.get(key), list):
+            merged[key] = merged[key] + [item for item in value if item not in merged[key]]
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def publish_context(context: Dict[str, Any]) -> None:
+    """Make ``context`` the active one for Robot keywords (``${REMOTE_URL}``, ``${DESIRED_CAPS}``...)."""
     _set_robot_globals(context)
-    return context
+
+
+def _robot_running() -> bool:
+    try:
+        BuiltIn().get_variables()
+    except RobotNotRunningError:
+        return False
+    return True
 
 
 def _set_robot_globals(context: Dict[str, Any]) -> None:
+    # Outside a Robot run (pytest, benchmarks) the context is still useful on its own.
+    if not _robot_running():
+        return
     bi = BuiltIn()
     timeouts = context.get("timeouts", {})
     bi.set_global_variable("${ENVIRONMENT}", context["environment"])
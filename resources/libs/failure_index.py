@@ -0,0 +1,284 @@
+"""Group test failures across runs by root cause.
+
+A grid or Appium outage fails hundreds of tests with messages that differ
+only in session ids, ports, numbers and paths. Each failure's message and
+Python traceback (``output.xml`` DEBUG messages, JUnit failure text) is
+normalized to a signature text, the text is shingled into token 3-grams and
+summarized as a MinHash. LSH buckets (``BANDS`` bands of the MinHash) find
+candidate clusters, and a failure joins the one whose representative is at
+least ``THRESHOLD`` similar; otherwise it starts a new cluster. Signature
+texts seen before skip all of this.
+
+Runs are indexed incrementally into ``reports/failures.sqlite``: only new
+report directories, or ones whose result files changed, are parsed::
+
+    with open_index(Path("reports/failures.sqlite")) as conn:
+        index_failures(conn, Path("reports"))
+        for row in clusters(conn, limit=20):
+            print(row["failures"], row["representative"])
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from results_store import find_run_dirs, result_files
+except ImportError:  # imported as resources.libs.failure_index
+    from .results_store import find_run_dirs, result_files
+
+PERMUTATIONS = 128
+BANDS = 32  # 4 rows per band: a pair at 0.6 similarity shares a bucket with ~99% probability
+THRESHOLD = 0.6
+TRACE_FRAMES = 6
+
+_RANDOM = np.random.default_rng(48)
+_A = _RANDOM.integers(1, 2**63, PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_B = _RANDOM.integers(0, 2**63, PERMUTATIONS, dtype=np.uint64)
+
+# Order matters: URLs and ids before the generic number rule.
+_VOLATILE = [
+    (re.compile(r"\n\s*Stacktrace:.*", re.S), ""),  # chromedriver / geckodriver native frames
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<uuid>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.I), "<hex>"),
+    (re.compile(r"\b[0-9a-f]{16,}\b", re.I), "<id>"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?"), "<time>"),
+    (re.compile(r"(?:[A-Za-z]:)?(?:[\\/][\w.\-]+)+[\\/]([\w.\-]+)"), r"\1"),  # path -> file name
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+    (re.compile(r"\s+"), " "),
+]
+# Python tracebacks (Robot DEBUG messages) and pytest's long format (JUnit failure text).
+_FRAME = re.compile(r'File "(?P<file>[^"]+)", line \d+, in (?P<function>\S+)|^(?P<pyfile>\S+\.py):\d+: (?:in )?(?P<pyfunction>\S+)', re.M)
+_EXCEPTION = re.compile(r"^(?:[\w.]+\.)?(?P<name>\w*(?:Error|Exception|Timeout|Failed)\w*)\b")
+_TOKEN = re.compile(r"<\w+>|\w+|[^\w\s]")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    path TEXT PRIMARY KEY,  -- relative to the reports directory
+    signature TEXT NOT NULL,
+    started TEXT
+);
+CREATE TABLE IF NOT EXISTS clusters (
+    id INTEGER PRIMARY KEY,
+    representative TEXT NOT NULL,
+    exception TEXT,
+    minhash BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS signatures (digest TEXT PRIMARY KEY, cluster_id INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL, key TEXT NOT NULL, cluster_id INTEGER NOT NULL,
+    PRIMARY KEY (band, key, cluster_id)
+);
+CREATE TABLE IF NOT EXISTS failures (
+    run_path TEXT NOT NULL REFERENCES runs(path) ON DELETE CASCADE,
+    test TEXT NOT NULL, message TEXT, cluster_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS failures_cluster ON failures(cluster_id, run_path);
+CREATE INDEX IF NOT EXISTS failures_run ON failures(run_path);
+"""
+
+
+def open_index(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def normalize_message(message: str) -> str:
+    text = message.strip()
+    for pattern, replacement in _VOLATILE:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def normalize_trace(trace: str) -> str:
+    """The innermost frames as ``file:function`` plus the exception line."""
+    frames = [
+        f"{Path(m['file'] or m['pyfile']).name}:{m['function'] or m['pyfunction']}" for m in _FRAME.finditer(trace)
+    ][-TRACE_FRAMES:]
+    lines = [line for line in trace.strip().splitlines() if line.strip()]
+    last = normalize_message(lines[-1]) if lines and not _FRAME.search(lines[-1]) else ""
+    return " | ".join([*frames, last]) if frames else ""
+
+
+def exception_name(message: str, trace: str = "") -> str:
+    lines = [re.sub(r"^(?:E\s+|\S+\.py:\d+: )", "", line.strip()) for line in trace.strip().splitlines() if line.strip()]
+    for candidate in ([lines[-1]] if lines else []) + [message.strip()]:
+        match = _EXCEPTION.match(candidate)
+        if match:
+            return match["name"]
+    return "AssertionError" if message else ""
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    tokens = _TOKEN.findall(text)
+    if len(tokens) <= size:
+        return [" ".join(tokens)]
+    return [" ".join(tokens[index:index + size]) for index in range(len(tokens) - size + 1)]
+
+
+def minhash(text: str) -> np.ndarray:
+    values = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "little") for item in set(shingles(text))),
+        dtype=np.uint64,
+    )
+    with np.errstate(over="ignore"):
+        return ((_A[:, None] * values[None, :] + _B[:, None]) >> np.uint64(32)).min(axis=1)
+
+
+def similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float(np.mean(left == right))
+
+
+def band_keys(signature: np.ndarray) -> List[Tuple[int, str]]:
+    return [
+        (band, hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest())
+        for band, rows in enumerate(signature.reshape(BANDS, -1))
+    ]
+
+
+def _robot_failures(output_xml: Path) -> Iterator[Tuple[str, str, str]]:
+    """(test, message, traceback) per failed test; streamed, so large outputs stay cheap."""
+    suites: List[str] = []
+    for event, element in ET.iterparse(output_xml, events=("start", "end")):
+        if element.tag == "suite":
+            if event == "start":
+                suites.append(element.get("name", ""))
+            else:
+                suites.pop()
+                element.clear()
+        elif element.tag == "test" and event == "end":
+            status = element.find("status")
+            if status is not None and status.get("status") == "FAIL":
+                traces = [
+                    msg.text or "" for msg in element.iter("msg")
+                    if msg.get("level") == "DEBUG" and "Traceback" in (msg.text or "")
+                ]
+                test = ".".join([*suites, element.get("name", "")])
+                yield test, status.text or "", traces[-1] if traces else ""
+            element.clear()
+
+
+def _junit_failures(junit_xml: Path) -> Iterator[Tuple[str, str, str]]:
+    for case in ET.parse(junit_xml).getroot().iter("testcase"):
+        for child in case:
+            if child.tag in ("failure", "error"):
+                yield f"{case.get('classname', '')}.{case.get('name', '')}", child.get("message", ""), child.text or ""
+                break
+
+
+def load_failures(run_dir: Path) -> List[Tuple[str, str, str]]:
+    failures: List[Tuple[str, str, str]] = []
+    for path in result_files(run_dir):
+        failures.extend(_robot_failures(path) if path.name == "output.xml" else _junit_failures(path))
+    return failures
+
+
+class _Clusterer:
+    """Assigns signature texts to clusters; representatives are cached for the indexing pass."""
+
+    def __init__(self, conn: sqlite3.Connection, threshold: float):
+        self.conn = conn
+        self.threshold = threshold
+        self.known: Dict[str, int] = dict(conn.execute("SELECT digest, cluster_id FROM signatures"))
+        self.representatives: Dict[int, np.ndarray] = {}
+
+    def _representative(self, cluster_id: int) -> np.ndarray:
+        if cluster_id not in self.representatives:
+            blob = self.conn.execute("SELECT minhash FROM clusters WHERE id = ?", (cluster_id,)).fetchone()[0]
+            self.representatives[cluster_id] = np.frombuffer(blob, dtype=np.uint64)
+        return self.representatives[cluster_id]
+
+    def assign(self, text: str, exception: str) -> int:
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        if digest in self.known:
+            return self.known[digest]
+        signature = minhash(text)
+        keys = band_keys(signature)
+        candidates = {
+            row[0]
+            for band, key in keys
+            for row in self.conn.execute("SELECT cluster_id FROM buckets WHERE band = ? AND key = ?", (band, key))
+        }
+        scored = [(similarity(signature, self._representative(candidate)), candidate) for candidate in candidates]
+        best = max(scored, default=(0.0, None))
+        if best[1] is not None and best[0] >= self.threshold:
+            cluster_id = best[1]
+        else:
+            cluster_id = self.conn.execute(
+                "INSERT INTO clusters (representative, exception, minhash) VALUES (?, ?, ?)",
+                (text, exception, signature.tobytes()),
+            ).lastrowid
+            self.representatives[cluster_id] = signature
+        # Members add their buckets too, so variants close to any member are found next time.
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO buckets (band, key, cluster_id) VALUES (?, ?, ?)",
+            [(band, key, cluster_id) for band, key in keys],
+        )
+        self.conn.execute("INSERT INTO signatures (digest, cluster_id) VALUES (?, ?)", (digest, cluster_id))
+        self.known[digest] = cluster_id
+        return cluster_id
+
+
+def index_failures(conn: sqlite3.Connection, reports_dir: Path, threshold: float = THRESHOLD) -> List[str]:
+    """Cluster the failures of runs that are new or changed; returns their paths."""
+    known = dict(conn.execute("SELECT path, signature FROM runs"))
+    clusterer = _Clusterer(conn, threshold)
+    indexed = []
+    for run_dir, info in find_run_dirs(reports_dir):
+        files = result_files(run_dir)
+        if not files:
+            continue
+        signature = ";".join(f"{path.name}:{path.stat().st_size}:{path.stat().st_mtime_ns}" for path in files)
+        key = run_dir.relative_to(reports_dir).as_posix()
+        if known.get(key) == signature:
+            continue
+        try:
+            failures = load_failures(run_dir)
+        except (ET.ParseError, OSError):  # a run still being written; picked up next time
+            continue
+        with conn:
+            conn.execute("DELETE FROM runs WHERE path = ?", (key,))
+            conn.execute("INSERT INTO runs (path, signature, started) VALUES (?, ?, ?)", (key, signature, info["started"]))
+            rows = []
+            for test, message, trace in failures:
+                text = "\n".join(filter(None, [normalize_message(message), normalize_trace(trace)])) or "<no message>"
+                rows.append((key, test, message[:1000], clusterer.assign(text, exception_name(message, trace))))
+            conn.executemany("INSERT INTO failures (run_path, test, message, cluster_id) VALUES (?, ?, ?, ?)", rows)
+        indexed.append(key)
+    return indexed
+
+
+def clusters(conn: sqlite3.Connection, runs: Sequence[str] = (), limit: int = 50) -> List[Dict[str, Any]]:
+    """One row per root cause, most failures first; ``runs`` limits it to those report directories."""
+    where = f"WHERE f.run_path IN ({', '.join('?' * len(runs))})" if runs else ""
+    rows = conn.execute(
+        "SELECT c.id, c.exception, c.representative, COUNT(*), COUNT(DISTINCT f.run_path), COUNT(DISTINCT f.test),"
+        " MIN(f.test), MIN(r.started), MAX(r.started), MIN(f.message)"
+        f" FROM failures f JOIN clusters c ON c.id = f.cluster_id JOIN runs r ON r.path = f.run_path {where}"
+        " GROUP BY c.id ORDER BY COUNT(*) DESC, c.id LIMIT ?",
+        (*runs, limit),
+    ).fetchall()
+    keys = ("cluster", "exception", "representative", "failures", "runs", "tests", "example_test", "first_seen", "last_seen", "example_message")
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def format_clusters(rows: List[Dict[str, Any]], width: int = 100) -> List[str]:
+    lines = []
+    for row in rows:
+        first_line = row["example_message"].strip().splitlines()[0] if row["example_message"].strip() else row["representative"]
+        summary = first_line if len(first_line) <= width else first_line[: width - 1] + "…"
+        if row["exception"] and row["exception"] not in first_line.split(":", 1)[0]:
+            summary = f"{row['exception']}: {summary}"
+        lines.append(f"#{row['cluster']:<5} {row['failures']:>5} failures  {row['tests']:>4} tests  {row['runs']:>3} runs  {summary}")
+    return lines
@@ -0,0 +1,228 @@
+"""Scale Selenium Grid node replicas with the runner's queue depth.
+
+Demand per browser = sessions the grid is running (hub ``/status`` slots)
++ sessions the runners are about to open: one per queued pytest unit, up to
+the runner's idle workers. Runners publish them to
+``.cache/queue/<pid>-<browser>.json`` through ``publish_demand``, and the files of
+exited runners are ignored. Each step sizes every service to
+``ceil(demand * headroom / slots_per_node)`` within ``[min, max]``:
+
+* scale up at once, then wait ``scale_up_cooldown`` seconds (new nodes need
+  time to register with the hub) before scaling up again;
+* scale down only after the target has stayed lower for
+  ``scale_down_after`` seconds with no session of that browser running.
+  ``docker compose --scale`` removes the newest containers, not
+  necessarily the idle ones, so a busy node is never removed this way.
+
+Backends (``backend`` in ``config/autoscaler.yaml``): ``compose``
+(``docker compose up --scale``), ``local`` (one local process per replica,
+for trying it out) and ``noop`` (decisions only).
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import shlex
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+import requests
+
+try:
+    from env_loader import read_config
+    from resource_leases import process_alive
+except ImportError:  # imported as resources.libs.grid_autoscaler
+    from .env_loader import read_config
+    from .resource_leases import process_alive
+
+ROOT = Path(__file__).resolve().parents[2]
+CONFIG_FILE = ROOT / "config" / "autoscaler.yaml"
+QUEUE_DIR = ROOT / ".cache" / "queue"
+
+
+def publish_demand(browser: str, pending: int, running: int, queue_dir: Path = QUEUE_DIR) -> None:
+    """Called by run_tests.py whenever its web sessions (pending / running) change."""
+    queue_dir.mkdir(parents=True, exist_ok=True)
+    path = queue_dir / f"{os.getpid()}-{browser}.json"
+    if pending <= 0 and running <= 0:
+        path.unlink(missing_ok=True)
+        return
+    payload = {"pid": os.getpid(), "browser": browser, "pending": pending, "running": running, "updated": time.time()}
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(payload), encoding="utf-8")
+    temporary.replace(path)
+
+
+def read_demand(queue_dir: Path = QUEUE_DIR) -> Dict[str, Dict[str, int]]:
+    """``{browser: {"pending", "running"}}`` over all live runners."""
+    demand: Dict[str, Dict[str, int]] = {}
+    for path in sorted(queue_dir.glob("*.json")) if queue_dir.exists() else []:
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if not process_alive(int(entry.get("pid", 0))):
+            path.unlink(missing_ok=True)
+            continue
+        totals = demand.setdefault(entry["browser"], {"pending": 0, "running": 0})
+        totals["pending"] += int(entry.get("pending", 0))
+        totals["running"] += int(entry.get("running", 0))
+    return demand
+
+
+def grid_usage(hub_url: str, timeout: float = 5.0) -> Dict[str, Dict[str, int]] | None:
+    """``{browserName: {"nodes", "slots", "busy"}}`` from the hub's ``/status``; None if unreachable."""
+    try:
+        value = requests.get(f"{hub_url.rstrip('/')}/status", timeout=timeout).json().get("value") or {}
+    except (requests.RequestException, ValueError):
+        return None
+    usage: Dict[str, Dict[str, int]] = {}
+    for node in value.get("nodes", []):
+        seen = set()
+        for slot in node.get("slots", []):
+            browser = (slot.get("stereotype") or {}).get("browserName", "")
+            totals = usage.setdefault(browser, {"nodes": 0, "slots": 0, "busy": 0})
+            if browser not in seen:
+                totals["nodes"] += 1
+                seen.add(browser)
+            totals["slots"] += 1
+            totals["busy"] += 1 if slot.get("session") else 0
+    return usage
+
+
+class NoopBackend:
+    """Remembers the requested replica counts; nothing is started."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.replicas: Dict[str, int] = {}
+
+    def current(self, service: str) -> int:
+        return self.replicas.get(service, 0)
+
+    def scale(self, service: str, replicas: int) -> None:
+        self.replicas[service] = replicas
+
+
+class ComposeBackend:
+    """``docker compose --profile grid up -d --scale <service>=N`` in the repository root."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.command = ["docker", "compose", "--profile", "grid"]
+
+    def current(self, service: str) -> int:
+        result = subprocess.run(
+            [*self.command, "ps", "-q", "--status", "running", service],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        return len(result.stdout.split())
+
+    def scale(self, service: str, replicas: int) -> None:
+        subprocess.run(
+            [*self.command, "up", "-d", "--no-recreate", "--scale", f"{service}={replicas}", service],
+            cwd=ROOT, check=True, capture_output=True,
+        )
+
+
+class LocalBackend:
+    """One local process per replica (``local.command`` with ``{port}``), e.g. fake WebDriver servers."""
+
+    def __init__(self, config: Dict[str, Any]):
+        local = config.get("local") or {}
+        self.template = local.get("command", "python tools/fake_webdriver.py --port {port}")
+        self.base_port = int(local.get("base_port", 4600))
+        self.processes: Dict[str, List[subprocess.Popen]] = {}
+        self._services: List[str] = []
+
+    def current(self, service: str) -> int:
+        alive = [process for process in self.processes.get(service, []) if process.poll() is None]
+        self.processes[service] = alive
+        return len(alive)
+
+    def scale(self, service: str, replicas: int) -> None:
+        if service not in self._services:
+            self._services.append(service)
+        processes = self.processes.setdefault(service, [])
+        while len(processes) > replicas:
+            process = processes.pop()
+            process.terminate()
+            process.wait(timeout=10)
+        offset = 100 * self._services.index(service)
+        while len(processes) < replicas:
+            port = self.base_port + offset + len(processes)
+            command = shlex.split(self.template.format(port=port, index=len(processes)))
+            processes.append(subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    def close(self) -> None:
+        for service in list(self.processes):
+            self.scale(service, 0)
+
+
+BACKENDS = {"noop": NoopBackend, "compose": ComposeBackend, "local": LocalBackend}
+
+
+@dataclass
+class ServiceState:
+    last_up: float = -math.inf
+    low_since: float | None = None
+
+
+@dataclass
+class Autoscaler:
+    config: Dict[str, Any]
+    backend: Any
+    queue_dir: Path = QUEUE_DIR
+    states: Dict[str, ServiceState] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, path: Path = CONFIG_FILE, backend: str | None = None) -> "Autoscaler":
+        config = read_config(path)
+        name = backend or config.get("backend", "compose")
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown autoscaler backend '{name}' (choose from {', '.join(BACKENDS)})")
+        return cls(config, BACKENDS[name](config))
+
+    def target(self, spec: Dict[str, Any], busy: int, pending: int) -> int:
+        demand = busy + pending
+        nodes = math.ceil(demand * float(self.config.get("headroom", 1.0)) / int(spec.get("slots_per_node", 1)))
+        return max(int(spec.get("min", 0)), min(int(spec.get("max", nodes)), nodes))
+
+    def step(self, now: float | None = None) -> List[Dict[str, Any]]:
+        """One scaling round; returns a record per service (with ``action`` when it scaled)."""
+        now = time.monotonic() if now is None else now
+        # Without a hub (local / noop backends) demand comes from the runner queues alone.
+        usage = grid_usage(self.config["hub_url"]) if self.config.get("hub_url") else {}
+        if usage is None:
+            return [{"error": f"hub {self.config['hub_url']} unreachable; not scaling"}]
+        demand = read_demand(self.queue_dir)
+        records = []
+        for browser, spec in (self.config.get("services") or {}).items():
+            service = spec["service"]
+            queued = demand.get(browser, {"pending": 0, "running": 0})
+            busy = max(usage.get(spec.get("browser_name", browser), {}).get("busy", 0), queued["running"])
+            current = self.backend.current(service)
+            target = self.target(spec, busy, queued["pending"])
+            state = self.states.setdefault(service, ServiceState())
+            record = {"service": service, "current": current, "target": target, "busy": busy, "pending": queued["pending"]}
+            if target > current:
+                state.low_since = None
+                if now - state.last_up >= float(self.config.get("scale_up_cooldown", 20)):
+                    self.backend.scale(service, target)
+                    state.last_up = now
+                    record["action"] = f"up {current}->{target}"
+            elif target < current:
+                if busy:
+                    state.low_since = None  # wait until no session of this browser runs
+                elif state.low_since is None:
+                    state.low_since = now
+                elif now - state.low_since >= float(self.config.get("scale_down_after", 120)):
+                    self.backend.scale(service, target)
+                    state.low_since = None
+                    record["action"] = f"down {current}->{target}"
+            else:
+                state.low_since = None
+            records.append(record)
+        return records
@@ -0,0 +1,237 @@
+"""Record / replay of the HTTP services behind ``base_url`` and ``api_base_url``.
+
+Selected per environment in ``config/environments/<env>.yaml``::
+
+    http_fixtures:
+      mode: record            # off | record | replay
+      cassettes: resources/data/cassettes/dev
+      listen: 0.0.0.0                      # default 127.0.0.1; widen for a Docker grid
+      advertise_host: host.docker.internal
+
+For every target URL a local stand-in server is started. In ``record`` mode
+it forwards to the real service and stores each exchange; in ``replay`` mode
+it answers from the cassette (held in memory) and never opens a connection,
+so suites run offline while still driving the real UI. A request that is
+not in the cassette gets ``599`` with the request key in the body.
+
+Cassettes are one gzip-compressed JSON-lines file per target, each line one
+exchange keyed by a hash of method, path, sorted query and body.
+``run_tests.py`` starts the stand-ins and points ``base_url``/``api_base_url``
+at them via ``E2E_FIXTURE_BASE_URL`` / ``E2E_FIXTURE_API_BASE_URL``.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import aiohttp
+from aiohttp import web
+
+try:
+    from env_loader import ENV_DIR, read_config
+except ImportError:  # imported as resources.libs.http_fixtures
+    from .env_loader import ENV_DIR, read_config
+
+ROOT = Path(__file__).resolve().parents[2]
+TARGETS = ("base_url", "api_base_url")
+MISS_STATUS = 599
+MODES = ("off", "record", "replay")
+
+# Response headers that describe the original transfer, not the content.
+_DROP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive", "date", "server"}
+
+
+def request_key(method: str, path_qs: str, body: bytes, ignore_query: List[str] | None = None) -> str:
+    parts = urlsplit(path_qs)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in (ignore_query or []))
+    digest = hashlib.sha256()
+    for chunk in (method.upper(), parts.path or "/", urlencode(query)):
+        digest.update(chunk.encode("utf-8") + b"\0")
+    digest.update(hashlib.sha256(body).digest())
+    return digest.hexdigest()[:32]
+
+
+@dataclass
+class Cassette:
+    path: Path
+    exchanges: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    dirty: bool = False
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        cassette = cls(path)
+        if path.exists():
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        exchange = json.loads(line)
+                        cassette.exchanges[exchange["key"]] = exchange
+        return cassette
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        return self.exchanges.get(key)
+
+    def put(self, key: str, method: str, path_qs: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        self.exchanges[key] = {
+            "key": key,
+            "method": method,
+            "path": path_qs,
+            "status": status,
+            "headers": headers,
+            "body": base64.b64encode(body).decode("ascii"),
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as handle:
+            for key in sorted(self.exchanges):
+                handle.write(json.dumps(self.exchanges[key], separators=(",", ":")) + "\n")
+        self.dirty = False
+
+
+class StandIn:
+    """aiohttp app that records from / replays for one upstream origin."""
+
+    def __init__(self, upstream: str, cassette: Cassette, mode: str, ignore_query: List[str] | None = None):
+        self.upstream = upstream.rstrip("/")
+        self.cassette = cassette
+        self.mode = mode
+        self.ignore_query = ignore_query or []
+        self.public_url = ""
+        self.stats = {"requests": 0, "replayed": 0, "recorded": 0, "misses": 0}
+        self.http: aiohttp.ClientSession | None = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        path_qs = request.path_qs
+        key = request_key(request.method, path_qs, body, self.ignore_query)
+        self.stats["requests"] += 1
+
+        exchange = self.cassette.get(key)
+        if exchange is not None and self.mode == "replay":
+            self.stats["replayed"] += 1
+            return web.Response(status=exchange["status"], headers=exchange["headers"], body=base64.b64decode(exchange["body"]))
+        if self.mode == "replay":
+            self.stats["misses"] += 1
+            return web.Response(status=MISS_STATUS, text=f"No recorded exchange for {request.method} {path_qs} ({key})")
+
+        assert self.http is not None
+        headers = {name: value for name, value in request.headers.items() if name.lower() not in ("host", "content-length")}
+        async with self.http.request(
+            request.method, self.upstream + path_qs, headers=headers, data=body or None, allow_redirects=False
+        ) as upstream:
+            payload = await upstream.read()
+            response_headers = {
+                name: value for name, value in upstream.headers.items() if name.lower() not in _DROP_HEADERS
+            }
+        if "Location" in response_headers and self.public_url:
+            response_headers["Location"] = response_headers["Location"].replace(self.upstream, self.public_url)
+        self.cassette.put(key, request.method, path_qs, upstream.status, response_headers, payload)
+        self.stats["recorded"] += 1
+        return web.Response(status=upstream.status, headers=response_headers, body=payload)
+
+
+def fixture_mode(value: Any) -> str:
+    """Validated ``http_fixtures.mode``; an unquoted YAML ``off`` arrives as ``False``."""
+    if value is None or value is False:
+        return "off"
+    mode = str(value).strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"http_fixtures.mode must be one of {', '.join(MODES)}, got {value!r}")
+    return mode
+
+
+class FixtureServers:
+    """Stand-ins for one environment, running on a background event loop."""
+
+    def __init__(self, environment: str, env_cfg: Dict[str, Any], context_urls: Dict[str, str]):
+        cfg = env_cfg.get("http_fixtures") or {}
+        self.environment = environment
+        self.mode = fixture_mode(cfg.get("mode"))
+        cassette_dir = Path(cfg.get("cassettes", f"resources/data/cassettes/{environment}"))
+        self.cassette_dir = cassette_dir if cassette_dir.is_absolute() else ROOT / cassette_dir
+        self.advertise_host = cfg.get("advertise_host", "127.0.0.1")
+        self.listen = cfg.get("listen", "127.0.0.1")
+        self.stand_ins: Dict[str, StandIn] = {}
+        for target in cfg.get("targets", TARGETS):
+            upstream = context_urls.get(target)
+            if upstream:
+                cassette = Cassette.load(self.cassette_dir / f"{target}.jsonl.gz")
+                self.stand_ins[target] = StandIn(upstream, cassette, self.mode, cfg.get("ignore_query"))
+
+        self.loop = asyncio.new_event_loop()
+        self._runners: List[web.AppRunner] = []
+        self._ready = threading.Event()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._start())
+        except BaseException as exc:  # noqa: BLE001 - re-raised in the caller's thread
+            self._error = exc
+        finally:
+            self._ready.set()
+        self.loop.run_forever()
+
+    async def _start(self) -> None:
+        for stand_in in self.stand_ins.values():
+            if self.mode == "record":
+                stand_in.http = aiohttp.ClientSession(auto_decompress=True)
+            app = web.Application(client_max_size=64 * 1024 * 1024)
+            app.router.add_route("*", "/{tail:.*}", stand_in.handle)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, self.listen, 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            stand_in.public_url = f"http://{self.advertise_host}:{port}"
+            self._runners.append(runner)
+
+    def environment_variables(self) -> Dict[str, str]:
+        """``E2E_FIXTURE_BASE_URL`` etc., read by ``env_loader.build_context``."""
+        return {f"E2E_FIXTURE_{target.upper()}": f"{stand_in.public_url}/" for target, stand_in in self.stand_ins.items()}
+
+    def stop(self) -> Dict[str, Any]:
+        async def shutdown() -> None:
+            for runner in self._runners:
+                await runner.cleanup()
+            for stand_in in self.stand_ins.values():
+                if stand_in.http is not None:
+                    await stand_in.http.close()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(30)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(10)
+        for stand_in in self.stand_ins.values():
+            stand_in.cassette.save()
+        return {target: {**stand_in.stats, "cassette": str(stand_in.cassette.path)} for target, stand_in in self.stand_ins.items()}
+
+
+def start_fixtures(environment: str, mode: str | None = None) -> FixtureServers | None:
+    """Start the stand-ins configured for ``environment`` (``mode`` overrides the YAML); None when off."""
+    env_cfg = read_config(ENV_DIR / f"{environment}.yaml")
+    fixtures = dict(env_cfg.get("http_fixtures") or {})
+    if mode:
+        fixtures["mode"] = mode
+    fixtures["mode"] = fixture_mode(fixtures.get("mode"))
+    if fixtures["mode"] == "off":
+        return None
+    env_cfg["http_fixtures"] = fixtures
+    return FixtureServers(environment, env_cfg, {target: env_cfg.get(target) for target in TARGETS})
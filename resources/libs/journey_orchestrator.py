@@ -0,0 +1,178 @@
+"""Cross-channel journey orchestration for Robot Framework.
+
+A journey (web -> Android -> Windows) used to start each driver only after the
+previous phase finished, so every session start-up added to the total time.
+``Prewarm Channel`` starts the next channel's session on a background thread
+while the current phase is still running; ``Activate Channel`` then hands the
+ready driver to SeleniumLibrary and publishes that channel's context. Phases
+exchange data through ``Set Journey State`` / ``Get Journey State``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn
+
+try:
+    from env_loader import build_context, publish_context
+except ImportError:  # imported as resources.libs.journey_orchestrator
+    from .env_loader import build_context, publish_context
+
+
+@dataclass
+class JourneyState:
+    """Values handed from one phase to the next (thread-safe)."""
+
+    values: Dict[str, Any] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def set(self, key: str, value: Any) -> None:
+        with self.lock:
+            self.values[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self.lock:
+            return self.values.get(key, default)
+
+
+@dataclass
+class _Channel:
+    platform: str
+    context: Dict[str, Any]
+    future: Future
+    requested_at: float
+    ready_at: float | None = None
+
+
+def create_remote_driver(context: Dict[str, Any]):
+    """Open a session the same way the platform keywords do (Open Browser / Create Webdriver)."""
+    from selenium import webdriver
+
+    if context["platform"] == "web":
+        from selenium.webdriver.common.options import ArgOptions
+
+        options = ArgOptions()
+        for key, value in context["capabilities"].items():
+            options.set_capability(key, value)
+    else:
+        from appium.options.common import AppiumOptions
+
+        options = AppiumOptions().load_capabilities(context["capabilities"])
+    return webdriver.Remote(command_executor=context["remote_url"], options=options)
+
+
+class journey_orchestrator:
+    """Keyword library for pipelined multi-channel journeys."""
+
+    ROBOT_LIBRARY_SCOPE = 'SUITE'
+
+    def __init__(self, max_parallel_startups: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=int(max_parallel_startups), thread_name_prefix="prewarm")
+        self._channels: Dict[str, _Channel] = {}
+        self._drivers: Dict[str, Any] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self.state = JourneyState()
+
+    # ------------------------------------------------------------------ channels
+
+    def prewarm_channel(self, platform: str, environment: str = "dev", user_role: str | None = None) -> None:
+        """Start creating the ``platform`` session in the background."""
+        if platform in self._channels or platform in self._drivers:
+            return
+        context = build_context(environment, platform, user_role or None)
+        channel = _Channel(platform, context, Future(), time.perf_counter())
+
+        def start() -> Any:
+            driver = create_remote_driver(context)
+            channel.ready_at = time.perf_counter()
+            return driver
+
+        channel.future = self._executor.submit(start)
+        self._channels[platform] = channel
+        logger.info(f"Pre-warming {platform} session on {context['remote_url']}")
+
+    def activate_channel(
+        self,
+        platform: str,
+        environment: str = "dev",
+        user_role: str | None = None,
+        timeout: float = 180,
+    ) -> Any:
+        """Switch the journey to ``platform``; waits only for whatever start-up is still left."""
+        if platform not in self._channels:
+            self.prewarm_channel(platform, environment, user_role)
+        channel = self._channels.pop(platform)
+
+        waited_from = time.perf_counter()
+        driver = channel.future.result(timeout=float(timeout))
+        waited = time.perf_counter() - waited_from
+        startup = (channel.ready_at or time.perf_counter()) - channel.requested_at
+        self._timings[platform] = {"startup_seconds": startup, "blocked_seconds": waited}
+        logger.info(f"{platform} session ready: start-up {startup:.2f}s, journey blocked {waited:.2f}s")
+
+        context = channel.context
+        publish_context(context)
+        BuiltIn().set_suite_variable("${CTX}", context)
+
+        selenium = BuiltIn().get_library_instance("SeleniumLibrary")
+        selenium.register_driver(driver, platform)
+        timeouts = context.get("timeouts", {})
+        if platform != "windows":
+            selenium.set_selenium_implicit_wait(timeouts.get("implicit", 5))
+        selenium.set_selenium_timeout(timeouts.get("explicit", 15))
+        self._drivers[platform] = driver
+        return driver
+
+    def close_channel(self, platform: str) -> None:
+        """Quit the ``platform`` session if it was activated (through SeleniumLibrary, so its cache stays valid)."""
+        if self._drivers.pop(platform, None) is not None:
+            selenium = BuiltIn().get_library_instance("SeleniumLibrary")
+            try:
+                selenium.switch_browser(platform)
+                selenium.close_browser()
+            except Exception as exc:  # noqa: BLE001 - closing must not fail the journey
+                logger.warn(f"Closing {platform} session failed: {exc}")
+
+    def close_journey(self) -> None:
+        """Quit every activated session and discard sessions that were pre-warmed but never used."""
+        # start-ups still queued behind max_parallel_startups are dropped, not started
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for platform in list(self._drivers):
+            self.close_channel(platform)
+        for platform, channel in list(self._channels.items()):
+            if channel.future.cancelled():
+                continue
+            try:
+                channel.future.result(timeout=60).quit()
+            except Exception as exc:  # noqa: BLE001
+                logger.warn(f"Discarding pre-warmed {platform} session failed: {exc}")
+        self._channels.clear()
+
+    def log_journey_timings(self) -> Dict[str, Dict[str, float]]:
+        """Log, per channel, session start-up time versus the time the journey actually waited for it."""
+        saved = 0.0
+        for platform, timing in self._timings.items():
+            saved += timing["startup_seconds"] - timing["blocked_seconds"]
+            logger.info(
+                f"{platform}: start-up {timing['startup_seconds']:.2f}s, blocked {timing['blocked_seconds']:.2f}s"
+            )
+        logger.info(f"Start-up time overlapped with test steps: {saved:.2f}s")
+        return self._timings
+
+    # ------------------------------------------------------------------ state
+
+    def set_journey_state(self, key: str, value: Any) -> None:
+        """Store ``value`` for later phases of the journey."""
+        self.state.set(key, value)
+
+    def get_journey_state(self, key: str, default: Any = None) -> Any:
+        """Read a value stored by an earlier phase."""
+        value = self.state.get(key, default)
+        if value is None and default is None:
+            raise AssertionError(f"Journey state '{key}' has not been set")
+        return value
@@ -0,0 +1,181 @@
+"""Keep ``output.xml``/``log.html`` small (``config/logging.yaml``).
+
+Two halves, one class:
+
+* as a listener (``run_tests.py --log-preset`` adds it for every preset but
+  ``full``) it applies per-library log levels: while a keyword whose
+  ``library`` or ``library.keyword`` matches ``levels`` runs, the log
+  threshold is raised (or lowered) and restored when it ends, so e.g.
+  ``Process`` chatter never reaches the output;
+* as a library it provides ``Log Payload``: large text (pytest stdout, page
+  source, API bodies) is reduced to head/tail lines plus sampled lines that
+  match ``keep_patterns``, and anything over ``offload_chars`` is written
+  gzip-compressed to ``<outputdir>/payloads/`` and linked from the log.
+
+The ``--removekeywords``/``--flattenkeywords`` side lives in ``presets`` and
+is turned into robot options by ``preset_options``.
+"""
+from __future__ import annotations
+
+import fnmatch
+import gzip
+import hashlib
+import html
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+from robot.api import logger
+from robot.api.deco import keyword, not_keyword
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+POLICY_FILE = BASE_DIR / "config" / "logging.yaml"
+
+_PAYLOAD_DEFAULTS = {
+    "max_chars": 2000,
+    "head_lines": 15,
+    "tail_lines": 15,
+    "max_sampled_lines": 40,
+    "keep_patterns": [],
+    "offload_chars": 8000,
+    "dir": "payloads",
+}
+
+
+def load_policy(path: Path = POLICY_FILE) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        return yaml.safe_load(handle) or {}
+
+
+def preset_options(name: str, policy: Dict[str, Any] | None = None) -> Tuple[List[str], bool]:
+    """Robot options for ``presets.<name>`` and whether the level listener should run."""
+    presets = (policy if policy is not None else load_policy()).get("presets") or {}
+    if name not in presets:
+        raise ValueError(f"Unknown log preset '{name}' (available: {', '.join(sorted(presets))})")
+    preset = presets[name] or {}
+    options: List[str] = []
+    if preset.get("loglevel"):
+        options.append(f"--loglevel={preset['loglevel']}")
+    for value in preset.get("removekeywords") or []:
+        options.append(f"--removekeywords={value}")
+    for value in preset.get("flattenkeywords") or []:
+        options.append(f"--flattenkeywords={value}")
+    if preset.get("maxassignlength") is not None:
+        options.append(f"--maxassignlength={preset['maxassignlength']}")
+    return options, preset.get("policy", True)
+
+
+def level_for(levels: Dict[str, str], libname: str, kwname: str) -> str | None:
+    """Most specific ``levels`` entry for ``libname.kwname`` (exact keyword, pattern, then library)."""
+    full = f"{libname}.{kwname}".lower()
+    best: Tuple[int, str] | None = None
+    for pattern, level in levels.items():
+        pattern_lower = pattern.lower()
+        if pattern_lower == full:
+            rank = 3
+        elif "." in pattern_lower and fnmatch.fnmatchcase(full, pattern_lower):
+            rank = 2
+        elif fnmatch.fnmatchcase(libname.lower(), pattern_lower):
+            rank = 1
+        else:
+            continue
+        if best is None or rank > best[0]:
+            best = (rank, str(level).upper())
+    return best[1] if best else None
+
+
+def excerpt(text: str, settings: Dict[str, Any]) -> Tuple[str, int]:
+    """Head/tail lines plus sampled ``keep_patterns`` lines; returns (excerpt, omitted line count)."""
+    lines = text.splitlines()
+    head, tail = settings["head_lines"], settings["tail_lines"]
+    if len(lines) <= head + tail:
+        limit = settings["max_chars"]
+        return (text if len(text) <= limit else text[:limit] + " …"), 0
+    middle = lines[head : len(lines) - tail]
+    patterns = [re.compile(pattern) for pattern in settings["keep_patterns"]]
+    sampled = [line for line in middle if any(pattern.search(line) for pattern in patterns)]
+    sampled = sampled[: settings["max_sampled_lines"]]
+    omitted = len(middle) - len(sampled)
+    parts = lines[:head]
+    parts.append(f"… {omitted} lines omitted" + (f", {len(sampled)} matching lines kept:" if sampled else " …"))
+    parts.extend(sampled)
+    if sampled:
+        parts.append("…")
+    parts.extend(lines[len(lines) - tail :])
+    return "\n".join(parts), omitted
+
+
+def offload(text: str, output_dir: Path, subdir: str, name: str) -> Path:
+    """Write ``text`` gzip-compressed under ``output_dir/subdir``; same content, same file."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "-", name).strip("-")[:60] or "payload"
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+    target = output_dir / subdir / f"{slug}-{digest}.txt.gz"
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(target, "wt", encoding="utf-8") as handle:
+            handle.write(text)
+    return target
+
+
+class log_policy:
+    """Log level listener (API v2) and ``Log Payload`` keyword library."""
+
+    ROBOT_LIBRARY_SCOPE = "GLOBAL"
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self, policy_file: str | None = None):
+        self.policy = load_policy(Path(policy_file)) if policy_file else load_policy()
+        self.levels: Dict[str, str] = self.policy.get("levels") or {}
+        self.payload = {**_PAYLOAD_DEFAULTS, **(self.policy.get("payload") or {})}
+        self._restore: List[str | None] = []
+
+    @not_keyword
+    def start_keyword(self, name, attrs):
+        level = level_for(self.levels, attrs["libname"] or "", attrs["kwname"]) if self.levels else None
+        if level is None:
+            self._restore.append(None)
+            return
+        from robot.running.context import EXECUTION_CONTEXTS
+
+        self._restore.append(EXECUTION_CONTEXTS.current.output.set_log_level(level))
+
+    @not_keyword
+    def end_keyword(self, name, attrs):
+        previous = self._restore.pop() if self._restore else None
+        if previous is not None:
+            from robot.running.context import EXECUTION_CONTEXTS
+
+            EXECUTION_CONTEXTS.current.output.set_log_level(previous)
+
+    @keyword("Log Payload")
+    def log_payload(self, payload: Any, name: str | None = None, level: str = "INFO"):
+        """Log ``payload`` within the configured size limits.
+
+        Non-string payloads are logged as indented JSON. Text over
+        ``max_chars`` is shortened to an excerpt; text over ``offload_chars``
+        is also stored compressed next to ``log.html`` and linked. ``name``
+        (default: current test name) names the offloaded file.
+        """
+        from robot.libraries.BuiltIn import BuiltIn
+
+        builtin = BuiltIn()
+        text = payload if isinstance(payload, str) else json.dumps(payload, indent=2, ensure_ascii=False, default=str)
+        if len(text) <= self.payload["max_chars"]:
+            logger.write(text, level)
+            return
+
+        short, omitted = excerpt(text, self.payload)
+        body = f"<pre>{html.escape(short)}</pre>"
+        if len(text) > self.payload["offload_chars"]:
+            output_dir = Path(builtin.get_variable_value("${OUTPUT DIR}"))
+            label = name or builtin.get_variable_value("${TEST NAME}") or builtin.get_variable_value("${SUITE NAME}")
+            stored = offload(text, output_dir, self.payload["dir"], label)
+            size_kb = stored.stat().st_size / 1024
+            link = html.escape(stored.relative_to(output_dir).as_posix())
+            note = f" ({omitted} lines not shown below)" if omitted else ""
+            body = f'<a href="{link}">Full payload: {len(text)} chars, {size_kb:.1f} KB gzip</a>{note}' + body
+        logger.write(body, level, html=True)
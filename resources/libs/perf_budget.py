@@ -0,0 +1,274 @@
+"""Latency budgets and browser performance metrics for Robot runs.
+
+Used as a listener (``run_tests.py --perf`` adds it)::
+
+    robot --listener resources/libs/perf_budget.py ...
+
+For each test it records how long budgeted keywords took and the page's
+Navigation Timing / paint metrics, read after every SeleniumLibrary navigation
+keyword and once more when the test ends (for pages reached by clicks or form
+submits); clicks themselves add no round trip to the grid. Budgets come from
+``config/budgets.yaml`` (keywords, navigation metrics, per-tag overrides) and
+from ``budget:<name>=<seconds>s`` test tags.
+Results go to ``perf.json`` in the output directory; ``summarize_run``
+compares a run with the rolling baseline of earlier runs for the same
+environment/platform.
+"""
+from __future__ import annotations
+
+import json
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+BUDGETS_FILE = BASE_DIR / "config" / "budgets.yaml"
+
+# SeleniumLibrary keywords that load a new document.
+NAVIGATING_KEYWORDS = {
+    "open browser",
+    "go to",
+    "go back",
+    "reload page",
+}
+
+NAVIGATION_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+const paint = {};
+performance.getEntriesByType('paint').forEach(entry => { paint[entry.name] = entry.startTime; });
+return {
+  url: nav.name,
+  timeOrigin: performance.timeOrigin,
+  ttfb: nav.responseStart,
+  domContentLoaded: nav.domContentLoadedEventEnd,
+  load: nav.loadEventEnd,
+  firstContentfulPaint: paint['first-contentful-paint'] || null,
+  transferSize: nav.transferSize,
+  resourceCount: performance.getEntriesByType('resource').length
+};
+"""
+
+# Navigation Timing values are milliseconds; budgets and reports use seconds.
+TIMING_METRICS = ("ttfb", "domContentLoaded", "load", "firstContentfulPaint")
+
+
+def load_budgets(path: Path = BUDGETS_FILE) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        return yaml.safe_load(handle) or {}
+
+
+def parse_seconds(value: Any) -> float:
+    text = str(value).strip().lower()
+    if text.endswith("ms"):
+        return float(text[:-2]) / 1000.0
+    return float(text.rstrip("s"))
+
+
+def budgets_for(config: Dict[str, Any], tags: List[str]) -> Dict[str, float]:
+    """Keyword and navigation budgets that apply to a test with ``tags`` (lower-cased names)."""
+    budgets = {name.lower(): float(value) for name, value in (config.get("keywords") or {}).items()}
+    budgets.update({f"nav:{name}".lower(): float(value) for name, value in (config.get("navigation") or {}).items()})
+    tag_overrides = {tag.lower(): values for tag, values in (config.get("tags") or {}).items()}
+    for tag in tags:
+        for name, value in (tag_overrides.get(tag.lower()) or {}).items():
+            key = f"nav:{name}" if name in TIMING_METRICS else name
+            budgets[key.lower()] = float(value)
+        if tag.lower().startswith("budget:") and "=" in tag:
+            name, value = tag[len("budget:"):].rsplit("=", 1)
+            key = f"nav:{name.strip()}" if name.strip() in TIMING_METRICS else name.strip()
+            budgets[key.lower()] = parse_seconds(value)
+    return budgets
+
+
+class perf_budget:
+    """Robot Framework listener (API v2) recording budgets and navigation metrics."""
+
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self, budgets_file: str | None = None):
+        self.config = load_budgets(Path(budgets_file) if budgets_file else BUDGETS_FILE)
+        self.depth = 0
+        self.output_dir: Path | None = None
+        self.run: Dict[str, Any] = {"started": datetime.now().isoformat(timespec="seconds"), "tests": {}}
+        self.test: Dict[str, Any] = {}
+        self.budgets: Dict[str, float] = {}
+        self.suites: List[str] = []
+
+    # ------------------------------------------------------------------ listener
+
+    def start_suite(self, name, attrs):
+        self.depth += 1
+        self.suites.append(attrs["longname"])
+        self._start_entry(f"{attrs['longname']} (suite setup)", [])
+        if self.depth == 1:
+            from robot.libraries.BuiltIn import BuiltIn
+
+            builtin = BuiltIn()
+            self.output_dir = Path(builtin.get_variable_value("${OUTPUT DIR}"))
+            self.run["suite"] = attrs["longname"]
+            self.run["environment"] = builtin.get_variable_value("${ENV}")
+            self.run["platform"] = builtin.get_variable_value("${PLATFORM}")
+
+    def start_test(self, name, attrs):
+        self._start_entry(attrs["longname"], attrs["tags"])
+
+    def end_keyword(self, name, attrs):
+        if attrs["status"] == "NOT RUN":
+            return
+        kwname = attrs["kwname"]
+        seconds = attrs["elapsedtime"] / 1000.0
+        budget = self.budgets.get(kwname.lower(), self.budgets.get(f"{attrs['libname']}.{kwname}".lower()))
+        if budget is not None:
+            self.test["keywords"].append({"name": kwname, "seconds": seconds, "budget": budget})
+            if seconds > budget:
+                self._violation(kwname, seconds, budget)
+        if attrs["libname"] == "SeleniumLibrary" and kwname.lower() in NAVIGATING_KEYWORDS:
+            self._collect_navigation()
+
+    def end_test(self, name, attrs):
+        # The page the test ended on, e.g. reached through a click or form submit.
+        self._collect_navigation()
+        # Keywords after the last test belong to the suite teardown.
+        self._start_entry(f"{self.suites[-1]} (suite teardown)", [])
+
+    def end_suite(self, name, attrs):
+        self.depth -= 1
+        self.suites.pop()
+        self.run["tests"] = {key: data for key, data in self.run["tests"].items() if any(data.values())}
+        if self.depth == 0 and self.output_dir is not None:
+            self.run["finished"] = datetime.now().isoformat(timespec="seconds")
+            path = self.output_dir / "perf.json"
+            path.write_text(json.dumps(self.run, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    # ------------------------------------------------------------------ helpers
+
+    def _start_entry(self, key: str, tags: List[str]) -> None:
+        """Following keywords are attributed to ``key`` (a test, or a suite setup/teardown)."""
+        self.budgets = budgets_for(self.config, tags)
+        self.test = {"keywords": [], "navigation": [], "violations": []}
+        self.run["tests"][key] = self.test
+
+    def _violation(self, name: str, seconds: float, budget: float) -> None:
+        from robot.api import logger
+
+        self.test["violations"].append({"name": name, "seconds": round(seconds, 3), "budget": budget})
+        logger.warn(f"Latency budget exceeded: {name} took {seconds:.2f}s (budget {budget:.2f}s)")
+
+    def _collect_navigation(self) -> None:
+        from robot.libraries.BuiltIn import BuiltIn
+
+        try:
+            driver = BuiltIn().get_library_instance("SeleniumLibrary").driver
+            if not driver.capabilities.get("browserName"):
+                return
+            entry = driver.execute_script(NAVIGATION_SCRIPT)
+        except Exception:  # noqa: BLE001 - no browser open, or Performance API unavailable
+            return
+        if not isinstance(entry, dict):
+            return
+        seen = self.test["navigation"]
+        if seen and (seen[-1].get("url"), seen[-1].get("timeOrigin")) == (entry.get("url"), entry.get("timeOrigin")):
+            return  # still the same document
+        if not entry.get("load"):
+            return  # page still loading; the next navigation or the end of the test picks it up
+        seen.append(entry)
+        for metric in TIMING_METRICS:
+            budget = self.budgets.get(f"nav:{metric}".lower())
+            if budget is not None and entry.get(metric) is not None and entry[metric] / 1000.0 > budget:
+                self._violation(f"{metric} {entry.get('url')}", entry[metric] / 1000.0, budget)
+
+
+# ---------------------------------------------------------------------- aggregation
+
+
+def run_metrics(run: Dict[str, Any]) -> Dict[str, float]:
+    """Flatten a perf.json run into ``{metric key: seconds}`` (slowest occurrence per test)."""
+    metrics: Dict[str, float] = {}
+
+    def record(key: str, value: float) -> None:
+        metrics[key] = max(value, metrics.get(key, 0.0))
+
+    for test, data in run.get("tests", {}).items():
+        for keyword in data.get("keywords", []):
+            record(f"{test} :: {keyword['name']}", keyword["seconds"])
+        for entry in data.get("navigation", []):
+            for metric in TIMING_METRICS:
+                if entry.get(metric) is not None:
+                    record(f"{test} :: {metric}", entry[metric] / 1000.0)
+    return metrics
+
+
+def load_runs(reports_dir: Path) -> List[Dict[str, Any]]:
+    runs = []
+    for path in reports_dir.glob("**/perf.json"):
+        try:
+            run = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        run["path"] = str(path)
+        runs.append(run)
+    return sorted(runs, key=lambda run: run.get("started", ""))
+
+
+def summarize_run(run_file: Path, reports_dir: Path, config: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """Budget violations of one run plus regressions against the rolling baseline of earlier runs."""
+    config = load_budgets() if config is None else config
+    settings = {"window": 10, "threshold": 0.25, "min_delta": 0.1, **(config.get("baseline") or {})}
+    run = json.loads(run_file.read_text(encoding="utf-8"))
+    history = [
+        other
+        for other in load_runs(reports_dir)
+        if (other.get("environment"), other.get("platform")) == (run.get("environment"), run.get("platform"))
+        and other.get("started", "") < run.get("started", "")
+        and Path(other["path"]).resolve() != run_file.resolve()
+    ][-int(settings["window"]):]
+
+    previous: Dict[str, List[float]] = {}
+    for other in history:
+        for key, value in run_metrics(other).items():
+            previous.setdefault(key, []).append(value)
+
+    regressions = []
+    for key, value in sorted(run_metrics(run).items()):
+        values = previous.get(key)
+        if not values:
+            continue
+        baseline = statistics.median(values)
+        if value > baseline * (1 + float(settings["threshold"])) and value - baseline > float(settings["min_delta"]):
+            regressions.append(
+                {"metric": key, "seconds": round(value, 3), "baseline": round(baseline, 3), "samples": len(values)}
+            )
+
+    violations = [
+        {"test": test, **violation}
+        for test, data in run.get("tests", {}).items()
+        for violation in data.get("violations", [])
+    ]
+    return {
+        "run": str(run_file),
+        "environment": run.get("environment"),
+        "platform": run.get("platform"),
+        "baseline_runs": len(history),
+        "violations": violations,
+        "regressions": regressions,
+    }
+
+
+def format_summary(summary: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"Performance: {len(summary['violations'])} budget violation(s), "
+        f"{len(summary['regressions'])} regression(s) vs {summary['baseline_runs']} earlier run(s)"
+    ]
+    for violation in summary["violations"]:
+        lines.append(f"  over budget  {violation['test']} :: {violation['name']}  {violation['seconds']:.2f}s > {violation['budget']:.2f}s")
+    for regression in summary["regressions"]:
+        lines.append(
+            f"  regression   {regression['metric']}  {regression['seconds']:.2f}s (baseline {regression['baseline']:.2f}s)"
+        )
+    return lines
@@ -0,0 +1,302 @@
+"""Cross-process leases on exclusive resources and test accounts.
+
+A Mac or Windows host runs one Calculator, and every role in
+``credentials`` is a shared account, so two workers (``run_tests.py
+--workers``, fan-out jobs, or separate runner invocations) driving them at
+the same time interfere with each other. Tests declare what they need and
+hold it for as long as they run:
+
+* Robot: ``[Tags]    lease:windows-calculator    account:standard``. The
+  ``resource_leases`` listener (``run_tests.py --leases``, always for
+  fan-out jobs) leases everything the tests of a suite declare before Suite
+  Setup and releases it after Suite Teardown.
+* pytest: ``@pytest.mark.lease("mac-calculator")`` /
+  ``@pytest.mark.account("standard")``, leased per test by
+  ``tests/python/conftest.py``.
+
+A plain resource has a single slot. An account resource has one slot per
+user listed for the role in the environment YAML (an account pool)::
+
+    credentials:
+      standard:
+        - {username: qa1@example.com, password: ...}
+        - {username: qa2@example.com, password: ...}
+
+The leased user is exported as ``E2E_ACCOUNT_<ROLE>``, which
+``build_context`` uses to pick ``${USERNAME}`` / ``${PASSWORD}``.
+
+State lives in ``.cache/leases/<resource>.json`` (``E2E_LEASE_DIR``), and
+every read-modify-write happens under an exclusive file lock. Waiters join a
+FIFO queue and get slots in arrival order. Entries whose process has exited
+are dropped, so a killed worker never blocks the others. Held leases are
+listed in ``E2E_HELD_LEASES``, so a child process (e.g. the pytest run
+started by ``Launch Windows Calculator``) reuses its parent's lease instead
+of waiting for it.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import socket
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    from env_loader import account_pool, environment_config, leased_account_variable
+    from timeline import record
+except ImportError:  # imported as resources.libs.resource_leases
+    from .env_loader import account_pool, environment_config, leased_account_variable
+    from .timeline import record
+
+ROOT = Path(__file__).resolve().parents[2]
+LEASE_DIR = Path(os.getenv("E2E_LEASE_DIR") or ROOT / ".cache" / "leases")
+HELD_ENV = "E2E_HELD_LEASES"
+DEFAULT_TIMEOUT = float(os.getenv("E2E_LEASE_TIMEOUT", "600"))
+
+RESOURCE_TAG = "lease:"
+ACCOUNT_TAG = "account:"
+
+
+class LeaseTimeout(TimeoutError):
+    pass
+
+
+@dataclass
+class Lease:
+    resource: str
+    slot: str
+    ticket: str | None  # None: inherited from the parent process, nothing to release
+    waited: float = 0.0
+
+
+def process_alive(pid: int) -> bool:
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _held() -> Dict[str, str]:
+    pairs = (item.partition("=") for item in os.getenv(HELD_ENV, "").split(",") if item)
+    return {name: slot for name, _, slot in pairs}
+
+
+def _set_held(held: Dict[str, str]) -> None:
+    os.environ[HELD_ENV] = ",".join(f"{name}={slot}" for name, slot in held.items())
+
+
+class LeaseManager:
+    """FIFO leases on named resources, shared by all processes on this machine."""
+
+    def __init__(self, lock_dir: Path = LEASE_DIR, poll: float = 0.2):
+        self.lock_dir = Path(lock_dir)
+        self.poll = poll
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, resource: str, suffix: str) -> Path:
+        return self.lock_dir / (re.sub(r"[^A-Za-z0-9_.-]+", "_", resource) + suffix)
+
+    @contextmanager
+    def _state(self, resource: str) -> Iterator[Dict[str, Any]]:
+        """Exclusive read-modify-write of the resource state."""
+        with self._path(resource, ".lock").open("a+") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            else:
+                lock.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+            try:
+                path = self._path(resource, ".json")
+                state = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+                state.setdefault("queue", [])
+                state.setdefault("held", {})
+                host = socket.gethostname()
+
+                def alive(entry: Dict[str, Any]) -> bool:
+                    return entry["host"] != host or process_alive(entry["pid"])
+
+                # Drop waiters and holders whose process is gone (killed worker, Ctrl+C).
+                state["queue"] = [entry for entry in state["queue"] if alive(entry)]
+                state["held"] = {slot: entry for slot, entry in state["held"].items() if alive(entry)}
+                try:
+                    yield state
+                finally:
+                    path.write_text(json.dumps(state, indent=1), encoding="utf-8")
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def acquire(
+        self, resource: str, slots: Sequence[str] = ("0",), timeout: float = DEFAULT_TIMEOUT, owner: str = ""
+    ) -> Lease:
+        """Wait (in arrival order) for a free slot of ``resource``; raises ``LeaseTimeout``."""
+        held = _held()
+        if resource in held:
+            return Lease(resource, held[resource], None)
+        started, wall = time.monotonic(), time.time()
+        ticket = uuid.uuid4().hex
+        entry = {"ticket": ticket, "pid": os.getpid(), "host": socket.gethostname(), "owner": owner, "since": time.time()}
+        with self._state(resource) as state:
+            state["queue"].append(entry)
+        while True:
+            with self._state(resource) as state:
+                tickets = [waiting["ticket"] for waiting in state["queue"]]
+                if ticket not in tickets:  # state file removed while waiting; rejoin at the back
+                    state["queue"].append(entry)
+                    tickets.append(ticket)
+                free = [slot for slot in slots if slot not in state["held"]]
+                if tickets.index(ticket) < len(free):
+                    slot = free[0]
+                    state["queue"] = [waiting for waiting in state["queue"] if waiting["ticket"] != ticket]
+                    state["held"][slot] = {**entry, "since": time.time()}
+                    break
+                if time.monotonic() - started > timeout:
+                    state["queue"] = [waiting for waiting in state["queue"] if waiting["ticket"] != ticket]
+                    holders = ", ".join(f"{slot}: {holder['owner'] or holder['pid']}" for slot, holder in state["held"].items())
+                    raise LeaseTimeout(f"No slot of '{resource}' became free within {timeout:.0f}s (held by {holders})")
+            time.sleep(self.poll)
+        _set_held({**_held(), resource: slot})
+        waited = time.monotonic() - started
+        if waited >= self.poll:
+            record("lease", resource, wall, slot=slot)
+        return Lease(resource, slot, ticket, waited)
+
+    def release(self, lease: Lease) -> None:
+        if lease.ticket is None:
+            return
+        with self._state(lease.resource) as state:
+            if state["held"].get(lease.slot, {}).get("ticket") == lease.ticket:
+                del state["held"][lease.slot]
+        held = _held()
+        held.pop(lease.resource, None)
+        _set_held(held)
+
+    @contextmanager
+    def hold(self, resource: str, slots: Sequence[str] = ("0",), timeout: float = DEFAULT_TIMEOUT, owner: str = ""):
+        lease = self.acquire(resource, slots, timeout, owner)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """``{resource: {"held": {...}, "queue": [...]}}`` for every resource seen on this machine."""
+        result = {}
+        for path in sorted(self.lock_dir.glob("*.json")):
+            with self._state(path.stem) as state:
+                result[path.stem] = state
+        return result
+
+
+def parse_tags(tags: Iterable[str]) -> tuple[List[str], List[str]]:
+    """``lease:<resource>`` / ``account:<role>`` tags -> (resources, roles), sorted to avoid lock-order deadlocks."""
+    resources, roles = set(), set()
+    for tag in tags:
+        lowered = tag.strip().lower()
+        if lowered.startswith(RESOURCE_TAG):
+            resources.add(lowered[len(RESOURCE_TAG):].strip())
+        elif lowered.startswith(ACCOUNT_TAG):
+            roles.add(lowered[len(ACCOUNT_TAG):].strip())
+    return sorted(filter(None, resources)), sorted(filter(None, roles))
+
+
+def acquire_all(
+    manager: LeaseManager,
+    environment: str,
+    resources: Sequence[str],
+    roles: Sequence[str],
+    owner: str = "",
+    timeout: float = DEFAULT_TIMEOUT,
+) -> List[Lease]:
+    """Lease ``resources`` and one account per role of ``environment``; exports ``E2E_ACCOUNT_<ROLE>``."""
+    leases: List[Lease] = []
+    try:
+        for resource in resources:
+            leases.append(manager.acquire(resource, timeout=timeout, owner=owner))
+        env_cfg = environment_config(environment)
+        for role in roles:
+            users = [user.get("username") for user in account_pool(env_cfg, role)]
+            if not users:
+                raise ValueError(f"No credentials for role '{role}' in {environment}.yaml")
+            lease = manager.acquire(f"account-{environment}-{role}", users, timeout, owner)
+            os.environ[leased_account_variable(role)] = lease.slot
+            leases.append(lease)
+    except BaseException:
+        release_all(manager, leases)
+        raise
+    return leases
+
+
+def release_all(manager: LeaseManager, leases: Sequence[Lease]) -> None:
+    for lease in reversed(leases):
+        if lease.ticket is not None and lease.resource.startswith("account-"):
+            role = lease.resource.split("-", 2)[2]
+            os.environ.pop(leased_account_variable(role), None)
+        manager.release(lease)
+
+
+class resource_leases:
+    """Robot Framework listener (API v3) holding the leases a suite's tests declare in their tags."""
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(self, timeout: str | None = None):
+        self.timeout = float(timeout) if timeout else DEFAULT_TIMEOUT
+        self.manager: LeaseManager | None = None
+        self._stack: List[List[Lease]] = []
+
+    def start_suite(self, data, result):
+        from robot.api import logger
+        from robot.libraries.BuiltIn import BuiltIn
+
+        builtin = BuiltIn()
+        # Tags may use suite variables, e.g. account:${USER_ROLE}.
+        resources, roles = parse_tags(builtin.replace_variables(tag) for test in data.tests for tag in test.tags)
+        if not resources and not roles:
+            self._stack.append([])
+            return
+        environment = builtin.get_variable_value("${ENV}") or os.getenv("E2E_ENV", "dev")
+        self.manager = self.manager or LeaseManager()
+        owner = f"{data.longname} (pid {os.getpid()})"
+        leases = acquire_all(self.manager, environment, resources, roles, owner, self.timeout)
+        self._stack.append(leases)
+        for lease in leases:
+            logger.info(f"Leased {lease.resource} [{lease.slot}] after {lease.waited:.1f}s", also_console=lease.waited > 1)
+
+    def end_suite(self, data, result):
+        leases = self._stack.pop() if self._stack else []
+        if leases:
+            release_all(self.manager, leases)
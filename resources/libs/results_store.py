@@ -0,0 +1,226 @@
+"""Persistent results store and trend dashboard for ``reports/``.
+
+Every run directory (``<env>-<platform>-<timestamp>``, or
+``fanout-<platform>-<timestamp>/<env>[-<role>]``) is parsed once with
+``run_report.load_results`` and stored in SQLite; a directory is parsed
+again only when its result files change. The dashboard is rendered from
+SQL aggregates, so regenerating it after each run is cheap::
+
+    with open_store(Path("reports/results.sqlite")) as conn:
+        index_reports(conn, Path("reports"))
+        write_dashboard(conn, Path("reports/trends.html"))
+"""
+from __future__ import annotations
+
+import html
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    from run_report import load_results, summarize
+except ImportError:  # imported as resources.libs.results_store
+    from .run_report import load_results, summarize
+
+RUN_DIR = re.compile(r"^(?P<env>.+)-(?P<platform>[^-]+)-(?P<ts>\d{8}_\d{6})$")
+FANOUT_DIR = re.compile(r"^fanout-(?P<platform>[^-]+)-(?P<ts>\d{8}_\d{6})$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,  -- relative to the reports directory
+    signature TEXT NOT NULL,
+    env TEXT, platform TEXT, role TEXT, started TEXT,
+    total INTEGER, passed INTEGER, failed INTEGER, skipped INTEGER, elapsed REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    test TEXT NOT NULL, status TEXT NOT NULL, elapsed REAL NOT NULL, message TEXT
+);
+CREATE INDEX IF NOT EXISTS results_test ON results(test, run_id);
+CREATE INDEX IF NOT EXISTS runs_series ON runs(env, platform, started);
+"""
+
+
+def open_store(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def describe_run(run_dir: Path) -> Dict[str, str] | None:
+    """env / platform / role / started from the directory naming used by ``run_tests.py``."""
+    fanout = FANOUT_DIR.match(run_dir.parent.name)
+    if fanout:
+        env, _, role = run_dir.name.partition("-")
+        platform, ts = fanout["platform"], fanout["ts"]
+    else:
+        match = RUN_DIR.match(run_dir.name)
+        if not match:
+            return None
+        env, platform, ts, role = match["env"], match["platform"], match["ts"], ""
+    started = datetime.strptime(ts, "%Y%m%d_%H%M%S").isoformat(timespec="seconds")
+    return {"env": env, "platform": platform, "role": role, "started": started}
+
+
+def result_files(run_dir: Path) -> List[Path]:
+    output_xml = run_dir / "output.xml"
+    return [output_xml] if output_xml.exists() else sorted(run_dir.glob("*.xml"))
+
+
+def find_run_dirs(reports_dir: Path) -> Iterator[Tuple[Path, Dict[str, str]]]:
+    for child in sorted(reports_dir.iterdir()) if reports_dir.exists() else []:
+        if not child.is_dir():
+            continue
+        candidates = sorted(child.iterdir()) if FANOUT_DIR.match(child.name) else [child]
+        for run_dir in candidates:
+            info = describe_run(run_dir) if run_dir.is_dir() else None
+            if info is not None:
+                yield run_dir, info
+
+
+def index_reports(conn: sqlite3.Connection, reports_dir: Path) -> int:
+    """Store runs that are new or changed since the last call; returns how many were (re)indexed."""
+    known = dict(conn.execute("SELECT path, signature FROM runs"))
+    indexed = 0
+    for run_dir, info in find_run_dirs(reports_dir):
+        files = result_files(run_dir)
+        if not files:
+            continue
+        signature = ";".join(f"{path.name}:{path.stat().st_size}:{path.stat().st_mtime_ns}" for path in files)
+        key = run_dir.relative_to(reports_dir).as_posix()
+        if known.get(key) == signature:
+            continue
+        try:
+            records = load_results(run_dir)
+        except Exception:  # noqa: BLE001 - a run still being written; picked up next time
+            continue
+        summary = summarize(records)
+        with conn:
+            conn.execute("DELETE FROM runs WHERE path = ?", (key,))
+            run_id = conn.execute(
+                "INSERT INTO runs (path, signature, env, platform, role, started, total, passed, failed, skipped, elapsed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, signature, info["env"], info["platform"], info["role"], info["started"],
+                    summary["total"], summary["passed"], summary["failed"], summary["skipped"], summary["elapsed_seconds"],
+                ),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO results (run_id, test, status, elapsed, message) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, record.key, record.status, record.elapsed, record.message[:500]) for record in records],
+            )
+        indexed += 1
+    return indexed
+
+
+def series(conn: sqlite3.Connection, last_runs: int = 50) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+    """Newest ``last_runs`` runs per (env, platform), oldest first."""
+    rows = conn.execute(
+        "SELECT id, env, platform, role, started, passed, failed, skipped, elapsed FROM ("
+        " SELECT *, ROW_NUMBER() OVER (PARTITION BY env, platform ORDER BY started DESC, id DESC) AS n FROM runs"
+        ") WHERE n <= ? ORDER BY env, platform, started, id",
+        (last_runs,),
+    )
+    result: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for run_id, env, platform, role, started, passed, failed, skipped, elapsed in rows:
+        executed = passed + failed
+        result.setdefault((env, platform), []).append(
+            {
+                "id": run_id,
+                "role": role,
+                "started": started,
+                "passed": passed,
+                "failed": failed,
+                "pass_rate": passed / executed if executed else None,
+                "elapsed": elapsed,
+            }
+        )
+    return result
+
+
+def test_history(conn: sqlite3.Connection, run_ids: List[int]) -> Dict[str, Dict[int, Tuple[str, float]]]:
+    """``{test: {run_id: (status, elapsed)}}`` for the given runs."""
+    history: Dict[str, Dict[int, Tuple[str, float]]] = {}
+    if not run_ids:
+        return history
+    placeholders = ",".join("?" * len(run_ids))
+    for test, run_id, status, elapsed in conn.execute(
+        f"SELECT test, run_id, status, elapsed FROM results WHERE run_id IN ({placeholders})", run_ids
+    ):
+        history.setdefault(test, {})[run_id] = (status, elapsed)
+    return history
+
+
+def _sparkline(values: List[float | None], width: int = 240, height: int = 36, color: str = "#1a73e8") -> str:
+    points = [(index, value) for index, value in enumerate(values) if value is not None]
+    if not points:
+        return ""
+    top = max(value for _, value in points) or 1.0
+    step = width / max(len(values) - 1, 1)
+    path = " ".join(f"{index * step:.1f},{height - 2 - (value / top) * (height - 4):.1f}" for index, value in points)
+    return (
+        f'<svg width="{width}" height="{height}"><polyline fill="none" stroke="{color}" stroke-width="1.5" '
+        f'points="{path}"/></svg>'
+    )
+
+
+def _status_strip(statuses: List[str | None]) -> str:
+    colors = {"PASS": "#34a853", "FAIL": "#ea4335", "SKIP": "#9aa0a6", None: "#f1f3f4"}
+    cells = "".join(
+        f'<rect x="{index * 7}" y="0" width="6" height="14" fill="{colors.get(status, "#f1f3f4")}"/>'
+        for index, status in enumerate(statuses)
+    )
+    return f'<svg width="{len(statuses) * 7}" height="14">{cells}</svg>'
+
+
+def write_dashboard(conn: sqlite3.Connection, output: Path, last_runs: int = 50) -> Path:
+    """Static HTML with pass-rate / duration trends per env+platform and per-test history."""
+    esc = html.escape
+    sections = []
+    for (env, platform), runs in series(conn, last_runs).items():
+        run_ids = [run["id"] for run in runs]
+        latest = runs[-1]
+        rate = latest["pass_rate"]
+        rows = []
+        for test, history in sorted(test_history(conn, run_ids).items()):
+            statuses = [history.get(run_id, (None, None))[0] for run_id in run_ids]
+            durations = [history[run_id][1] if run_id in history else None for run_id in run_ids]
+            executed = [status for status in statuses if status in ("PASS", "FAIL")]
+            test_rate = sum(status == "PASS" for status in executed) / len(executed) if executed else None
+            last = next((value for value in reversed(durations) if value is not None), None)
+            rows.append(
+                f"<tr><td>{esc(test)}</td><td>{_status_strip(statuses)}</td>"
+                f"<td>{'' if test_rate is None else f'{100 * test_rate:.0f}%'}</td>"
+                f"<td>{_sparkline(durations, 160, 24)}</td><td>{'' if last is None else f'{last:.2f}s'}</td></tr>"
+            )
+        sections.append(
+            f"<h2>{esc(env)} / {esc(platform)}</h2>"
+            f"<p>{len(runs)} runs, latest {esc(latest['started'])}: "
+            f"{latest['passed']}/{latest['passed'] + latest['failed']} passed"
+            f"{'' if rate is None else f' ({100 * rate:.1f}%)'}, {latest['elapsed']:.1f}s</p>"
+            f"<table><tr><th>Pass rate</th><th>Total duration</th></tr><tr>"
+            f"<td>{_sparkline([run['pass_rate'] for run in runs], color='#34a853')}</td>"
+            f"<td>{_sparkline([run['elapsed'] for run in runs])}</td></tr></table>"
+            f"<table><tr><th>Test</th><th>History (oldest → newest)</th><th>Pass rate</th><th>Duration</th><th>Last</th></tr>"
+            f"{''.join(rows)}</table>"
+        )
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Test trends</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 1.5em; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: middle; }}
+</style></head><body>
+<h1>Test trends</h1>
+<p>Generated {datetime.now().isoformat(timespec="seconds")} from the last {last_runs} runs per environment and platform.</p>
+{''.join(sections) or '<p>No runs indexed yet.</p>'}
+</body></html>
+"""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(page, encoding="utf-8")
+    return output
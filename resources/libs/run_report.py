@@ -0,0 +1,189 @@
+"""Read Robot/pytest results and compare runs.
+
+``run_tests.py`` writes one report directory per run (``output.xml`` for
+Robot, JUnit XML for pytest). This module turns either format into a flat
+list of ``TestRecord`` and builds the combined comparison report used when
+the runner fans out over several environments / user roles::
+
+    runs = {"dev": load_results(Path("reports/fanout-.../dev-web")), ...}
+    comparison = compare_runs(runs)
+    write_comparison(comparison, Path("reports/fanout-..."))
+"""
+from __future__ import annotations
+
+import html
+import json
+import statistics
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+@dataclass
+class TestRecord:
+    name: str
+    suite: str
+    status: str  # PASS / FAIL / SKIP
+    elapsed: float  # seconds
+    tags: List[str] = field(default_factory=list)
+    message: str = ""
+    start: str = ""
+
+    @property
+    def key(self) -> str:
+        return f"{self.suite}.{self.name}"
+
+
+def load_robot_results(output_xml: Path) -> List[TestRecord]:
+    from robot.api import ExecutionResult
+
+    records: List[TestRecord] = []
+    result = ExecutionResult(str(output_xml))
+
+    def visit(suite) -> None:
+        for test in suite.tests:
+            records.append(
+                TestRecord(
+                    name=test.name,
+                    suite=suite.longname,
+                    status=test.status,
+                    elapsed=test.elapsedtime / 1000.0,
+                    tags=list(test.tags),
+                    message=test.message,
+                    start=test.starttime or "",
+                )
+            )
+        for child in suite.suites:
+            visit(child)
+
+    visit(result.suite)
+    return records
+
+
+def load_junit_results(junit_xml: Path) -> List[TestRecord]:
+    records: List[TestRecord] = []
+    for case in ET.parse(junit_xml).getroot().iter("testcase"):
+        status, message = "PASS", ""
+        for child in case:
+            if child.tag in ("failure", "error"):
+                status, message = "FAIL", child.get("message", "")
+            elif child.tag == "skipped":
+                status, message = "SKIP", child.get("message", "")
+        records.append(
+            TestRecord(
+                name=case.get("name", ""),
+                suite=case.get("classname", ""),
+                status=status,
+                elapsed=float(case.get("time", 0) or 0),
+                message=message,
+            )
+        )
+    return records
+
+
+def load_results(report_dir: Path) -> List[TestRecord]:
+    """All results in a report directory (``output.xml`` and/or ``*.xml`` JUnit files)."""
+    output_xml = report_dir / "output.xml"
+    if output_xml.exists():
+        return load_robot_results(output_xml)
+    records: List[TestRecord] = []
+    for junit in sorted(report_dir.glob("*.xml")):
+        records.extend(load_junit_results(junit))
+    return records
+
+
+def summarize(records: List[TestRecord]) -> Dict[str, Any]:
+    passed = sum(record.status == "PASS" for record in records)
+    failed = sum(record.status == "FAIL" for record in records)
+    executed = passed + failed
+    elapsed = [record.elapsed for record in records if record.status != "SKIP"]
+    return {
+        "total": len(records),
+        "passed": passed,
+        "failed": failed,
+        "skipped": len(records) - executed,
+        "pass_rate": round(passed / executed, 4) if executed else None,
+        "elapsed_seconds": round(sum(elapsed), 3),
+        "median_test_seconds": round(statistics.median(elapsed), 3) if elapsed else None,
+    }
+
+
+def compare_runs(runs: Dict[str, List[TestRecord]]) -> Dict[str, Any]:
+    """Per-run summaries plus per-test status/latency; deltas are against the first run."""
+    labels = list(runs)
+    baseline = labels[0] if labels else None
+    tests: Dict[str, Dict[str, Any]] = {}
+    for label, records in runs.items():
+        for record in records:
+            row = tests.setdefault(record.key, {"test": record.key, "runs": {}})
+            row["runs"][label] = {"status": record.status, "elapsed": round(record.elapsed, 3)}
+
+    for row in tests.values():
+        base = row["runs"].get(baseline)
+        statuses = {run["status"] for run in row["runs"].values()}
+        row["consistent"] = len(statuses) == 1 and len(row["runs"]) == len(labels)
+        for label, run in row["runs"].items():
+            if base and label != baseline and base["elapsed"] > 0:
+                run["delta_seconds"] = round(run["elapsed"] - base["elapsed"], 3)
+                run["delta_pct"] = round(100 * (run["elapsed"] - base["elapsed"]) / base["elapsed"], 1)
+
+    return {
+        "baseline": baseline,
+        "runs": {label: summarize(records) for label, records in runs.items()},
+        "tests": sorted(tests.values(), key=lambda row: (row["consistent"], row["test"])),
+    }
+
+
+def write_comparison(comparison: Dict[str, Any], output_dir: Path) -> Path:
+    """Write ``comparison.json`` and ``comparison.html``; returns the HTML path."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "comparison.json").write_text(json.dumps(comparison, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    labels = list(comparison["runs"])
+    esc = html.escape
+
+    def seconds(value: float | None) -> str:
+        return "" if value is None else f"{value:.2f}s"
+
+    def percent(value: float | None) -> str:
+        return "" if value is None else f"{100 * value:.1f}%"
+
+    summary_rows = "".join(
+        f"<tr><td>{esc(label)}</td><td>{s['passed']}/{s['passed'] + s['failed']}</td><td>{percent(s['pass_rate'])}</td>"
+        f"<td>{s['skipped']}</td><td>{seconds(s['elapsed_seconds'])}</td><td>{seconds(s['median_test_seconds'])}</td></tr>"
+        for label, s in comparison["runs"].items()
+    )
+
+    def cell(run: Dict[str, Any] | None) -> str:
+        if run is None:
+            return '<td class="missing">—</td>'
+        delta = ""
+        if "delta_pct" in run:
+            delta = f" <small>({run['delta_seconds']:+.2f}s, {run['delta_pct']:+.0f}%)</small>"
+        return f'<td class="{run["status"].lower()}">{run["status"]} {run["elapsed"]:.2f}s{delta}</td>'
+
+    test_rows = "".join(
+        f"<tr><td>{esc(row['test'])}</td>{''.join(cell(row['runs'].get(label)) for label in labels)}</tr>"
+        for row in comparison["tests"]
+    )
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Environment comparison</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; }}
+.pass {{ background: #e6f4ea; }} .fail {{ background: #fce8e6; }} .skip, .missing {{ background: #f1f3f4; }}
+</style></head><body>
+<h1>Environment comparison</h1>
+<p>Latency deltas are relative to <b>{esc(comparison['baseline'] or '')}</b>. Tests whose status differs between runs are listed first.</p>
+<table><tr><th>Run</th><th>Passed</th><th>Pass rate</th><th>Skipped</th><th>Total time</th><th>Median test</th></tr>
+{summary_rows}</table>
+<table><tr><th>Test</th>{''.join(f'<th>{esc(label)}</th>' for label in labels)}</tr>
+{test_rows}</table>
+</body></html>
+"""
+    path = output_dir / "comparison.html"
+    path.write_text(page, encoding="utf-8")
+    return path
+
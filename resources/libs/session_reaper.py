@@ -0,0 +1,179 @@
+"""Ledger of the WebDriver sessions test processes open, and a reaper for orphans.
+
+When a test process crashes, ``Close Browser`` / ``driver.quit()`` never
+runs and the grid slot stays occupied until the node's session timeout
+(``SE_NODE_SESSION_TIMEOUT``, or ``newCommandTimeout`` on Appium /
+WinAppDriver) expires. A 4-slot node quietly runs with 2 or 3.
+
+Every session a test process creates is written to
+``.cache/sessions/<hash>.json`` (``E2E_SESSION_LEDGER``) by the command log in
+``resources/libs/watchdog.py``: always for pytest, and for Robot runs with
+``run_tests.py --watchdog``. The file is removed when the session is
+deleted, and its mtime follows the session's last command. ``reap`` takes
+the entries whose owner process is gone and checks the endpoint (grid
+``/status`` slots, or ``/sessions`` on Appium / WinAppDriver). Sessions that
+are still open are deleted. Each reclaimed session reports the slot-seconds
+it would otherwise have held: its timeout minus the time since its last
+command.
+
+``run_tests.py`` reaps after every worker and Robot run and writes
+``reaped.json`` to the report directory. ``tools/session_reaper.py --watch``
+does the same periodically.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+import requests
+
+try:
+    from resource_leases import process_alive
+except ImportError:  # imported as resources.libs.session_reaper
+    from .resource_leases import process_alive
+
+ROOT = Path(__file__).resolve().parents[2]
+LEDGER_DIR = Path(os.getenv("E2E_SESSION_LEDGER") or ROOT / ".cache" / "sessions")
+# SE_NODE_SESSION_TIMEOUT in docker-compose.yaml; Appium sessions carry newCommandTimeout.
+DEFAULT_SESSION_TIMEOUT = 300.0
+
+
+def session_timeout(capabilities: Dict[str, Any]) -> float:
+    for key in ("appium:newCommandTimeout", "newCommandTimeout"):
+        if capabilities.get(key):
+            return float(capabilities[key])
+    return DEFAULT_SESSION_TIMEOUT
+
+
+def requested_capabilities(payload: Any) -> Dict[str, Any]:
+    """Capabilities of a new-session request body (W3C or JSONWP, dict or JSON text)."""
+    if isinstance(payload, (str, bytes)):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return {}
+    if not isinstance(payload, dict):
+        return {}
+    w3c = payload.get("capabilities") or {}
+    merged = {**(w3c.get("alwaysMatch") or {}), **((w3c.get("firstMatch") or [{}])[0])}
+    return merged or payload.get("desiredCapabilities") or {}
+
+
+class SessionLedger:
+    """One file per open session; the mtime is the session's last activity."""
+
+    def __init__(self, directory: Path = LEDGER_DIR, touch_interval: float = 5.0):
+        self.directory = Path(directory)
+        self.touch_interval = touch_interval
+        self._touched: Dict[str, float] = {}
+
+    def _path(self, session_url: str) -> Path:
+        return self.directory / (hashlib.sha1(session_url.encode("utf-8")).hexdigest()[:16] + ".json")
+
+    def opened(self, session_url: str, capabilities: Dict[str, Any] | None = None) -> None:
+        remote_url, _, session_id = session_url.rpartition("/session/")
+        entry = {
+            "session_id": session_id,
+            "session_url": session_url,
+            "remote_url": remote_url,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "created": time.time(),
+            "timeout": session_timeout(capabilities or {}),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path(session_url).write_text(json.dumps(entry), encoding="utf-8")
+        self._touched[session_url] = time.monotonic()
+
+    def touch(self, session_url: str) -> None:
+        last = self._touched.get(session_url)
+        if last is None or time.monotonic() - last < self.touch_interval:
+            return
+        self._touched[session_url] = time.monotonic()
+        try:
+            os.utime(self._path(session_url))
+        except FileNotFoundError:
+            pass
+
+    def closed(self, session_url: str) -> None:
+        self._touched.pop(session_url, None)
+        self._path(session_url).unlink(missing_ok=True)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        result = []
+        for path in sorted(self.directory.glob("*.json")) if self.directory.exists() else []:
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                entry["last_activity"] = path.stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            result.append(entry)
+        return result
+
+
+def live_sessions(remote_url: str, timeout: float = 5.0) -> Set[str] | None:
+    """Session ids the endpoint reports as open; None when it cannot tell."""
+    base = remote_url.rstrip("/")
+    try:
+        value = requests.get(f"{base}/status", timeout=timeout).json().get("value") or {}
+        if "nodes" in value:  # Selenium Grid 4
+            return {
+                slot["session"]["sessionId"]
+                for node in value["nodes"]
+                for slot in node.get("slots", [])
+                if slot.get("session")
+            }
+        sessions = requests.get(f"{base}/sessions", timeout=timeout)
+        if sessions.status_code == 200:  # Appium 1 / WinAppDriver
+            return {item.get("id") for item in sessions.json().get("value") or []}
+    except (requests.RequestException, ValueError, AttributeError, KeyError):
+        pass
+    return None
+
+
+def reap(ledger: SessionLedger | None = None) -> Dict[str, Any]:
+    """Delete the open sessions whose owner process has exited; returns what was reclaimed."""
+    ledger = ledger or SessionLedger()
+    host = socket.gethostname()
+    now = time.time()
+    orphans = [entry for entry in ledger.entries() if entry["host"] == host and not process_alive(entry["pid"])]
+    live: Dict[str, Set[str] | None] = {}
+    reclaimed, expired = [], 0
+    for entry in orphans:
+        remote = entry["remote_url"]
+        if remote not in live:
+            live[remote] = live_sessions(remote)
+        known = live[remote]
+        if known is None or entry["session_id"] in known:
+            try:
+                response = requests.delete(entry["session_url"], timeout=10)
+                deleted = response.status_code < 400
+            except requests.RequestException:
+                deleted = False
+            if deleted:
+                idle = now - entry["last_activity"]
+                reclaimed.append(
+                    {
+                        "session_id": entry["session_id"],
+                        "remote_url": remote,
+                        "owner_pid": entry["pid"],
+                        "idle_seconds": round(idle, 1),
+                        "slot_seconds": round(max(0.0, entry["timeout"] - idle), 1),
+                    }
+                )
+            else:
+                expired += 1
+        else:
+            expired += 1  # the server already let it go
+        ledger.closed(entry["session_url"])
+    return {
+        "checked": len(orphans),
+        "reclaimed": reclaimed,
+        "expired": expired,
+        "slot_seconds": round(sum(item["slot_seconds"] for item in reclaimed), 1),
+    }
@@ -0,0 +1,326 @@
+"""Worker utilization timeline for a run.
+
+Runner, fixtures and listeners append spans to ``timeline.jsonl`` in the
+report directory (``E2E_TIMELINE``; the lane is ``E2E_WORKER``):
+
+* ``unit`` - a pytest worker process or fan-out job, as started by ``run_tests.py``;
+* ``queue`` - a worker waiting for a free endpoint slot (``max_sessions``);
+* ``test`` - one test, setup and teardown included;
+* ``session`` - a new WebDriver session being created (``watchdog.CommandLog``);
+* ``lease`` - waiting for a resource / account lease (``resource_leases``).
+
+Robot runs record test spans through the ``timeline`` listener
+(``run_tests.py --timeline``, always for fan-out). Report directories
+without ``timeline.jsonl`` fall back to the test times in ``output.xml`` or
+the JUnit files. ``analyze`` splits every worker's wall time
+into one state per instant (lease > session > test > overhead > queue > idle)
+and gives each worker its utilization (time running tests) and critical path
+(the spans that decided when it finished). The run's makespan is compared
+with what more workers could achieve at best, max(longest unit,
+work / workers), which tells whether adding workers, or nodes and lease slots,
+would help::
+
+    analysis = analyze(load_spans(Path("reports/fake-pytest-20240101_120000")))
+    write_timeline(analysis, Path("reports/fake-pytest-20240101_120000"))
+"""
+from __future__ import annotations
+
+import html
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+TIMELINE_FILE = "timeline.jsonl"
+# Highest first: the state a worker is in when spans overlap (a lease wait happens inside a test's setup).
+STATES = ("lease", "session", "test", "overhead", "queue")
+COLORS = {
+    "lease": "#f9ab00",
+    "session": "#a142f4",
+    "test": "#1e8e3e",
+    "overhead": "#9aa0a6",
+    "queue": "#d93025",
+    "idle": "#f1f3f4",
+}
+
+
+@dataclass
+class Span:
+    worker: str
+    kind: str  # unit / queue / test / session / lease
+    name: str
+    start: float  # epoch seconds
+    end: float
+    info: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return max(0.0, self.end - self.start)
+
+
+def record(
+    kind: str,
+    name: str,
+    start: float,
+    end: float | None = None,
+    worker: str | None = None,
+    path: Path | str | None = None,
+    **info: Any,
+) -> None:
+    """Append one span to ``path`` / ``E2E_TIMELINE``; a no-op outside ``run_tests.py`` runs."""
+    path = path or os.getenv("E2E_TIMELINE")
+    if not path:
+        return
+    event = {
+        "worker": worker or os.getenv("E2E_WORKER") or f"pid{os.getpid()}",
+        "kind": kind,
+        "name": name,
+        "start": round(start, 3),
+        "end": round(time.time() if end is None else end, 3),
+        **info,
+    }
+    # One short O_APPEND write per line, so concurrent workers do not interleave.
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+def _robot_time(value: str) -> float:
+    return datetime.strptime(value, "%Y%m%d %H:%M:%S.%f").timestamp()
+
+
+def _spans_from_results(report_dir: Path) -> List[Span]:
+    """Test spans from ``output.xml`` / JUnit files, for runs recorded without a timeline."""
+    spans: List[Span] = []
+    output_xml = report_dir / "output.xml"
+    if output_xml.exists():
+        from robot.api import ExecutionResult
+
+        def visit(suite) -> None:
+            for test in suite.tests:
+                if test.starttime and test.endtime and test.starttime != "N/A":
+                    spans.append(
+                        Span("robot", "test", test.longname, _robot_time(test.starttime), _robot_time(test.endtime), {"status": test.status})
+                    )
+            for child in suite.suites:
+                visit(child)
+
+        visit(ExecutionResult(str(output_xml)).suite)
+        return spans
+    for junit in sorted(report_dir.glob("*.xml")):
+        worker = junit.stem.split("-")[0]
+        for suite in ET.parse(junit).getroot().iter("testsuite"):
+            if not suite.get("timestamp"):
+                continue
+            cursor = datetime.fromisoformat(suite.get("timestamp")).timestamp()
+            for case in suite.iter("testcase"):
+                seconds = float(case.get("time", 0) or 0)
+                name = f"{case.get('classname', '')}::{case.get('name', '')}"
+                status = "FAIL" if case.find("failure") is not None or case.find("error") is not None else "PASS"
+                spans.append(Span(worker, "test", name, cursor, cursor + seconds, {"status": status}))
+                cursor += seconds
+    return spans
+
+
+def load_spans(report_dir: Path) -> List[Span]:
+    path = report_dir / TIMELINE_FILE
+    if not path.exists():
+        return _spans_from_results(report_dir)
+    spans = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue  # a worker killed mid-write
+        fixed = {key: event.pop(key) for key in ("worker", "kind", "name", "start", "end")}
+        spans.append(Span(**fixed, info=event))
+    return spans
+
+
+def _states(spans: List[Span], start: float, end: float) -> List[tuple[float, float, str]]:
+    """Cut [start, end] at every span boundary; each piece gets the highest-priority state covering it."""
+    ranked = {"unit": "overhead"}
+    edges = sorted({start, end, *(s.start for s in spans), *(s.end for s in spans)})
+    pieces: List[tuple[float, float, str]] = []
+    for left, right in zip(edges, edges[1:]):
+        if right <= start or left >= end:
+            continue
+        covering = {ranked.get(s.kind, s.kind) for s in spans if s.start <= left and s.end >= right}
+        state = next((name for name in STATES if name in covering), "idle")
+        if pieces and pieces[-1][2] == state:
+            pieces[-1] = (pieces[-1][0], right, state)
+        else:
+            pieces.append((left, right, state))
+    return pieces
+
+
+def analyze(spans: List[Span]) -> Dict[str, Any]:
+    if not spans:
+        return {"workers": {}, "makespan": 0.0, "advice": ["No spans recorded."]}
+    run_start = min(span.start for span in spans)
+    run_end = max(span.end for span in spans)
+    makespan = run_end - run_start
+    workers: Dict[str, Dict[str, Any]] = {}
+    for name in sorted({span.worker for span in spans}):
+        own = [span for span in spans if span.worker == name]
+        pieces = _states(own, run_start, run_end)
+        totals = {state: 0.0 for state in (*STATES, "idle")}
+        for left, right, state in pieces:
+            totals[state] += right - left
+        finish = max(span.end for span in own)
+        # Units when the runner recorded them, else the tests: back to back they decide when the worker finished.
+        top = sorted([span for span in own if span.kind == "unit"] or [span for span in own if span.kind == "test"], key=lambda s: s.start)
+        path = [{"name": span.name, "kind": span.kind, "seconds": round(span.seconds, 2)} for span in top]
+        workers[name] = {
+            "utilization": round(totals["test"] / makespan, 4) if makespan else 0.0,
+            "states": {state: round(seconds, 2) for state, seconds in totals.items()},
+            "finish": round(finish - run_start, 2),
+            "tail_idle": round(run_end - finish, 2),
+            "critical_path": path,
+            "longest": sorted(
+                ({"name": span.name, "seconds": round(span.seconds, 2)} for span in own if span.kind == "test"),
+                key=lambda item: -item["seconds"],
+            )[:5],
+            "pieces": [(round(left - run_start, 3), round(right - run_start, 3), state) for left, right, state in pieces],
+        }
+
+    units = [span for span in spans if span.kind == "unit"] or [span for span in spans if span.kind == "test"]
+    longest = max(units, key=lambda span: span.seconds)
+    # Active time, not the sum of spans: Robot keywords may run a whole pytest session inside one test.
+    work = sum(makespan - worker["states"]["idle"] - worker["states"]["queue"] for worker in workers.values())
+    count = len(workers)
+    waits = {state: sum(worker["states"][state] for worker in workers.values()) for state in ("lease", "session", "queue")}
+    critical = max(workers, key=lambda name: workers[name]["finish"])
+    busy = sum(worker["states"]["test"] for worker in workers.values()) or 1.0
+    slot_bound = waits["queue"] + waits["session"] > 0.2 * busy
+    advice = []
+    if longest.seconds >= 0.8 * makespan:
+        advice.append(
+            f"Bounded by one unit: {longest.name} ({longest.seconds:.1f}s of {makespan:.1f}s); "
+            "more workers or nodes will not help, split it instead."
+        )
+    elif slot_bound:
+        advice.append(
+            f"Workers waited {waits['queue']:.1f}s for an endpoint slot and {waits['session']:.1f}s for new sessions: "
+            f"more grid nodes / max_sessions would help, more workers alone would not "
+            f"(best case {max(longest.seconds, work / count):.1f}s with {count} workers, now {makespan:.1f}s)."
+        )
+    else:
+        advice.append(
+            f"With {count + 1} workers the run could take {max(longest.seconds, work / (count + 1)):.1f}s at best "
+            f"(now {makespan:.1f}s; longest unit {longest.seconds:.1f}s, {work:.1f}s of work)."
+        )
+    if waits["lease"] > 0.2 * busy:
+        advice.append(f"Workers waited {waits['lease']:.1f}s on leases: add lease slots (e.g. accounts to the pool).")
+    return {
+        "started": run_start,
+        "makespan": round(makespan, 2),
+        "critical_worker": critical,
+        "mean_utilization": round(sum(w["utilization"] for w in workers.values()) / count, 4),
+        "waits": {state: round(seconds, 2) for state, seconds in waits.items()},
+        "workers": workers,
+        "advice": advice,
+        "spans": [asdict(span) for span in spans if span.kind != "unit"],
+    }
+
+
+def format_summary(analysis: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"makespan {analysis['makespan']:.1f}s, mean utilization {100 * analysis.get('mean_utilization', 0):.0f}%, "
+        f"critical worker {analysis.get('critical_worker', '-')}"
+    ]
+    for name, worker in analysis["workers"].items():
+        waits = ", ".join(f"{state} {worker['states'][state]:.1f}s" for state in ("lease", "session", "queue", "idle") if worker["states"][state] >= 0.1)
+        lines.append(f"   {name:<12} {100 * worker['utilization']:5.1f}% busy, done at {worker['finish']:.1f}s  {waits}")
+    lines.extend(f"   → {line}" for line in analysis["advice"])
+    return lines
+
+
+def write_timeline(analysis: Dict[str, Any], output_dir: Path) -> Path:
+    """Write ``timeline.json`` and the Gantt chart ``timeline.html``; returns the HTML path."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "timeline.json").write_text(json.dumps(analysis, indent=1, ensure_ascii=False), encoding="utf-8")
+
+    esc = html.escape
+    total = analysis["makespan"] or 1.0
+    started = analysis.get("started", 0.0)
+
+    def bar(left: float, right: float, color: str, title: str, top: int, height: int) -> str:
+        return (
+            f'<div title="{esc(title)}" style="left:{100 * left / total:.3f}%;width:{max(0.05, 100 * (right - left) / total):.3f}%;'
+            f'top:{top}px;height:{height}px;background:{color}"></div>'
+        )
+
+    rows = []
+    for name, worker in analysis["workers"].items():
+        bars = [bar(left, right, COLORS[state], f"{state} {right - left:.2f}s", 0, 22) for left, right, state in worker["pieces"]]
+        for span in analysis["spans"]:
+            if span["worker"] == name and span["kind"] == "test":
+                failed = span["info"].get("status") == "FAIL"
+                bars.append(
+                    bar(span["start"] - started, span["end"] - started, "#d93025" if failed else "#137333",
+                        f"{span['name']} {span['end'] - span['start']:.2f}s", 24, 6)
+                )
+        rows.append(
+            f'<tr><th>{esc(name)}</th><td class="lane">{"".join(bars)}</td>'
+            f"<td>{100 * worker['utilization']:.0f}%</td></tr>"
+        )
+
+    def path_cell(worker: Dict[str, Any]) -> str:
+        steps = sorted(worker["critical_path"], key=lambda step: -step["seconds"])[:5]
+        return "<br>".join(f"{esc(step['name'])} <small>{step['seconds']:.1f}s</small>" for step in steps)
+
+    state_names = (*STATES, "idle")
+    table = "".join(
+        f"<tr><td>{esc(name)}{' ★' if name == analysis['critical_worker'] else ''}</td><td>{100 * w['utilization']:.1f}%</td>"
+        + "".join(f"<td>{w['states'][state]:.1f}s</td>" for state in state_names)
+        + f"<td>{w['finish']:.1f}s</td><td>{path_cell(w)}</td></tr>"
+        for name, w in analysis["workers"].items()
+    )
+    legend = " ".join(f'<span style="background:{COLORS[state]}">&nbsp;{state}&nbsp;</span>' for state in state_names)
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Worker timeline</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; width: 100%; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }}
+td.lane {{ position: relative; height: 32px; width: 80%; padding: 0; }}
+td.lane div {{ position: absolute; }}
+</style></head><body>
+<h1>Worker timeline</h1>
+<p>Makespan {analysis['makespan']:.1f}s, mean utilization {100 * analysis['mean_utilization']:.0f}%. {legend}</p>
+<ul>{''.join(f'<li>{esc(line)}</li>' for line in analysis['advice'])}</ul>
+<table>{''.join(rows)}</table>
+<table><tr><th>Worker</th><th>Utilization</th>{''.join(f'<th>{state}</th>' for state in state_names)}<th>Done at</th><th>Critical path (longest steps)</th></tr>
+{table}</table>
+</body></html>
+"""
+    path = output_dir / "timeline.html"
+    path.write_text(page, encoding="utf-8")
+    return path
+
+
+class timeline:
+    """Robot Framework listener (API v3) recording each test as a timeline span."""
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(self):
+        self._started = 0.0
+
+    def start_suite(self, data, result):
+        if not os.getenv("E2E_TIMELINE"):
+            from robot.libraries.BuiltIn import BuiltIn
+
+            # Child processes started by keywords (and lease waits) write to the same file.
+            os.environ["E2E_TIMELINE"] = str(Path(BuiltIn().get_variable_value("${OUTPUT DIR}")) / TIMELINE_FILE)
+            os.environ.setdefault("E2E_WORKER", "robot")
+
+    def start_test(self, data, result):
+        self._started = time.time()
+
+    def end_test(self, data, result):
+        record("test", data.longname, self._started, status=result.status)
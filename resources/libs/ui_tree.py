@@ -0,0 +1,178 @@
+"""Evaluate desktop locators locally against a cached ``page_source``.
+
+On Mac2 and WinAppDriver every XPath ``find_element`` makes the server
+serialise and walk the live accessibility tree. ``UiTree`` fetches the
+source once per screen state, parses it with lxml and answers any number of
+lookups from that copy. Actions are resolved either to coordinates
+(``macos: click`` at the element centre) or to an element id looked up once
+through a cheap unique locator (``AutomationId`` / ``Name``) and reused for
+the rest of the session. Each click invalidates the cached tree, so the
+next read sees the new screen state.
+
+    tree = UiTree.for_winappdriver(session.base_url)
+    tree.click("name", "One")
+    assert tree.attribute(("accessibility id", "CalculatorResults"), "Name") == "Display is 1"
+
+Enabled in the desktop tests with ``E2E_TREE_CACHE=1`` (see
+``tests/python/conftest.py``).
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from lxml import etree
+
+Locator = Tuple[str, str]
+
+# (source attribute, server strategy) that identify an element cheaply.
+WINDOWS_ID_ATTRIBUTES = (("AutomationId", "accessibility id"), ("Name", "name"))
+MAC_ID_ATTRIBUTES = (("identifier", "accessibility id"),)
+
+
+def tree_cache_enabled() -> bool:
+    return os.getenv("E2E_TREE_CACHE", "").lower() in ("1", "true", "yes")
+
+
+def to_xpath(using: str, value: str) -> str:
+    literal = json.dumps(value, ensure_ascii=False)
+    if using == "xpath":
+        return value
+    if using == "name":
+        return f"//*[@Name={literal} or @name={literal}]"
+    if using == "accessibility id":
+        return f"//*[@AutomationId={literal} or @identifier={literal}]"
+    if using in ("class name", "tag name"):
+        return f"//{value}"
+    raise ValueError(f"Unsupported locator strategy for UiTree: {using}")
+
+
+def center(node: etree._Element) -> Tuple[int, int] | None:
+    try:
+        x, y, width, height = (float(node.get(key)) for key in ("x", "y", "width", "height"))
+    except (TypeError, ValueError):
+        return None
+    return int(x + width / 2), int(y + height / 2)
+
+
+class UiTree:
+    """Cached, locally queried accessibility tree for one session."""
+
+    def __init__(
+        self,
+        fetch_source: Callable[[], str],
+        locate: Callable[[str, str], Any],
+        click_element: Callable[[Any], None],
+        click_at: Callable[[int, int], None] | None = None,
+        id_attributes: Sequence[Tuple[str, str]] = (),
+    ):
+        self._fetch_source = fetch_source
+        self._locate = locate
+        self._click_element = click_element
+        self._click_at = click_at
+        self._id_attributes = id_attributes
+        self._root: etree._Element | None = None
+        self._handles: Dict[Locator, Any] = {}
+        self.stats = {"source_fetches": 0, "local_queries": 0, "server_lookups": 0, "clicks": 0}
+
+    @classmethod
+    def for_appium(cls, driver, by_coordinates: bool = True) -> "UiTree":
+        """Mac2: clicks go to the element centre via ``macos: click`` (no server lookup)."""
+        click_at = (lambda x, y: driver.execute_script("macos: click", {"x": x, "y": y})) if by_coordinates else None
+        return cls(
+            lambda: driver.page_source,
+            driver.find_element,
+            lambda element: element.click(),
+            click_at,
+            MAC_ID_ATTRIBUTES,
+        )
+
+    @classmethod
+    def for_winappdriver(cls, base_url: str, http=None) -> "UiTree":
+        """WinAppDriver over raw HTTP (see conftest.WinAppDriverSession)."""
+        import requests
+
+        http = http or requests.Session()
+
+        def locate(using: str, value: str) -> str:
+            response = http.post(f"{base_url}/element", json={"using": using, "value": value})
+            if response.status_code != 200:
+                raise LookupError(f"Failed to find element '{value}': {response.text}")
+            element = response.json().get("value")
+            return element.get("ELEMENT") or next(iter(element.values())) if isinstance(element, dict) else element
+
+        return cls(
+            lambda: http.get(f"{base_url}/source").json()["value"],
+            locate,
+            lambda element_id: http.post(f"{base_url}/element/{element_id}/click", json={}),
+            None,
+            WINDOWS_ID_ATTRIBUTES,
+        )
+
+    @property
+    def root(self) -> etree._Element:
+        if self._root is None:
+            source = self._fetch_source()
+            self._root = etree.fromstring(source.encode("utf-8") if isinstance(source, str) else source)
+            self.stats["source_fetches"] += 1
+        return self._root
+
+    def invalidate(self) -> None:
+        self._root = None
+
+    def find_all(self, using: str, value: str) -> List[etree._Element]:
+        self.stats["local_queries"] += 1
+        # Evaluated on the document so that "//" also matches the root (application / window) element.
+        matches = self.root.getroottree().xpath(to_xpath(using, value))
+        return [node for node in matches if isinstance(node, etree._Element)]
+
+    def find(self, using: str, value: str) -> etree._Element:
+        matches = self.find_all(using, value)
+        if not matches:
+            raise LookupError(f"No element matches {using}={value} in the cached tree")
+        return matches[0]
+
+    def first(self, locators: Iterable[Locator], accept: Callable[[etree._Element], bool] = lambda node: True):
+        """First node matched by any of ``locators`` (in order) that ``accept`` approves, else None."""
+        for using, value in locators:
+            for node in self.find_all(using, value):
+                if accept(node):
+                    return node
+        return None
+
+    def attribute(self, locator: Locator, name: str) -> str | None:
+        return self.find(*locator).get(name)
+
+    def click(self, using: str, value: str) -> None:
+        self._click_node(self.find(using, value))
+
+    def click_if_present(self, using: str, value: str) -> bool:
+        matches = self.find_all(using, value)
+        if matches:
+            self._click_node(matches[0])
+        return bool(matches)
+
+    def _click_node(self, node: etree._Element) -> None:
+        point = center(node) if self._click_at is not None else None
+        if point is not None:
+            self._click_at(*point)
+        else:
+            self._click_element(self._handle(node))
+        self.stats["clicks"] += 1
+        self.invalidate()
+
+    def _handle(self, node: etree._Element) -> Any:
+        """Server handle for ``node``, looked up once per unique locator."""
+        locator = self._server_locator(node)
+        if locator not in self._handles:
+            self.stats["server_lookups"] += 1
+            self._handles[locator] = self._locate(*locator)
+        return self._handles[locator]
+
+    def _server_locator(self, node: etree._Element) -> Locator:
+        for attribute, strategy in self._id_attributes:
+            value = node.get(attribute)
+            if value and len(self.root.xpath(f"//*[@{attribute}=$value]", value=value)) == 1:
+                return strategy, value
+        return "xpath", node.getroottree().getpath(node)
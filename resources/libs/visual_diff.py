@@ -0,0 +1,367 @@
+"""Compare screenshots with stored baselines.
+
+Screenshots are decoded once into ``uint8`` RGB arrays and compared with
+whole-array NumPy operations, so a full-HD frame takes a few tens of
+milliseconds and a check can run after every step:
+
+* ``pixel`` - a pixel differs when any channel differs by more than
+  ``tolerance`` (0-255); anti-aliasing noise stays under the default 16.
+* ``perceptual`` - structural similarity (SSIM) of the luminance per
+  ``block`` x ``block`` tile; a tile differs below ``min_similarity``. Robust
+  to sub-pixel shifts and font smoothing, still catches layout changes.
+  Only tiles containing a changed pixel are evaluated.
+
+Ignored regions (``x,y,w,h`` in screenshot pixels, or element locators in
+Robot) are copied from the baseline before comparing. Baselines live in
+``resources/data/baselines/<name>.png`` (``E2E_BASELINE_DIR``) and stay
+decoded in memory (``BASELINES``) for the whole run. A missing baseline is
+recorded from the current screenshot; ``E2E_UPDATE_BASELINES=1`` re-records
+them all. Failures write a heatmap: the baseline dimmed, differences in red,
+ignored regions in blue::
+
+    result = compare(driver.get_screenshot_as_png(), BASELINES.get("home"), ignore=["0,0,1920,80"])
+    assert result.passed, result.describe()
+
+Robot: ``Compare Screenshot To Baseline    home    ignore=css:.clock``.
+"""
+from __future__ import annotations
+
+import html
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parents[2]
+BASELINE_DIR = Path(os.getenv("E2E_BASELINE_DIR") or ROOT / "resources" / "data" / "baselines")
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+_REGION = re.compile(r"^\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*$")
+
+Region = Tuple[int, int, int, int]  # x, y, width, height
+
+
+def decode(image: Any) -> np.ndarray:
+    """PNG / JPEG bytes, a path or an array -> ``(height, width, 3)`` uint8 RGB."""
+    if isinstance(image, np.ndarray):
+        return image
+    source = BytesIO(image) if isinstance(image, (bytes, bytearray)) else Path(image)
+    with Image.open(source) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def encode(pixels: np.ndarray, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(pixels).save(path, compress_level=1)
+    return path
+
+
+def parse_regions(regions: Any) -> List[Region]:
+    """``"x,y,w,h;x,y,w,h"``, a list of such strings, tuples or ``{"x", "y", "width", "height"}`` dicts."""
+    if not regions:
+        return []
+    items = regions.split(";") if isinstance(regions, str) else list(regions)
+    parsed = []
+    for item in items:
+        if isinstance(item, dict):
+            parsed.append((int(item["x"]), int(item["y"]), int(item["width"]), int(item["height"])))
+        elif isinstance(item, str):
+            match = _REGION.match(item)
+            if not match:
+                raise ValueError(f"Region must be 'x,y,width,height', got '{item}'")
+            parsed.append(tuple(int(value) for value in match.groups()))
+        else:
+            parsed.append(tuple(int(value) for value in item))
+    return parsed
+
+
+def ignore_mask(shape: Tuple[int, ...], regions: Sequence[Region]) -> np.ndarray:
+    mask = np.zeros(shape[:2], dtype=bool)
+    for x, y, width, height in regions:
+        mask[max(0, y):max(0, y + height), max(0, x):max(0, x + width)] = True
+    return mask
+
+
+def _pad(values: np.ndarray, block: int) -> np.ndarray:
+    """Pad (edge) height and width up to whole ``block`` tiles."""
+    height, width = values.shape[:2]
+    if not height % block and not width % block:
+        return values
+    return np.pad(values, [(0, -height % block), (0, -width % block)] + [(0, 0)] * (values.ndim - 2), mode="edge")
+
+
+def _tile_reduce(values: np.ndarray, block: int, reduce: np.ufunc) -> np.ndarray:
+    """``reduce`` over every ``block`` x ``block`` tile of a padded 2-D array, shape ``(rows, cols)``."""
+    rows, cols = values.shape[0] // block, values.shape[1] // block
+    # Rows first, then the (now small) columns: much faster than reducing a swapped 4-D view.
+    return reduce.reduce(reduce.reduce(values.reshape(rows, block, -1), axis=1).reshape(rows, cols, block), axis=2)
+
+
+def pixel_delta(actual: np.ndarray, baseline: np.ndarray) -> np.ndarray:
+    """Largest per-channel difference of every pixel, ``(height, width)`` uint8."""
+    # max - min stays in uint8 (no widening copy of a 6 MB frame); reducing the
+    # 3-wide channel axis with .max(axis=2) is ~20x slower than two maximum() calls.
+    delta = np.maximum(actual, baseline) - np.minimum(actual, baseline)
+    return np.maximum(np.maximum(delta[..., 0], delta[..., 1]), delta[..., 2])
+
+
+def _ssim(mean_x, mean_y, var_x, var_y, covariance):
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    return ((2 * mean_x * mean_y + c1) * (2 * covariance + c2)) / ((mean_x**2 + mean_y**2 + c1) * (var_x + var_y + c2))
+
+
+def block_ssim(actual: np.ndarray, baseline: np.ndarray, block: int = 8, delta: np.ndarray | None = None) -> np.ndarray:
+    """SSIM of the luminance per tile, shape ``(rows, cols)``; tiles without a changed pixel are 1."""
+    delta = pixel_delta(actual, baseline) if delta is None else delta
+    changed = _tile_reduce(_pad(delta, block), block, np.maximum) > 0
+    ssim = np.ones(changed.shape, dtype=np.float32)
+    count = int(np.count_nonzero(changed))
+    if not count:
+        return ssim
+    if count > changed.size // 4:
+        # Mostly changed: tile sums over the whole frame beat gathering the tiles.
+        x, y = _pad(actual @ LUMA, block), _pad(baseline @ LUMA, block)
+
+        def mean(values: np.ndarray) -> np.ndarray:
+            return _tile_reduce(values, block, np.add) / (block * block)
+
+        mean_x, mean_y = mean(x), mean(y)
+        return _ssim(mean_x, mean_y, mean(x * x) - mean_x**2, mean(y * y) - mean_y**2, mean(x * y) - mean_x * mean_y)
+
+    def tiles(image: np.ndarray) -> np.ndarray:
+        padded = _pad(image, block)
+        rows, cols = padded.shape[0] // block, padded.shape[1] // block
+        return padded.reshape(rows, block, cols, block, 3).swapaxes(1, 2)[changed] @ LUMA  # (tiles, block, block)
+
+    x, y = tiles(actual), tiles(baseline)
+    mean_x, mean_y = x.mean(axis=(1, 2)), y.mean(axis=(1, 2))
+    ssim[changed] = _ssim(mean_x, mean_y, x.var(axis=(1, 2)), y.var(axis=(1, 2)), (x * y).mean(axis=(1, 2)) - mean_x * mean_y)
+    return ssim
+
+
+@dataclass
+class DiffResult:
+    mode: str
+    passed: bool
+    diff_ratio: float  # share of compared pixels that differ
+    max_diff: float
+    compared: int
+    similarity: float | None = None  # mean SSIM (perceptual)
+    size_mismatch: str = ""
+    seconds: float = 0.0
+    heatmap: Path | None = None
+    magnitude: np.ndarray | None = field(default=None, repr=False)  # per pixel: uint8 delta (pixel) or 1 - SSIM
+    ignored: np.ndarray | None = field(default=None, repr=False)
+
+    def describe(self, name: str = "screenshot") -> str:
+        if self.size_mismatch:
+            return f"{name}: {self.size_mismatch}"
+        text = f"{name}: {100 * self.diff_ratio:.3f}% of pixels differ (max {100 * self.max_diff:.3f}%, {self.mode})"
+        if self.similarity is not None:
+            text += f", mean similarity {self.similarity:.4f}"
+        return text + (f", heatmap {self.heatmap}" if self.heatmap else "")
+
+
+def compare(
+    actual: Any,
+    baseline: Any,
+    mode: str = "pixel",
+    tolerance: int = 16,
+    max_diff: float = 0.001,
+    ignore: Any = (),
+    min_similarity: float = 0.95,
+    block: int = 8,
+) -> DiffResult:
+    """Compare two screenshots; ``max_diff`` is the allowed share of differing pixels."""
+    started = time.perf_counter()
+    actual, baseline = decode(actual), decode(baseline)
+    if actual.shape != baseline.shape:
+        return DiffResult(
+            mode, False, 1.0, max_diff, 0,
+            size_mismatch=f"size {actual.shape[1]}x{actual.shape[0]} != baseline {baseline.shape[1]}x{baseline.shape[0]}",
+            seconds=time.perf_counter() - started,
+        )
+    regions = parse_regions(ignore)
+    ignored = ignore_mask(actual.shape, regions)
+    compared = int(ignored.size - np.count_nonzero(ignored))
+    if regions:
+        actual = actual.copy()
+        for x, y, width, height in regions:  # slices, not the boolean mask: ~30x faster
+            area = (slice(max(0, y), max(0, y + height)), slice(max(0, x), max(0, x + width)))
+            actual[area] = baseline[area]
+
+    if mode not in ("pixel", "perceptual"):
+        raise ValueError(f"Unknown diff mode '{mode}' (pixel or perceptual)")
+    delta = pixel_delta(actual, baseline)
+    if mode == "pixel":
+        differing = int(np.count_nonzero(delta > tolerance))
+        ratio = differing / compared if compared else 0.0
+        return DiffResult(
+            mode, ratio <= max_diff, ratio, max_diff, compared, seconds=time.perf_counter() - started,
+            magnitude=delta if differing else None, ignored=ignored,
+        )
+    ssim = block_ssim(actual, baseline, block, delta)
+    failing = ssim < min_similarity
+    height, width = actual.shape[:2]
+    magnitude = np.repeat(np.repeat(np.clip(1.0 - ssim, 0.0, 1.0), block, axis=0), block, axis=1)[:height, :width]
+    magnitude[ignored] = 0.0
+    differing = int(np.count_nonzero(np.repeat(np.repeat(failing, block, axis=0), block, axis=1)[:height, :width] & ~ignored))
+    ratio = differing / compared if compared else 0.0
+    return DiffResult(
+        mode, ratio <= max_diff, ratio, max_diff, compared, float(ssim.mean()),
+        seconds=time.perf_counter() - started, magnitude=magnitude if failing.any() else None, ignored=ignored,
+    )
+
+
+def heatmap(baseline: Any, result: DiffResult) -> np.ndarray:
+    """Baseline dimmed to gray, differences in red (brighter = larger), ignored regions in blue."""
+    red = green = gray = (decode(baseline) @ (LUMA * 0.35)).astype(np.uint8)
+    if result.magnitude is not None:
+        scale = 1 / 255 if result.magnitude.dtype == np.uint8 else 1.0
+        level = np.clip(result.magnitude * np.float32(4.0 * scale), 0.0, 1.0)  # small differences still visible
+        hot = level > 0.02
+        red = np.where(hot, (96 + 159 * level).astype(np.uint8), gray)
+        green = np.where(hot, gray // 3, gray)
+    blue = green
+    if result.ignored is not None and result.ignored.any():
+        blue = np.where(result.ignored, np.maximum(green, 140), green)
+    return np.stack([red, green, blue], axis=2)
+
+
+class BaselineCache:
+    """Decoded baselines by name, kept until the file changes (LRU of ``size`` frames)."""
+
+    def __init__(self, directory: Path = BASELINE_DIR, size: int = 32):
+        self.directory = Path(directory)
+        self.size = size
+        self._cache: OrderedDict[str, Tuple[int, np.ndarray]] = OrderedDict()
+
+    def path(self, name: str) -> Path:
+        return self.directory / (name if name.endswith(".png") else f"{name}.png")
+
+    def get(self, name: str) -> np.ndarray | None:
+        path = self.path(name)
+        try:
+            stamp = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._cache.get(name)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, decode(path))
+            self._cache[name] = cached
+        self._cache.move_to_end(name)
+        while len(self._cache) > self.size:
+            self._cache.popitem(last=False)
+        return cached[1]
+
+    def put(self, name: str, image: Any) -> Path:
+        pixels = decode(image)
+        path = encode(pixels, self.path(name))
+        self._cache[name] = (path.stat().st_mtime_ns, pixels)
+        return path
+
+
+BASELINES = BaselineCache()
+
+
+def compare_to_baseline(
+    name: str,
+    screenshot: Any,
+    output_dir: Path,
+    cache: BaselineCache = BASELINES,
+    **options: Any,
+) -> DiffResult | None:
+    """Compare with baseline ``name``; None when the baseline was (re)recorded instead."""
+    baseline = cache.get(name)
+    if baseline is None or os.getenv("E2E_UPDATE_BASELINES"):
+        cache.put(name, screenshot)
+        return None
+    result = compare(screenshot, baseline, **options)
+    if not result.passed and not result.size_mismatch:
+        result.heatmap = encode(heatmap(baseline, result), Path(output_dir) / "visual" / f"{Path(name).name}-diff.png")
+    return result
+
+
+class visual_diff:
+    """Robot library: visual regression checks on the current SeleniumLibrary browser."""
+
+    ROBOT_LIBRARY_SCOPE = "GLOBAL"
+
+    def compare_screenshot_to_baseline(
+        self,
+        name: str,
+        ignore: Any = "",
+        mode: str = "pixel",
+        tolerance: int = 16,
+        max_diff: str = "0.1%",
+        min_similarity: float = 0.95,
+    ) -> float:
+        """Fails when more than ``max_diff`` of the page differs from baseline ``name``; returns the differing share.
+
+        ``ignore`` takes ``x,y,w,h`` regions and element locators separated by ``;``.
+        Example: ``Compare Screenshot To Baseline    login/form    ignore=css:.clock;0,0,1920,64    mode=perceptual``
+        """
+        from robot.api import logger
+        from robot.libraries.BuiltIn import BuiltIn
+
+        builtin = BuiltIn()
+        driver = builtin.get_library_instance("SeleniumLibrary").driver
+        screenshot = decode(driver.get_screenshot_as_png())
+        regions = self._regions(driver, ignore, screenshot.shape[1])
+        output_dir = Path(builtin.get_variable_value("${OUTPUT DIR}"))
+        result = compare_to_baseline(
+            name, screenshot, output_dir,
+            ignore=regions, mode=mode, tolerance=int(tolerance), max_diff=self._share(max_diff),
+            min_similarity=float(min_similarity),
+        )
+        if result is None:
+            logger.warn(f"Recorded baseline {BASELINES.path(name)}")
+            return 0.0
+        logger.info(f"{result.describe(name)} in {1000 * result.seconds:.0f} ms")
+        if result.heatmap is not None:
+            # Relative to log.html, so the link survives moving or archiving the report directory.
+            link = html.escape(result.heatmap.relative_to(output_dir).as_posix())
+            logger.info(f'<img src="{link}" width="800">', html=True)
+        if not result.passed:
+            raise AssertionError(f"Visual difference: {result.describe(name)}")
+        return result.diff_ratio
+
+    def compare_images(self, actual: str, baseline: str, ignore: Any = "", mode: str = "pixel",
+                       tolerance: int = 16, max_diff: str = "0.1%", min_similarity: float = 0.95) -> float:
+        """Compare two image files, e.g. ones written by ``Capture Page Screenshot``."""
+        result = compare(actual, baseline, mode=mode, tolerance=int(tolerance), max_diff=self._share(max_diff),
+                         ignore=ignore, min_similarity=float(min_similarity))
+        if not result.passed:
+            raise AssertionError(f"Visual difference: {result.describe(Path(actual).name)}")
+        return result.diff_ratio
+
+    @staticmethod
+    def _share(value: Any) -> float:
+        text = str(value).strip()
+        return float(text[:-1]) / 100.0 if text.endswith("%") else float(text)
+
+    @staticmethod
+    def _regions(driver, ignore: Any, image_width: int) -> List[Region]:
+        """Regions as given plus the rects of locator matches, scaled from CSS to screenshot pixels."""
+        try:
+            from element_query import query_elements
+        except ImportError:  # imported as resources.libs.visual_diff
+            from .element_query import query_elements
+
+        items: Iterable[str] = ignore.split(";") if isinstance(ignore, str) else ignore
+        regions, locators = [], []
+        for item in filter(None, (str(entry).strip() for entry in items)):
+            (regions if _REGION.match(item) else locators).append(item)
+        parsed = parse_regions(regions)
+        if locators:
+            scale = image_width / float(driver.execute_script("return window.innerWidth") or image_width)
+            for locator in locators:
+                for record in query_elements(driver, locator):
+                    parsed.append(tuple(round(value * scale) for value in record.rect))
+        return parsed
@@ -0,0 +1,339 @@
+"""Per-test hard deadlines for hung tests.
+
+A stuck Appium call or a ``Wait Until ...`` on a dead grid node otherwise
+blocks a worker until the node's session timeout (``SE_NODE_SESSION_TIMEOUT``,
+300s). When a test runs past its deadline (``config/watchdog.yaml``, per tag,
+or a ``deadline:<seconds>s`` tag), the watchdog:
+
+* writes ``watchdog/<test>.txt`` with the Python stacks of every thread
+  (``faulthandler``) and the last WebDriver commands, the in-flight one
+  marked ``...``;
+* deletes the session with a command still in flight, which frees the grid /
+  Appium slot and makes the call blocked on it return. Other sessions of the
+  process (session-scoped fixtures of the same worker) are left alone; the
+  deleted one is remembered (``COMMANDS.was_deleted``) so the pytest
+  fixtures open a new session for the next test;
+* lets the test fail so the run moves on. Robot gets a test timeout of
+  deadline + ``grace``; pytest (POSIX) is interrupted through ``SIGALRM``.
+
+Robot: the ``watchdog`` listener (``run_tests.py --watchdog`` adds it).
+pytest: the ``hang_watchdog`` fixture in ``tests/python/conftest.py``.
+``run_tests.py --workers`` additionally kills a pytest worker that outlives
+its whole unit (``run_with_deadline``).
+"""
+from __future__ import annotations
+
+import faulthandler
+import json
+import re
+import signal
+import subprocess
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List
+
+import yaml
+
+try:
+    from session_reaper import SessionLedger, requested_capabilities
+    from timeline import record
+except ImportError:  # imported as resources.libs.watchdog
+    from .session_reaper import SessionLedger, requested_capabilities
+    from .timeline import record
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+CONFIG_FILE = BASE_DIR / "config" / "watchdog.yaml"
+
+_SESSION_URL = re.compile(r"^(?P<session>.*/session/[^/]+)")
+
+
+def load_config(path: Path = CONFIG_FILE) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        return yaml.safe_load(handle) or {}
+
+
+def parse_seconds(value: Any) -> float:
+    text = str(value).strip().lower()
+    if text.endswith("ms"):
+        return float(text[:-2]) / 1000.0
+    return float(text.rstrip("s"))
+
+
+def deadline_for(config: Dict[str, Any], tags: Iterable[str]) -> float:
+    """``deadline:<seconds>`` tag, else the largest matching per-tag deadline, else ``default``."""
+    per_tag = {tag.lower(): float(value) for tag, value in (config.get("tags") or {}).items()}
+    matched = []
+    for tag in tags:
+        lowered = tag.strip().lower()
+        if lowered.startswith("deadline:"):
+            return parse_seconds(lowered[len("deadline:"):])
+        if lowered in per_tag:
+            matched.append(per_tag[lowered])
+    return max(matched) if matched else float(config.get("default", 180))
+
+
+class CommandLog:
+    """Recent WebDriver HTTP commands of this process and the sessions still open.
+
+    Open sessions are also written to the ledger that ``session_reaper.reap``
+    uses to clean up after a crashed process.
+    """
+
+    def __init__(self, size: int = 30, ledger: SessionLedger | None = None):
+        self.commands: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self.sessions: Dict[str, float] = {}  # session URL -> opened at
+        self.deleted: set[str] = set()  # session ids deleted by the watchdog
+        self.ledger = ledger
+        self._lock = threading.Lock()
+
+    def start(self, method: str, url: str, body: Any = None) -> Dict[str, Any]:
+        entry = {"started": time.time(), "method": method.upper(), "url": url, "body": str(body or "")[:200], "status": None}
+        if entry["method"] == "POST" and url.rstrip("/").endswith("/session"):
+            entry["capabilities"] = requested_capabilities(body)
+        match = _SESSION_URL.match(url)
+        with self._lock:
+            self.commands.append(entry)
+            if self.ledger is not None and match and match["session"] in self.sessions:
+                self.ledger.touch(match["session"])
+        return entry
+
+    def finish(self, entry: Dict[str, Any], status: Any, value: Any = None) -> None:
+        entry["status"] = status
+        entry["seconds"] = round(time.time() - entry["started"], 3)
+        method, url = entry["method"].upper(), entry["url"].rstrip("/")
+        with self._lock:
+            if method == "POST" and url.endswith("/session") and isinstance(value, dict):
+                nested = value.get("value") if isinstance(value.get("value"), dict) else {}
+                session_id = value.get("sessionId") or nested.get("sessionId")
+                record("session", url, entry["started"], browser=entry.get("capabilities", {}).get("browserName", ""))
+                if session_id:
+                    self.sessions[f"{url}/{session_id}"] = time.time()
+                    if self.ledger is not None:
+                        self.ledger.opened(f"{url}/{session_id}", entry.get("capabilities"))
+            elif method == "DELETE":
+                match = _SESSION_URL.match(url)
+                if match and match["session"] == url:
+                    self.forget(url)
+
+    def in_flight(self) -> List[str]:
+        """Open sessions with a command that has not returned yet."""
+        with self._lock:
+            pending = [entry["url"] for entry in self.commands if entry["status"] is None]
+        urls = [match["session"] for match in map(_SESSION_URL.match, pending) if match]
+        return [url for url in dict.fromkeys(urls) if url in self.sessions]
+
+    def is_webdriver(self, method: str, url: str, body: Any = None) -> bool:
+        """A new-session request, or a command on a session this log saw being created."""
+        if method.upper() == "POST" and url.rstrip("/").endswith("/session"):
+            return bool(requested_capabilities(body))
+        match = _SESSION_URL.match(url)
+        with self._lock:
+            return bool(match) and match["session"] in self.sessions
+
+    def was_deleted(self, session_id: str | None) -> bool:
+        return bool(session_id) and session_id in self.deleted
+
+    def forget(self, session_url: str) -> None:
+        self.sessions.pop(session_url, None)
+        if self.ledger is not None:
+            self.ledger.closed(session_url)
+
+    def format(self) -> str:
+        lines = []
+        for entry in list(self.commands):
+            stamp = time.strftime("%H:%M:%S", time.localtime(entry["started"]))
+            took = "..." if entry["status"] is None else f"{entry['status']} {entry['seconds']:.2f}s"
+            lines.append(f"{stamp} {entry['method']} {entry['url']} {entry['body']} -> {took}")
+        return "\n".join(lines)
+
+
+COMMANDS = CommandLog(int(load_config().get("commands", 30)), SessionLedger())
+
+
+def install_command_log(log: CommandLog = COMMANDS) -> None:
+    """Record Selenium / Appium client commands and raw ``requests`` calls to WebDriver endpoints.
+
+    Raw ``requests`` calls are only recorded when they create a session or
+    target one this log saw being created, so other HTTP traffic of the
+    process (API clients, fixtures) is not logged or touched.
+    """
+    from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+    if not getattr(RemoteConnection._request, "_e2e_watchdog", False):
+        original_request = RemoteConnection._request
+
+        def _request(self, method, url, body=None):
+            entry = log.start(method, url, body)
+            try:
+                response = original_request(self, method, url, body)
+            except Exception as exc:
+                log.finish(entry, type(exc).__name__)
+                raise
+            log.finish(entry, response.get("status"), response)
+            return response
+
+        _request._e2e_watchdog = True
+        RemoteConnection._request = _request
+
+    import requests
+
+    if not getattr(requests.Session.request, "_e2e_watchdog", False):
+        original_session_request = requests.Session.request
+
+        def request(self, method, url, *args, **kwargs):
+            body = kwargs.get("json", kwargs.get("data"))
+            # Only WebDriver traffic; the app's own /session or /sessions APIs pass straight through.
+            if not log.is_webdriver(method, str(url), body):
+                return original_session_request(self, method, url, *args, **kwargs)
+            entry = log.start(method, str(url), body)
+            try:
+                response = original_session_request(self, method, url, *args, **kwargs)
+            except Exception as exc:
+                log.finish(entry, type(exc).__name__)
+                raise
+            try:
+                value = response.json()
+            except ValueError:
+                value = None
+            log.finish(entry, response.status_code, value)
+            return response
+
+        request._e2e_watchdog = True
+        requests.Session.request = request
+
+
+def delete_sessions(log: CommandLog = COMMANDS, timeout: float = 5.0, sessions: List[str] | None = None) -> List[str]:
+    """DELETE ``sessions`` (default: the ones with a command in flight); returns those the server acknowledged."""
+    deleted = []
+    for session_url in log.in_flight() if sessions is None else sessions:
+        log.deleted.add(session_url.rstrip("/").rsplit("/", 1)[-1])
+        try:
+            urllib.request.urlopen(urllib.request.Request(session_url, method="DELETE"), timeout=timeout).close()
+            deleted.append(session_url)
+        except Exception:  # noqa: BLE001 - node already gone; nothing left to free
+            pass
+        log.forget(session_url)
+    return deleted
+
+
+class Watchdog:
+    """Arms a deadline per test and handles the overrun."""
+
+    def __init__(self, dump_dir: Path, log: CommandLog = COMMANDS):
+        self.dump_dir = Path(dump_dir)
+        self.log = log
+        self.hung: List[Dict[str, Any]] = []
+        self._timer: threading.Timer | None = None
+
+    def expire(self, label: str, deadline: float) -> Path:
+        """Dump stacks and recent commands, then delete the session the test is blocked on."""
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        dump = self.dump_dir / (re.sub(r"[^\w.-]+", "_", label)[:120] + ".txt")
+        with dump.open("w", encoding="utf-8") as handle:
+            handle.write(f"{label} exceeded its {deadline:.0f}s deadline at {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            handle.flush()
+            faulthandler.dump_traceback(file=handle, all_threads=True)
+            handle.write(f"\nLast WebDriver commands (oldest first):\n{self.log.format()}\n")
+            deleted = delete_sessions(self.log)
+            handle.write(f"\nDeleted sessions: {', '.join(deleted) or 'none'}\n")
+        self.hung.append({"test": label, "deadline": deadline, "dump": str(dump), "deleted_sessions": deleted})
+        return dump
+
+    def start(self, label: str, deadline: float) -> None:
+        self.stop()
+        self._timer = threading.Timer(deadline, self.expire, args=(label, deadline))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    @contextmanager
+    def guard(self, label: str, deadline: float, interrupt: Callable[[str], None] | None = None):
+        """Watch one test; with ``interrupt`` (and SIGALRM) the overrun is raised in the test itself."""
+        if interrupt is None or not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+            self.start(label, deadline)
+            try:
+                yield
+            finally:
+                self.stop()
+            return
+
+        def on_alarm(signum, frame):
+            dump = self.expire(label, deadline)
+            interrupt(f"Hung test: exceeded its {deadline:.0f}s deadline (stacks and commands in {dump})")
+
+        previous = signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, deadline)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    def write_summary(self, path: Path) -> None:
+        if self.hung:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self.hung, indent=1, ensure_ascii=False), encoding="utf-8")
+
+
+def register_stack_signal() -> None:
+    """Let ``run_with_deadline`` request a stack dump (SIGUSR1) before it kills a worker."""
+    if hasattr(signal, "SIGUSR1"):
+        faulthandler.register(signal.SIGUSR1, all_threads=True)
+
+
+def run_with_deadline(cmd: List[str], timeout: float, **popen_kwargs) -> int | None:
+    """Run ``cmd``; past ``timeout`` ask for a stack dump, kill it and return None."""
+    process = subprocess.Popen(cmd, **popen_kwargs)
+    try:
+        return process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if hasattr(signal, "SIGUSR1"):
+            process.send_signal(signal.SIGUSR1)
+            time.sleep(1)
+        process.kill()
+        process.wait()
+        return None
+
+
+class watchdog:
+    """Robot Framework listener (API v3) enforcing per-test deadlines."""
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(self, config_file: str | None = None):
+        self.config = load_config(Path(config_file)) if config_file else load_config()
+        self.grace = float(self.config.get("grace", 5))
+        self.watchdog: Watchdog | None = None
+        self.output_dir: Path | None = None
+        install_command_log()
+
+    def start_suite(self, data, result):
+        if self.watchdog is None:
+            from robot.libraries.BuiltIn import BuiltIn
+
+            self.output_dir = Path(BuiltIn().get_variable_value("${OUTPUT DIR}"))
+            self.watchdog = Watchdog(self.output_dir / "watchdog")
+        # Backstop: Robot's own test timeout interrupts the test shortly after the watchdog fired.
+        for test in data.tests:
+            if not test.timeout:
+                test.timeout = f"{deadline_for(self.config, test.tags) + self.grace:g}s"
+
+    def start_test(self, data, result):
+        self.watchdog.start(data.longname, deadline_for(self.config, data.tags))
+
+    def end_test(self, data, result):
+        self.watchdog.stop()
+
+    def close(self):
+        if self.watchdog is not None and self.output_dir is not None:
+            self.watchdog.write_summary(self.output_dir / "watchdog.json")
@@ -0,0 +1,275 @@
+"""Per-test HAR and Chrome trace capture for web runs.
+
+Opt-in: ``run_tests.py --trace`` enables the ``tracing`` profile of
+``config/drivers/profiles/web.yaml`` (Chrome performance log with network events and
+CDP trace categories) and adds this listener::
+
+    E2E_DRIVER_PROFILES=tracing robot --listener resources/libs/web_tracing.py ...
+
+At the end of every test (and before ``Close Browser``) the listener drains
+the browser's performance log through the grid session and writes, under
+``<output dir>/traces/``:
+
+* ``<test>.har``         HAR 1.2 built from ``Network.*`` events
+* ``<test>.trace.json``  trace events (open in chrome://tracing or Perfetto)
+
+``traces/summary.json`` lists per test the slowest requests, total bytes and
+main-thread long tasks, so a slow step can be traced to the backend call
+behind it.
+"""
+from __future__ import annotations
+
+import json
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+LONG_TASK_US = 50_000  # same 50 ms threshold as the Long Tasks API
+TASK_EVENTS = {"RunTask", "ThreadControllerImpl::RunTask"}
+
+
+def parse_performance_log(entries: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Split ``driver.get_log('performance')`` into (DevTools network messages, trace events)."""
+    network: List[Dict[str, Any]] = []
+    trace: List[Dict[str, Any]] = []
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        method = message.get("method", "")
+        params = message.get("params", {})
+        if method == "Tracing.dataCollected":
+            trace.append(params)
+        elif method.startswith("Network."):
+            network.append(message)
+    return network, trace
+
+
+def build_har(messages: List[Dict[str, Any]], page_title: str = "") -> Dict[str, Any]:
+    """HAR 1.2 from ``Network.requestWillBeSent`` / ``responseReceived`` / ``loadingFinished|Failed``."""
+    requests: Dict[str, Dict[str, Any]] = {}
+    order: List[str] = []
+    for message in messages:
+        method, params = message["method"], message.get("params", {})
+        request_id = params.get("requestId")
+        if request_id is None:
+            continue
+        if method == "Network.requestWillBeSent":
+            if request_id in requests and params.get("redirectResponse"):
+                # A redirect reuses the id; keep the hop as its own entry.
+                hop = f"{request_id}:{len(order)}"
+                requests[hop] = {
+                    **requests.pop(request_id),
+                    "response": {"response": params["redirectResponse"]},
+                    "finished": {"timestamp": params.get("timestamp", 0)},
+                }
+                order[order.index(request_id)] = hop
+            requests[request_id] = {"sent": params}
+            order.append(request_id)
+        elif request_id in requests:
+            key = {
+                "Network.responseReceived": "response",
+                "Network.loadingFinished": "finished",
+                "Network.loadingFailed": "failed",
+            }.get(method)
+            if key:
+                requests[request_id][key] = params
+
+    entries = [_har_entry(requests[request_id]) for request_id in order if request_id in requests]
+    started = entries[0]["startedDateTime"] if entries else datetime.now(timezone.utc).isoformat()
+    return {
+        "log": {
+            "version": "1.2",
+            "creator": {"name": "full-client-e2e-testing", "version": "1.0"},
+            "pages": [{"startedDateTime": started, "id": "page_1", "title": page_title, "pageTimings": {}}],
+            "entries": entries,
+        }
+    }
+
+
+def _headers(raw: Dict[str, Any] | None) -> List[Dict[str, str]]:
+    return [{"name": name, "value": str(value)} for name, value in (raw or {}).items()]
+
+
+def _redirect_url(headers: Dict[str, Any] | None) -> str:
+    return next((str(value) for name, value in (headers or {}).items() if name.lower() == "location"), "")
+
+
+def _har_entry(record: Dict[str, Any]) -> Dict[str, Any]:
+    sent = record["sent"]
+    request = sent.get("request", {})
+    response = record.get("response", {}).get("response", {})
+    end = record.get("finished") or record.get("failed") or {}
+    elapsed_ms = max(0.0, (end.get("timestamp", sent.get("timestamp", 0)) - sent.get("timestamp", 0)) * 1000)
+    size = end.get("encodedDataLength", response.get("encodedDataLength", 0)) or 0
+
+    timing = response.get("timing") or {}
+    wait = receive = -1.0
+    send = 0.0
+    if timing:
+        send = max(0.0, timing.get("sendEnd", 0) - timing.get("sendStart", 0))
+        wait = max(0.0, timing.get("receiveHeadersEnd", 0) - timing.get("sendEnd", 0))
+        receive = max(0.0, elapsed_ms - timing.get("receiveHeadersEnd", 0))
+
+    wall = sent.get("wallTime")
+    started = datetime.fromtimestamp(wall, timezone.utc).isoformat() if wall else ""
+    return {
+        "pageref": "page_1",
+        "startedDateTime": started,
+        "time": round(elapsed_ms, 3),
+        "request": {
+            "method": request.get("method", "GET"),
+            "url": request.get("url", ""),
+            "httpVersion": response.get("protocol", ""),
+            "headers": _headers(request.get("headers")),
+            "queryString": [],
+            "cookies": [],
+            "headersSize": -1,
+            "bodySize": len(request.get("postData", "") or ""),
+        },
+        "response": {
+            "status": response.get("status", 0),
+            "statusText": response.get("statusText", record.get("failed", {}).get("errorText", "")),
+            "httpVersion": response.get("protocol", ""),
+            "headers": _headers(response.get("headers")),
+            "cookies": [],
+            "content": {"size": size, "mimeType": response.get("mimeType", "")},
+            "redirectURL": _redirect_url(response.get("headers")),
+            "headersSize": -1,
+            "bodySize": size,
+        },
+        "cache": {},
+        "timings": {"blocked": -1, "dns": -1, "connect": -1, "ssl": -1, "send": send, "wait": wait, "receive": receive},
+        "_resourceType": sent.get("type", ""),
+    }
+
+
+def trace_events(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    events: List[Dict[str, Any]] = []
+    for chunk in chunks:
+        events.extend(chunk.get("value", []))
+    return events
+
+
+def long_tasks(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    tasks = [
+        {"name": event["name"], "ts": event.get("ts", 0), "duration_ms": event["dur"] / 1000.0}
+        for event in events
+        if event.get("name") in TASK_EVENTS and event.get("dur", 0) >= LONG_TASK_US
+    ]
+    return sorted(tasks, key=lambda task: task["duration_ms"], reverse=True)
+
+
+def summarize(har: Dict[str, Any], events: List[Dict[str, Any]], top: int = 5) -> Dict[str, Any]:
+    entries = har["log"]["entries"]
+    slowest = sorted(entries, key=lambda entry: entry["time"], reverse=True)[:top]
+    tasks = long_tasks(events)
+    return {
+        "requests": len(entries),
+        "total_bytes": sum(entry["response"]["bodySize"] for entry in entries),
+        "failed_requests": sum(1 for entry in entries if not entry["response"]["status"] or entry["response"]["status"] >= 400),
+        "slowest_requests": [
+            {
+                "url": entry["request"]["url"],
+                "status": entry["response"]["status"],
+                "time_ms": entry["time"],
+                "wait_ms": entry["timings"]["wait"],
+                "bytes": entry["response"]["bodySize"],
+            }
+            for entry in slowest
+        ],
+        "long_tasks": len(tasks),
+        "long_task_ms": round(sum(task["duration_ms"] for task in tasks), 1),
+        "longest_tasks": tasks[:top],
+    }
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")[:150] or "test"
+
+
+class web_tracing:
+    """Robot Framework listener (API v2) saving HAR/trace files per test."""
+
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self, top: int = 5):
+        self.top = int(top)
+        self.output_dir: Path | None = None
+        self.suites: List[str] = []
+        self.current = ""
+        self.pending: List[Dict[str, Any]] = []
+        self.summary: Dict[str, Any] = {}
+
+    def start_suite(self, name, attrs):
+        if self.output_dir is None:
+            from robot.libraries.BuiltIn import BuiltIn
+
+            self.output_dir = Path(BuiltIn().get_variable_value("${OUTPUT DIR}")) / "traces"
+        self._switch(f"{attrs['longname']} (suite setup)")
+        self.suites.append(attrs["longname"])
+
+    def start_test(self, name, attrs):
+        self._switch(attrs["longname"])
+
+    def start_keyword(self, name, attrs):
+        if attrs["libname"] == "SeleniumLibrary" and attrs["kwname"] in ("Close Browser", "Close All Browsers"):
+            self._flush()
+
+    def end_test(self, name, attrs):
+        self._switch(f"{self.suites[-1]} (suite teardown)")
+
+    def end_suite(self, name, attrs):
+        self.suites.pop()
+
+    def close(self):
+        self._save(self.current)
+        if self.output_dir is not None and self.summary:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            (self.output_dir / "summary.json").write_text(
+                json.dumps(self.summary, indent=2, ensure_ascii=False), encoding="utf-8"
+            )
+
+    def _switch(self, name: str) -> None:
+        """Save what was captured so far under the previous name; attribute new events to ``name``."""
+        self._flush()
+        self._save(self.current)
+        self.current = name
+
+    def _flush(self) -> None:
+        """Drain the performance log of the active browser (it is cleared on every read)."""
+        from robot.libraries.BuiltIn import BuiltIn
+
+        try:
+            driver = BuiltIn().get_library_instance("SeleniumLibrary").driver
+            self.pending.extend(driver.get_log("performance"))
+        except Exception:  # noqa: BLE001 - no browser open or tracing profile not enabled
+            pass
+
+    def _save(self, name: str) -> None:
+        entries, self.pending = self.pending, []
+        if not entries or self.output_dir is None:
+            return
+        network, chunks = parse_performance_log(entries)
+        events = trace_events(chunks)
+        har = build_har(network, name)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        base = _file_name(name)
+        (self.output_dir / f"{base}.har").write_text(json.dumps(har, indent=1), encoding="utf-8")
+        if events:
+            (self.output_dir / f"{base}.trace.json").write_text(json.dumps({"traceEvents": events}), encoding="utf-8")
+        self.summary[name] = {"har": f"{base}.har", **summarize(har, events, self.top)}
+
+
+def format_summary(summary: Dict[str, Any], top: int = 3) -> List[str]:
+    lines = []
+    for name, data in summary.items():
+        lines.append(
+            f"{name}: {data['requests']} requests, {data['total_bytes'] / 1024:.1f} KiB, "
+            f"{data['long_tasks']} long task(s) ({data['long_task_ms']:.0f} ms)"
+        )
+        for request in data["slowest_requests"][:top]:
+            lines.append(f"    {request['time_ms']:8.1f} ms  {request['status']}  {request['url']}")
+    return lines
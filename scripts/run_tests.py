@@ -4,12 +4,27 @@
 Cross-platform test runner for macOS and Windows
 """
 import argparse
+import json
+import os
 import platform
 import subprocess
 import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.log_policy import preset_options  # noqa: E402
+
+# 環境名稱 -> HTTP fixtures stand-in 的環境變數 (E2E_FIXTURE_BASE_URL ...)
+FIXTURE_ENV = {}
+
+# 平行 worker 結束時各自觸發 reap，同一時間只跑一個
+REAP_LOCK = threading.Lock()
+
 
 def get_robot_command():
     """獲取 robot 命令路徑（考慮虛擬環境）"""
@@ -41,52 +56,204 @@ def get_python_command():
     return str(python_path)
 
 
-def run_robot_tests(args):
-    """執行 Robot Framework 測試"""
-    robot_cmd = get_robot_command()
-    
-    # 構建報告目錄
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_dir = Path("reports") / f"{args.env}-{args.platform}-{timestamp}"
-    report_dir.mkdir(parents=True, exist_ok=True)
-    
+def build_robot_command(args, env_name, user_role, report_dir, fanout=False):
+    """構建 Robot Framework 命令（fanout=True：與其他組合同時執行，一律記錄時間軸並租用宣告的資源）"""
     # 構建測試路徑
     if args.suite:
         test_path = args.suite
     else:
         test_path = str(Path("tests") / args.platform)
     
-    # 構建 Robot Framework 命令
     cmd = [
-        robot_cmd,
-        f"--variable=ENV:{args.env}",
+        get_robot_command(),
+        f"--variable=ENV:{env_name}",
         f"--variable=PLATFORM:{args.platform}",
     ]
     
-    if args.user_role:
-        cmd.append(f"--variable=USER_ROLE:{args.user_role}")
+    if user_role:
+        cmd.append(f"--variable=USER_ROLE:{user_role}")
     
     if args.tag:
         for tag in args.tag:
             cmd.extend(["--include", tag])
     
+    # 延遲預算與 Navigation Timing (config/budgets.yaml)
+    if args.perf:
+        cmd.append(f"--listener={ROOT / 'resources' / 'libs' / 'perf_budget.py'}")
+    
+    # 記錄每個 locator 的等待時間 (--record-waits)；--adaptive-waits 時另外套用學到的 timeout
+    if args.record_waits or args.adaptive_waits:
+        cmd.append(f"--listener={ROOT / 'resources' / 'libs' / 'adaptive_waits.py'}")
+    
+    # 每個測試的起訖寫到 timeline.jsonl（須在 resource_leases 之前）；未啟用時時間軸改用 output.xml 的測試時間
+    if fanout or args.timeline:
+        cmd.append(f"--listener={ROOT / 'resources' / 'libs' / 'timeline.py'}")
+    
+    # 測試 tags 宣告的獨占資源 (lease:<name>) 與帳號 (account:<role>)，跨程序排隊租用 (--leases)
+    if fanout or args.leases:
+        cmd.append(f"--listener={ROOT / 'resources' / 'libs' / 'resource_leases.py'}")
+    
+    # 卡住的測試 (--watchdog)：超過 config/watchdog.yaml 的期限即 dump stack、刪除 session 並繼續
+    # （同時把開啟的 session 記到 .cache/sessions，讓 reap 回收當掉程序留下的 session）
+    if args.watchdog:
+        cmd.append(f"--listener={ROOT / 'resources' / 'libs' / 'watchdog.py'}")
+    
+    # 每個測試的 HAR / Chrome trace (config/drivers/profiles/web.yaml 的 tracing profile)
+    if args.trace:
+        cmd.append(f"--listener={ROOT / 'resources' / 'libs' / 'web_tracing.py'}")
+    
+    # Log 大小控制 (--log-preset，config/logging.yaml)：preset 的 robot 參數 + 各 library 的 log 門檻
+    if args.log_preset:
+        log_options, use_policy = preset_options(args.log_preset)
+        cmd.extend(log_options)
+        if use_policy:
+            cmd.append(f"--listener={ROOT / 'resources' / 'libs' / 'log_policy.py'}")
+    
     cmd.extend([
         f"--outputdir={report_dir}",
         test_path,
     ])
+    return cmd
+
+
+def robot_environment(args, env_name):
+    """啟用 config/drivers/profiles/*.yaml 中選用的 capability profiles 與 HTTP fixtures stand-in"""
+    profiles = [p for p in os.getenv("E2E_DRIVER_PROFILES", "").split(",") if p]
+    if args.trace and "tracing" not in profiles:
+        profiles.append("tracing")
+    env = {**os.environ, **FIXTURE_ENV.get(env_name, {}), "E2E_DRIVER_PROFILES": ",".join(profiles)}
+    if args.adaptive_waits:
+        env["E2E_ADAPTIVE_WAITS"] = "1"
+    return env
+
+
+def run_robot_tests(args):
+    """執行 Robot Framework 測試"""
+    # 構建報告目錄
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_dir = Path("reports") / f"{args.env}-{args.platform}-{timestamp}"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    
+    cmd = build_robot_command(args, args.env, args.user_role, report_dir)
     
     print(f"📋 執行命令: {' '.join(cmd)}")
     print(f"📁 報告目錄: {report_dir}")
     print("=" * 60)
     
+    # web 執行期間佔用一個瀏覽器 session，讓 autoscaler 不會縮掉正在用的 node
+    browser = None
+    if args.platform == "web":
+        sys.path.insert(0, str(ROOT))
+        from resources.libs.env_loader import load_context
+        from resources.libs.grid_autoscaler import publish_demand
+        
+        browser = load_context(args.env, "web", args.user_role)["browser"]
+        publish_demand(browser, 0, 1)
     try:
-        subprocess.run(cmd, check=True)
+        subprocess.run(cmd, check=True, env=robot_environment(args, args.env))
         print("\n✅ 測試執行成功！")
         print(f"📊 查看報告: {report_dir / 'report.html'}")
         return 0
     except subprocess.CalledProcessError as e:
         print(f"\n❌ 測試執行失敗: {e}")
         return 1
+    finally:
+        if browser:
+            publish_demand(browser, 0, 0)
+        report_performance(report_dir)
+        report_traces(report_dir)
+        report_hung_tests(report_dir)
+        reap_orphaned_sessions(report_dir)
+        report_timeline(report_dir)
+
+
+def reap_orphaned_sessions(report_dir=None):
+    """刪除擁有者程序已結束但仍佔用 Grid / Appium slot 的 session（.cache/sessions 帳本）
+    
+    回收結果累加到 report_dir/reaped.json（每個 run 釋放的 slot-seconds）。
+    """
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.session_reaper import reap
+    
+    with REAP_LOCK:
+        try:
+            summary = reap()
+        except Exception as e:
+            print(f"⚠️ 孤兒 session 清理失敗: {e}")
+            return None
+        if summary["reclaimed"]:
+            print(f"♻️ 回收 {len(summary['reclaimed'])} 個孤兒 session，釋放 {summary['slot_seconds']:.0f} slot-seconds")
+        if report_dir is not None and summary["checked"]:
+            reaped_file = Path(report_dir) / "reaped.json"
+            total = json.loads(reaped_file.read_text(encoding="utf-8")) if reaped_file.exists() else {}
+            total["reclaimed"] = total.get("reclaimed", []) + summary["reclaimed"]
+            total["expired"] = total.get("expired", 0) + summary["expired"]
+            total["slot_seconds"] = round(sum(item["slot_seconds"] for item in total["reclaimed"]), 1)
+            reaped_file.write_text(json.dumps(total, indent=2), encoding="utf-8")
+        return summary
+
+
+def report_timeline(report_dir):
+    """worker 時間軸 (timeline.html)：使用率、等待 session / lease 的時間與 critical path"""
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.timeline import analyze, format_summary, load_spans, write_timeline
+    
+    try:
+        spans = load_spans(report_dir)
+    except Exception as e:
+        print(f"⚠️ 無法讀取 timeline: {e}")
+        return None
+    if not spans:
+        return None
+    analysis = analyze(spans)
+    path = write_timeline(analysis, report_dir)
+    print(f"\n🕒 Worker 時間軸: {path}")
+    print("\n".join(format_summary(analysis)))
+    return analysis
+
+
+def report_hung_tests(report_dir):
+    """列出超過期限被 watchdog 中斷的測試與其 stack dump"""
+    dumps = sorted((report_dir / "watchdog").glob("*.txt")) if (report_dir / "watchdog").exists() else []
+    if not dumps:
+        return
+    print(f"\n⏱️ {len(dumps)} 個測試超過期限（stack 與最近的 WebDriver 指令）:")
+    for dump in dumps:
+        print(f"   {dump}")
+
+
+def report_traces(report_dir):
+    """列出最慢的請求、傳輸量與 long tasks (--trace)"""
+    summary_file = report_dir / "traces" / "summary.json"
+    if not summary_file.exists():
+        return
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.web_tracing import format_summary
+    
+    print(f"\n🔍 Traces: {summary_file.parent}")
+    print("\n".join(format_summary(json.loads(summary_file.read_text(encoding="utf-8")))))
+
+
+def report_performance(report_dir):
+    """比對延遲預算與滾動基準，寫入 perf-summary.json"""
+    perf_file = report_dir / "perf.json"
+    if not perf_file.exists():
+        return None
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.perf_budget import format_summary, summarize_run
+    
+    summary = summarize_run(perf_file, Path("reports"))
+    (report_dir / "perf-summary.json").write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+    print("\n".join(format_summary(summary)))
+    return summary
+
+
+def pytest_environment(env_name, user_role):
+    """conftest.py 從環境變數讀取 --env / --user-role 的預設值"""
+    env = {**os.environ, **FIXTURE_ENV.get(env_name, {}), "E2E_ENV": env_name}
+    if user_role:
+        env["E2E_USER_ROLE"] = user_role
+    return env
 
 
 def run_python_tests(args):
@@ -111,16 +278,374 @@ def run_python_tests(args):
     if args.markers:
         cmd.extend(["-m", args.markers])
     
+    env = pytest_environment(args.env, args.user_role)
+    
+    if args.workers > 1:
+        return run_python_tests_parallel(args, python_cmd, test_path, env)
+    
     print(f"📋 執行命令: {' '.join(cmd)}")
     print("=" * 60)
     
     try:
-        subprocess.run(cmd, check=True)
+        subprocess.run(cmd, check=True, env=env)
         print("\n✅ 測試執行成功！")
         return 0
     except subprocess.CalledProcessError as e:
         print(f"\n❌ 測試執行失敗: {e}")
         return 1
+    finally:
+        reap_orphaned_sessions()
+
+
+def plan_pytest_units(args, python_cmd, test_path, env, report_dir):
+    """收集測試並依端點切分成工作單元
+    
+    同一個檔案、同一個平台的測試放在同一單元，讓 worker 內的 session-scoped
+    driver 可以重複使用；端點允許多個 session（Grid）時再切成多個單元。
+    """
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.env_loader import load_context
+    
+    plan_file = report_dir / "plan.json"
+    collect = [python_cmd, "-m", "pytest", test_path, "--collect-only", "-q", f"--e2e-plan={plan_file}"]
+    if args.markers:
+        collect.extend(["-m", args.markers])
+    subprocess.run(collect, check=True, env=env, capture_output=True)
+    plan = json.loads(plan_file.read_text(encoding="utf-8"))
+    
+    # 端點 -> 同時 session 上限（多個平台共用同一端點時取最小值）
+    endpoint_of = {}
+    browser_of = {}
+    limits = {}
+    for platform_name in sorted({p for p in plan.values() if p}):
+        context = load_context(args.env, platform_name, args.user_role)
+        endpoint = context["remote_url"]
+        endpoint_of[platform_name] = endpoint
+        if platform_name == "web":
+            browser_of[platform_name] = context["browser"]
+        limits[endpoint] = min(limits.get(endpoint, context["max_sessions"]), context["max_sessions"])
+    
+    groups = {}
+    for nodeid, platform_name in plan.items():
+        module = nodeid.split("::", 1)[0]
+        groups.setdefault((module, platform_name), []).append(nodeid)
+    
+    units = []
+    for (module, platform_name), nodeids in groups.items():
+        endpoint = endpoint_of.get(platform_name)
+        chunks = min(limits[endpoint], len(nodeids)) if endpoint else 1
+        for index in range(chunks):
+            units.append({
+                "module": module,
+                "endpoint": endpoint,
+                "browser": browser_of.get(platform_name),
+                "nodeids": nodeids[index::chunks],
+            })
+    # 先排大的單元，縮短總執行時間
+    units.sort(key=lambda unit: len(unit["nodeids"]), reverse=True)
+    return units, limits
+
+
+def run_python_tests_parallel(args, python_cmd, test_path, env):
+    """以多個 pytest 程序平行執行，並遵守每個端點的 session 上限"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_dir = Path("reports") / f"{args.env}-pytest-{timestamp}"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    
+    units, limits = plan_pytest_units(args, python_cmd, test_path, env, report_dir)
+    
+    # 每個測試由 conftest 的 watchdog 把關；整個單元超時（例如卡在建立 session）時由這裡終止 worker
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.watchdog import load_config, run_with_deadline
+    
+    watchdog_cfg = load_config()
+    per_test = float(watchdog_cfg.get("default", 180)) + float(watchdog_cfg.get("grace", 5))
+    from resources.libs.timeline import TIMELINE_FILE, record
+    
+    timeline_file = report_dir / TIMELINE_FILE
+    env = {**env, "E2E_WATCHDOG_DIR": str(report_dir / "watchdog"), "E2E_TIMELINE": str(timeline_file)}
+    print(f"📋 {sum(len(u['nodeids']) for u in units)} 個測試 → {len(units)} 個單元，{args.workers} 個 workers")
+    for endpoint, limit in limits.items():
+        print(f"   🔒 {endpoint}: 最多 {limit} 個 session")
+    print(f"📁 報告目錄: {report_dir}")
+    print("=" * 60)
+    
+    pending = list(units)
+    running = []
+    in_use = {endpoint: 0 for endpoint in limits}
+    results = []
+    condition = threading.Condition()
+    
+    def next_unit():
+        for unit in pending:
+            endpoint = unit["endpoint"]
+            if endpoint is None or in_use[endpoint] < limits[endpoint]:
+                pending.remove(unit)
+                running.append(unit)
+                if endpoint is not None:
+                    in_use[endpoint] += 1
+                publish_queue(pending, running, args.workers)
+                return unit
+        return None
+    
+    def worker(worker_id):
+        sequence = 0
+        lane = f"worker{worker_id}"
+        worker_env = {**env, "E2E_WORKER": lane}
+        while True:
+            with condition:
+                waiting = time.time()
+                unit = next_unit()
+                while unit is None and pending:
+                    condition.wait()
+                    unit = next_unit()
+            if time.time() - waiting > 0.1:
+                record("queue", "waiting for an endpoint slot", waiting, worker=lane, path=timeline_file)
+            if unit is None:
+                return
+            sequence += 1
+            name = f"{lane}-{sequence}"
+            rc = -1
+            try:
+                cmd = [python_cmd, "-m", "pytest", *unit["nodeids"], "-v", f"--junitxml={report_dir / f'{name}.xml'}"]
+                budget = 60 + per_test * len(unit["nodeids"])
+                started = time.time()
+                with open(report_dir / f"{name}.log", "w", encoding="utf-8") as log:
+                    rc = run_with_deadline(cmd, budget, env=worker_env, stdout=log, stderr=subprocess.STDOUT)
+                record("unit", unit["module"], started, worker=lane, path=timeline_file, tests=len(unit["nodeids"]), rc=rc)
+                if rc is None:
+                    print(f"⏱️ [{name}] {unit['module']} 超過 {budget:.0f}s，已終止 worker（stack 見 {name}.log）")
+                    rc = -1
+                # worker 已結束：它沒關掉的 session 立即釋放，不必等 Grid 逾時
+                reap_orphaned_sessions(report_dir)
+                status = "✅" if rc in (0, 5) else "❌"
+                print(f"{status} [{name}] {unit['module']} ({len(unit['nodeids'])} tests) rc={rc}")
+            except Exception as e:
+                rc = -1
+                print(f"❌ [{name}] {unit['module']} 執行失敗: {e}")
+            finally:
+                # 無論成功與否都要歸還 endpoint slot，否則其他 worker 會永遠停在 condition.wait()
+                with condition:
+                    results.append(rc)
+                    running.remove(unit)
+                    if unit["endpoint"] is not None:
+                        in_use[unit["endpoint"]] -= 1
+                    publish_queue(pending, running, args.workers)
+                    condition.notify_all()
+    
+    publish_queue(pending, running, args.workers)
+    threads = [threading.Thread(target=worker, args=(index + 1,)) for index in range(args.workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    report_hung_tests(report_dir)
+    report_timeline(report_dir)
+    failed = [rc for rc in results if rc not in (0, 5)]
+    if failed:
+        print(f"\n❌ {len(failed)}/{len(results)} 個單元失敗，詳見 {report_dir}")
+        return 1
+    print(f"\n✅ 測試執行成功！JUnit 報告: {report_dir}")
+    return 0
+
+
+def publish_queue(pending, running, workers):
+    """把即將開啟 / 使用中的 web session 數寫到 .cache/queue，供 tools/grid_autoscaler.py 擴縮 Grid node
+    
+    每個執行中的單元佔一個 session（conftest 在 worker 內共用）；排隊中的單元最多只有空閒 worker 數會同時開啟。
+    """
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.grid_autoscaler import publish_demand
+    
+    demand = {}
+    starting = pending[:max(0, workers - len(running))]
+    for index, units in enumerate((starting, running)):
+        for unit in units:
+            if unit.get("browser"):
+                demand.setdefault(unit["browser"], [0, 0])[index] += 1
+    for browser in {*demand, *publish_queue.browsers}:
+        publish_demand(browser, *demand.get(browser, (0, 0)))
+    publish_queue.browsers = set(demand)
+
+
+publish_queue.browsers = set()
+
+
+def split_values(value):
+    """'dev,staging' -> ['dev', 'staging']；未指定時回傳 [None]"""
+    if not value:
+        return [None]
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def combination_endpoints(args, env_name, user_role):
+    """該組合會用到的端點與 session 上限"""
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.env_loader import build_context
+    
+    platforms = [args.platform] if args.type == "robot" else ["web", "android", "mac", "windows"]
+    endpoints = {}
+    for platform_name in platforms:
+        try:
+            context = build_context(env_name, platform_name, user_role)
+        except (FileNotFoundError, KeyError, ValueError):
+            # 缺少平台設定或角色帳號：這個組合自己的程序會回報失敗，不影響其他組合
+            continue
+        endpoint = context["remote_url"]
+        endpoints[endpoint] = min(endpoints.get(endpoint, context["max_sessions"]), context["max_sessions"])
+    return endpoints
+
+
+def run_fanout(args, combinations):
+    """環境 × 角色交叉組合同時執行，最後產生合併比較報告
+    
+    每個組合是獨立的 robot / pytest 程序，load_context 互不干擾；
+    共用同一端點的組合仍遵守 config/drivers/*.yaml 的 max_sessions。
+    """
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.run_report import compare_runs, load_results, write_comparison
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    fanout_dir = Path("reports") / f"fanout-{args.platform or 'pytest'}-{timestamp}"
+    fanout_dir.mkdir(parents=True, exist_ok=True)
+    if args.type == "pytest" and args.workers > 1:
+        print("⚠️  多組合執行時每個組合使用單一 pytest 程序（忽略 --workers）")
+    
+    jobs = []
+    limits = {}
+    for env_name, user_role in combinations:
+        label = env_name if not user_role else f"{env_name}-{user_role}"
+        endpoints = combination_endpoints(args, env_name, user_role)
+        for endpoint, limit in endpoints.items():
+            limits[endpoint] = min(limits.get(endpoint, limit), limit)
+        jobs.append({"label": label, "env": env_name, "role": user_role, "endpoints": list(endpoints)})
+    
+    print(f"📋 {len(jobs)} 個組合同時執行: {', '.join(job['label'] for job in jobs)}")
+    print(f"📁 報告目錄: {fanout_dir}")
+    print("=" * 60)
+    
+    from resources.libs.timeline import TIMELINE_FILE, record
+    
+    timeline_file = fanout_dir / TIMELINE_FILE
+    in_use = {endpoint: 0 for endpoint in limits}
+    condition = threading.Condition()
+    results = {}
+    
+    def run_job(job):
+        run_dir = fanout_dir / job["label"]
+        run_dir.mkdir(parents=True, exist_ok=True)
+        if args.type == "robot":
+            cmd = build_robot_command(args, job["env"], job["role"], run_dir, fanout=True)
+            env = robot_environment(args, job["env"])
+        else:
+            test_path = args.suite or str(Path("tests") / "python")
+            cmd = [get_python_command(), "-m", "pytest", test_path, "-v", f"--junitxml={run_dir / 'junit.xml'}"]
+            if args.markers:
+                cmd.extend(["-m", args.markers])
+            env = pytest_environment(job["env"], job["role"])
+        env = {**env, "E2E_TIMELINE": str(timeline_file), "E2E_WORKER": job["label"]}
+        
+        waiting = time.time()
+        with condition:
+            condition.wait_for(lambda: all(in_use[e] < limits[e] for e in job["endpoints"]))
+            for endpoint in job["endpoints"]:
+                in_use[endpoint] += 1
+        if time.time() - waiting > 0.1:
+            record("queue", "waiting for an endpoint slot", waiting, worker=job["label"], path=timeline_file)
+        started = time.time()
+        rc = -1
+        try:
+            with open(run_dir / "console.log", "w", encoding="utf-8") as log:
+                rc = subprocess.run(cmd, env=env, stdout=log, stderr=subprocess.STDOUT).returncode
+            record("unit", job["label"], started, worker=job["label"], path=timeline_file, rc=rc)
+        except Exception as e:
+            print(f"❌ [{job['label']}] 執行失敗: {e}")
+        finally:
+            reap_orphaned_sessions(run_dir)
+            with condition:
+                for endpoint in job["endpoints"]:
+                    in_use[endpoint] -= 1
+                condition.notify_all()
+        results[job["label"]] = rc
+        status = "✅" if rc in (0, 5) else "❌"
+        print(f"{status} [{job['label']}] rc={rc}  ({run_dir / 'console.log'})")
+    
+    threads = [threading.Thread(target=run_job, args=(job,)) for job in jobs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    for job in jobs:
+        report_performance(fanout_dir / job["label"])
+    runs = {job["label"]: load_results(fanout_dir / job["label"]) for job in jobs}
+    comparison = compare_runs(runs)
+    report = write_comparison(comparison, fanout_dir)
+    
+    print("=" * 60)
+    for label, summary in comparison["runs"].items():
+        rate = "-" if summary["pass_rate"] is None else f"{summary['pass_rate'] * 100:.1f}%"
+        print(f"   {label:<24} 通過率 {rate:>6}  ({summary['passed']}/{summary['passed'] + summary['failed']})  總時間 {summary['elapsed_seconds']:.2f}s")
+    print(f"📊 比較報告: {report}")
+    report_timeline(fanout_dir)
+    return 0 if all(rc in (0, 5) for rc in results.values()) else 1
+
+
+def start_proxy_stage(args):
+    """啟動本機快取 / 阻擋 proxy，並讓 web capabilities 透過它連線"""
+    sys.path.insert(0, str(ROOT / "tools"))
+    from caching_proxy import CONFIG_FILE, start_proxy
+    from resources.libs.env_loader import read_config
+    
+    handle = start_proxy(args.proxy)
+    advertise_host = read_config(CONFIG_FILE).get("advertise_host", "127.0.0.1")
+    os.environ["E2E_PROXY_ADDRESS"] = f"{advertise_host}:{handle.port}"
+    profiles = [p for p in os.getenv("E2E_DRIVER_PROFILES", "").split(",") if p]
+    os.environ["E2E_DRIVER_PROFILES"] = ",".join([*profiles, "proxy"])
+    print(f"🧭 Proxy ({args.proxy}): {os.environ['E2E_PROXY_ADDRESS']}")
+    return handle
+
+
+def stop_proxy_stage(handle):
+    """停止 proxy 並輸出本次執行的統計"""
+    stats = handle.stop()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stats_file = Path("reports") / f"proxy-stats-{timestamp}.json"
+    stats_file.parent.mkdir(parents=True, exist_ok=True)
+    stats_file.write_text(json.dumps(stats, indent=2), encoding="utf-8")
+    rate = "-" if stats["cache_hit_rate"] is None else f"{stats['cache_hit_rate'] * 100:.0f}%"
+    print(
+        f"🧭 Proxy: {stats['requests']} 請求, 快取命中 {stats['cache_hits']} ({rate}), "
+        f"阻擋 {stats['blocked']}, 從快取提供 {stats['bytes_from_cache'] / 1024:.0f} KiB → {stats_file}"
+    )
+
+
+def start_fixture_stage(args):
+    """依 config/environments/<env>.yaml 的 http_fixtures 啟動錄製 / 重播 stand-in"""
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.http_fixtures import start_fixtures
+    
+    handles = []
+    for env_name in split_values(args.env):
+        handle = start_fixtures(env_name, args.fixtures)
+        if handle is None:
+            continue
+        FIXTURE_ENV[env_name] = handle.environment_variables()
+        handles.append(handle)
+        for name, url in FIXTURE_ENV[env_name].items():
+            print(f"📼 [{env_name}] HTTP fixtures ({handle.mode}): {name}={url}")
+    return handles
+
+
+def stop_fixture_stage(handles):
+    """停止 stand-in，錄製模式下寫回 cassettes"""
+    for handle in handles:
+        for target, stats in handle.stop().items():
+            print(
+                f"📼 [{handle.environment}] {target}: {stats['requests']} 請求, 重播 {stats['replayed']}, "
+                f"錄製 {stats['recorded']}, 未命中 {stats['misses']}"
+            )
 
 
 def clean_reports():
@@ -152,9 +677,11 @@ def main():
   # Robot Framework 測試
   python scripts/run_tests.py --platform mac --env dev
   python scripts/run_tests.py --platform web --env staging --tag smoke
+  python scripts/run_tests.py --platform web --env dev,staging --user-role standard,admin
   
   # Python pytest 測試
   python scripts/run_tests.py --type pytest --suite tests/python/test_mac_calculator.py
+  python scripts/run_tests.py --type pytest --env fake --workers 4
   
   # 清理報告
   python scripts/run_tests.py --clean
@@ -182,14 +709,14 @@ def main():
         "--env",
         "-e",
         default="dev",
-        help="環境配置 (dev, staging, prod) (預設: dev)"
+        help="環境配置 (dev, staging, prod)，逗號分隔可同時執行多個環境 (預設: dev)"
     )
     
     # 用戶角色
     parser.add_argument(
         "--user-role",
         "-u",
-        help="用戶角色 (standard, admin) (僅 Robot Framework)"
+        help="用戶角色 (standard, admin)，逗號分隔可同時執行多個角色"
     )
     
     # 測試套件路徑
@@ -207,6 +734,83 @@ def main():
         help="Robot Framework 標籤過濾 (可多次使用)"
     )
     
+    # pytest 平行 workers
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="pytest 平行程序數（依 config/drivers/*.yaml 的 max_sessions 限制每個端點）"
+    )
+    
+    # 延遲預算 listener
+    parser.add_argument(
+        "--perf",
+        action="store_true",
+        help="收集延遲預算 / Navigation Timing 指標 (config/budgets.yaml)，並與先前的執行比較"
+    )
+    
+    # Chrome 效能記錄 / tracing
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="啟用 Chrome 效能記錄與 CDP tracing，每個測試存 HAR 與 trace (web)"
+    )
+    
+    # 本機快取 / 阻擋 proxy
+    parser.add_argument(
+        "--proxy",
+        choices=["record", "replay"],
+        help="啟動本機快取 / 阻擋 proxy (config/proxy.yaml)；replay 模式完全不連外"
+    )
+    
+    # 學習式等待時間
+    parser.add_argument(
+        "--adaptive-waits",
+        action="store_true",
+        help="關閉 implicit wait，改用 config/learned_timeouts.yaml 中每個 locator 的 timeout"
+    )
+    
+    parser.add_argument(
+        "--record-waits",
+        action="store_true",
+        help="記錄每個 locator 的等待時間 (waits.json)，供 tools/adaptive_timeouts.py 學習 timeout"
+    )
+    
+    # Worker 時間軸
+    parser.add_argument(
+        "--timeline",
+        action="store_true",
+        help="Robot 執行時記錄每個測試與 lease 等待到 timeline.jsonl（fan-out 與 pytest --workers 一律記錄）"
+    )
+    
+    # 跨程序資源租用
+    parser.add_argument(
+        "--leases",
+        action="store_true",
+        help="依 lease:<name> / account:<role> tags 排隊租用裝置與帳號（同一主機另有 runner 執行時使用；fan-out 一律啟用）"
+    )
+    
+    # 卡住測試的 watchdog
+    parser.add_argument(
+        "--watchdog",
+        action="store_true",
+        help="Robot 執行時強制 config/watchdog.yaml 的測試期限，並記錄 WebDriver 指令（pytest 一律由 conftest 啟用）"
+    )
+    
+    # Log 大小控制
+    parser.add_argument(
+        "--log-preset",
+        help="套用 config/logging.yaml 的 preset（full / standard / lean / ci），控制 --removekeywords、--flattenkeywords 與 log 門檻；未指定時不調整"
+    )
+    
+    # HTTP 錄製 / 重播
+    parser.add_argument(
+        "--fixtures",
+        choices=["off", "record", "replay"],
+        help="覆寫環境 YAML 的 http_fixtures.mode（record 錄製 base_url/api_base_url，replay 離線重播）"
+    )
+    
     # pytest markers
     parser.add_argument(
         "--markers",
@@ -238,6 +842,62 @@ def main():
     if args.type == "robot" and not args.platform:
         parser.error("Robot Framework 測試需要指定 --platform")
     
+    proxy = start_proxy_stage(args) if args.proxy else None
+    fixtures = start_fixture_stage(args)
+    try:
+        return dispatch(args)
+    finally:
+        stop_fixture_stage(fixtures)
+        if proxy is not None:
+            stop_proxy_stage(proxy)
+        update_dashboard()
+        report_failure_clusters()
+
+
+def report_failure_clusters(limit=10):
+    """把新的失敗併入 reports/failures.sqlite，依根因（失敗訊息 / stack 的 MinHash 叢集）列出本次的失敗"""
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.failure_index import clusters, format_clusters, index_failures, open_index
+    
+    reports_dir = Path("reports")
+    try:
+        with open_index(reports_dir / "failures.sqlite") as conn:
+            indexed = index_failures(conn, reports_dir)
+            rows = clusters(conn, indexed, limit) if indexed else []
+        conn.close()
+    except Exception as e:
+        print(f"⚠️ 失敗分群失敗: {e}")
+        return
+    if rows:
+        print(f"🧩 失敗根因（{sum(row['failures'] for row in rows)} 個失敗 → {len(rows)} 群，python tools/failure_clusters.py 查看全部）:")
+        print("\n".join(format_clusters(rows)))
+
+
+def update_dashboard():
+    """把新的報告目錄併入 reports/results.sqlite 並重新產生趨勢儀表板"""
+    sys.path.insert(0, str(ROOT))
+    from resources.libs.results_store import index_reports, open_store, write_dashboard
+    
+    reports_dir = Path("reports")
+    try:
+        with open_store(reports_dir / "results.sqlite") as conn:
+            indexed = index_reports(conn, reports_dir)
+            dashboard = write_dashboard(conn, reports_dir / "trends.html")
+        conn.close()
+    except Exception as e:
+        print(f"⚠️ 趨勢儀表板更新失敗: {e}")
+        return
+    print(f"📈 趨勢儀表板: {dashboard}（新增 {indexed} 個 run）")
+
+
+def dispatch(args):
+    """依參數執行測試"""
+    # 多個環境 / 角色：交叉組合同時執行
+    combinations = [(env_name, role) for env_name in split_values(args.env) for role in split_values(args.user_role)]
+    if len(combinations) > 1:
+        return run_fanout(args, combinations)
+    args.env, args.user_role = combinations[0]
+    
     # 執行測試
     if args.type == "robot":
         return run_robot_tests(args)
@@ -2,13 +2,34 @@
 """
 跨平台設置腳本
 Cross-platform setup script for macOS and Windows
+
+--cached：以 requirements.txt / package.json / Python 版本的 hash 作為 key，
+第一次建立 wheelhouse、.venv 與 node_modules 封存檔並寫入 manifest（sha256）；
+之後的 CI runner / worker 容器驗證完整性後直接還原，不需要網路。
+
+    python scripts/setup.py --cached
+    python scripts/setup.py --cached --cache-dir /ci-cache/bootstrap --offline
 """
+import argparse
+import hashlib
+import json
 import os
 import platform
+import shutil
 import subprocess
 import sys
+import tarfile
+import time
 from pathlib import Path
 
+CACHE_DIR = Path(os.getenv("E2E_BOOTSTRAP_CACHE") or Path(".cache") / "bootstrap")
+# package-lock.json 不列入：npm install 會改寫它，key 會在第一次建置後就變掉
+KEY_FILES = ["requirements.txt", "package.json"]
+STAMP = ".bootstrap-key"
+KEEP_ENTRIES = 3
+# 從已啟動的 .venv 執行時，sys.executable 就在即將被替換的 .venv 裡
+BASE_PYTHON = getattr(sys, "_base_executable", sys.executable)
+
 
 def run_command(cmd, shell=False):
     """執行命令並即時顯示輸出"""
@@ -66,6 +87,183 @@ def install_node_deps():
     return run_command(["npm", "install"])
 
 
+def venv_bin(name):
+    """.venv 內的執行檔路徑"""
+    if platform.system() == "Windows":
+        return Path(".venv") / "Scripts" / name
+    return Path(".venv") / "bin" / name
+
+
+def bootstrap_key():
+    """依賴檔內容 + Python 版本 / 平台的 hash"""
+    digest = hashlib.sha256()
+    for name in KEY_FILES:
+        path = Path(name)
+        digest.update(name.encode() + b"\0" + (path.read_bytes() if path.exists() else b"-") + b"\0")
+    digest.update(f"{platform.python_implementation()} {sys.version} {platform.system()} {platform.machine()}".encode())
+    return digest.hexdigest()[:24]
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_stamp(directory):
+    stamp = Path(directory) / STAMP
+    return stamp.read_text().strip() if stamp.exists() else ""
+
+
+def pack(directory, archive):
+    """封存目錄（gzip level 1：還原速度優先）"""
+    with tarfile.open(archive, "w:gz", compresslevel=1) as tar:
+        tar.add(directory, arcname=Path(directory).name)
+
+
+def unpack(archive, target):
+    """解壓到暫存目錄後再替換 target，中途失敗不會留下半套環境"""
+    target = Path(target)
+    staging = target.with_name(f"{target.name}.restore-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+    with tarfile.open(archive, "r:gz") as tar:
+        # venv 的 bin/python 是指向系統 Python 的絕對 symlink，"data" filter 會拒絕
+        tar.extractall(staging, filter="tar") if hasattr(tarfile, "tar_filter") else tar.extractall(staging)
+    shutil.rmtree(target, ignore_errors=True)
+    (staging / target.name).rename(target)
+    staging.rmdir()
+
+
+def verify_entry(entry):
+    """manifest 中每個檔案的 sha256 都相符才算有效的快取"""
+    manifest_file = entry / "manifest.json"
+    if not manifest_file.exists():
+        return None
+    try:
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+    for name, checksum in manifest.get("files", {}).items():
+        path = entry / name
+        if not path.exists() or file_sha256(path) != checksum:
+            print(f"⚠️  快取檔案損毀: {path}")
+            return None
+    return manifest
+
+
+def restore_from_cache(entry, manifest, key):
+    """還原 .venv（同一路徑 / 同一 Python 時用封存檔，否則從 wheelhouse 離線安裝）與 node_modules"""
+    venv_path = Path(".venv")
+    if read_stamp(venv_path) != key:
+        same_place = manifest.get("venv") == str(venv_path.resolve()) and manifest.get("python") == BASE_PYTHON
+        if same_place and "venv.tar.gz" in manifest["files"]:
+            print("📦 還原 .venv 封存檔...")
+            unpack(entry / "venv.tar.gz", venv_path)
+        else:
+            print("📦 從 wheelhouse 離線安裝 Python 依賴...")
+            shutil.rmtree(venv_path, ignore_errors=True)
+            if not run_command([BASE_PYTHON, "-m", "venv", ".venv"]):
+                return False
+            if not run_command([str(venv_bin("pip")), "install", "--no-index", "--find-links",
+                                str(entry / "wheelhouse"), "-r", "requirements.txt"]):
+                return False
+        (venv_path / STAMP).write_text(key)
+    else:
+        print("✓ .venv 已是最新")
+
+    if "node_modules.tar.gz" in manifest["files"]:
+        if read_stamp("node_modules") != key:
+            print("📦 還原 node_modules 封存檔...")
+            unpack(entry / "node_modules.tar.gz", "node_modules")
+            (Path("node_modules") / STAMP).write_text(key)
+        else:
+            print("✓ node_modules 已是最新")
+    return True
+
+
+def build_cache(entry, key):
+    """需要網路：建立 wheelhouse 並從中安裝，再封存 .venv / node_modules"""
+    staging = entry.with_name(f"{entry.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    wheelhouse = staging / "wheelhouse"
+    wheelhouse.mkdir(parents=True)
+
+    shutil.rmtree(".venv", ignore_errors=True)
+    if not run_command([BASE_PYTHON, "-m", "venv", ".venv"]):
+        return False
+    pip = str(venv_bin("pip"))
+    # 先把所有依賴（含 sdist 建出的 wheel）放進 wheelhouse，再只從 wheelhouse 安裝，確保它是完整的
+    if not (run_command([pip, "wheel", "-r", "requirements.txt", "-w", str(wheelhouse)])
+            and run_command([pip, "install", "--no-index", "--find-links", str(wheelhouse), "-r", "requirements.txt"])):
+        shutil.rmtree(staging, ignore_errors=True)
+        return False
+    Path(".venv", STAMP).write_text(key)
+    print("🗜  封存 .venv...")
+    pack(".venv", staging / "venv.tar.gz")
+
+    # npm install 失敗時不寫入快取項目，否則之後每次命中都會還原出不完整的 node_modules
+    if not install_node_deps():
+        shutil.rmtree(staging, ignore_errors=True)
+        return False
+    if Path("node_modules").exists():
+        Path("node_modules", STAMP).write_text(key)
+        print("🗜  封存 node_modules...")
+        pack("node_modules", staging / "node_modules.tar.gz")
+
+    files = {str(path.relative_to(staging).as_posix()): file_sha256(path)
+             for path in sorted(staging.rglob("*")) if path.is_file()}
+    manifest = {
+        "key": key,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": BASE_PYTHON,
+        "venv": str(Path(".venv").resolve()),
+        "files": files,
+    }
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    shutil.rmtree(entry, ignore_errors=True)
+    staging.rename(entry)
+    return True
+
+
+def prune_cache(cache_dir, keep=KEEP_ENTRIES):
+    """只保留最近使用的幾個 key"""
+    entries = sorted((path for path in cache_dir.iterdir() if path.is_dir() and "." not in path.name),
+                     key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in entries[keep:]:
+        print(f"🧹 移除舊快取: {path}")
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def setup_cached(cache_dir, offline=False):
+    """以依賴 hash 為 key 的快取安裝；快取命中時不需要網路"""
+    key = bootstrap_key()
+    entry = Path(cache_dir) / key
+    print(f"🔑 依賴 key: {key}")
+    print(f"📁 快取位置: {entry}")
+
+    started = time.monotonic()
+    manifest = verify_entry(entry)
+    if manifest is not None:
+        print("✓ 快取命中，完整性驗證通過")
+        if not restore_from_cache(entry, manifest, key):
+            return False
+        os.utime(entry)
+    elif offline:
+        print("❌ 快取未命中且指定了 --offline")
+        return False
+    else:
+        print("📥 快取未命中，建立 wheelhouse 與封存檔（需要網路）...")
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        if not build_cache(entry, key):
+            return False
+        prune_cache(entry.parent)
+    print(f"✓ 依賴就緒 ({time.monotonic() - started:.1f}s)")
+    return True
+
+
 def setup_env_file():
     """設置環境變數文件"""
     env_file = Path(".env")
@@ -89,6 +287,12 @@ def setup_env_file():
 
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description="Full Client E2E Testing 環境設置")
+    parser.add_argument("--cached", action="store_true", help="以依賴 hash 快取 wheelhouse / .venv / node_modules")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR, help="快取目錄（預設 $E2E_BOOTSTRAP_CACHE 或 .cache/bootstrap）")
+    parser.add_argument("--offline", action="store_true", help="搭配 --cached：快取未命中時直接失敗，不連網")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("🚀 Full Client E2E Testing - 環境設置")
     print(f"📍 平台: {platform.system()} {platform.release()}")
@@ -101,12 +305,18 @@ def main():
         return 1
     
     # 執行設置步驟
-    steps = [
-        ("創建虛擬環境", setup_venv),
-        ("安裝 Python 依賴", install_python_deps),
-        ("安裝 Node.js 依賴", install_node_deps),
-        ("設置環境變數", setup_env_file),
-    ]
+    if args.cached:
+        steps = [
+            ("安裝依賴（快取）", lambda: setup_cached(args.cache_dir, args.offline)),
+            ("設置環境變數", setup_env_file),
+        ]
+    else:
+        steps = [
+            ("創建虛擬環境", setup_venv),
+            ("安裝 Python 依賴", install_python_deps),
+            ("安裝 Node.js 依賴", install_node_deps),
+            ("設置環境變數", setup_env_file),
+        ]
     
     for step_name, step_func in steps:
         print(f"\n{'=' * 60}")
@@ -0,0 +1,302 @@
+"""
+pytest 共用 fixtures
+Session-scoped drivers built from env_loader.load_context.
+
+每個 pytest 程序（或 run_tests.py --workers 的每個 worker）只建立一次 driver，
+同一平台的測試共用該 session，不再於每個 setup_method 冷啟動。
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from resources.libs import driver_lease  # noqa: E402
+from resources.libs.env_loader import load_context  # noqa: E402
+from resources.libs.resource_leases import LeaseManager, acquire_all, release_all  # noqa: E402
+from resources.libs.timeline import record as record_span  # noqa: E402
+from resources.libs.watchdog import (  # noqa: E402
+    COMMANDS,
+    Watchdog,
+    deadline_for,
+    install_command_log,
+    load_config,
+    register_stack_signal,
+)
+
+PLATFORM_MARKERS = ("web", "android", "mac", "windows")
+
+# Local setup scripts write these into .env for desktop hosts; keep honouring them.
+_LEGACY_ENDPOINTS = {"windows": "WIN_REMOTE_URL", "mac": "MAC_REMOTE_URL"}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("e2e")
+    group.addoption("--env", default=os.getenv("E2E_ENV", "dev"), help="環境配置 (dev, staging, fake)")
+    group.addoption("--user-role", default=os.getenv("E2E_USER_ROLE"), help="用戶角色 (standard, admin)")
+    group.addoption(
+        "--e2e-plan",
+        default=None,
+        help="收集後把 {nodeid: platform} 寫到此 JSON 檔（run_tests.py --workers 使用）",
+    )
+
+
+def pytest_configure(config):
+    for platform in PLATFORM_MARKERS:
+        config.addinivalue_line("markers", f"{platform}: 需要 {platform} 端點的測試")
+    config.addinivalue_line("markers", "lease(*resources): 執行期間獨占的資源（跨 worker，見 resource_leases.py）")
+    config.addinivalue_line("markers", "account(*roles): 從環境的帳號池租用該角色的一個帳號")
+    config.addinivalue_line("markers", "deadline(seconds): 覆寫 config/watchdog.yaml 的測試期限")
+    # 卡住的測試：記錄最近的 WebDriver 指令；run_tests.py 殺掉 worker 前以 SIGUSR1 要求 stack dump
+    install_command_log()
+    register_stack_signal()
+
+
+def pytest_collection_finish(session):
+    plan_path = session.config.getoption("--e2e-plan")
+    if not plan_path:
+        return
+    plan = {}
+    for item in session.items:
+        marks = [mark.name for mark in item.iter_markers() if mark.name in PLATFORM_MARKERS]
+        plan[item.nodeid] = marks[0] if marks else None
+    Path(plan_path).write_text(json.dumps(plan, indent=2), encoding="utf-8")
+
+
+_FAILED = set()
+
+
+def pytest_runtest_logreport(report):
+    if report.failed:
+        _FAILED.add(report.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """每個測試（含 setup / teardown）記錄到 run_tests.py 的 timeline.jsonl"""
+    started = time.time()
+    yield
+    record_span("test", item.nodeid, started, status="FAIL" if item.nodeid in _FAILED else "PASS")
+
+
+@pytest.fixture(scope="session")
+def automation_context(request):
+    """Factory: automation_context("mac") -> load_context(...) 結果（每個平台快取一次）"""
+    cache = {}
+
+    def get(platform):
+        if platform not in cache:
+            context = load_context(
+                request.config.getoption("--env"),
+                platform,
+                request.config.getoption("--user-role"),
+            )
+            legacy = _LEGACY_ENDPOINTS.get(platform)
+            if legacy and os.getenv(legacy):
+                context = {**context, "remote_url": os.environ[legacy]}
+            cache[platform] = context
+        return cache[platform]
+
+    return get
+
+
+@pytest.fixture
+def fake_webdriver():
+    """Factory: fake_webdriver(latency={"newSession": 0.2}) -> tools/fake_webdriver.py 的 in-process server"""
+    sys.path.insert(0, str(ROOT / "tools"))
+    from fake_webdriver import FakeWebDriver, ServerHandle
+
+    servers = []
+
+    def start(**kwargs):
+        servers.append(ServerHandle(FakeWebDriver(**kwargs)))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture(scope="session")
+def watchdog_config():
+    return load_config()
+
+
+@pytest.fixture(scope="session")
+def watchdog():
+    return Watchdog(Path(os.getenv("E2E_WATCHDOG_DIR") or ROOT / "reports" / "watchdog"))
+
+
+@pytest.fixture(autouse=True)
+def hang_watchdog(request, watchdog, watchdog_config):
+    """超過期限（依 marker / @pytest.mark.deadline）時 dump stack 與指令、刪除 session，並讓測試失敗"""
+    tags = [mark.name for mark in request.node.iter_markers()]
+    tags += [f"deadline:{mark.args[0]}" for mark in request.node.iter_markers("deadline") if mark.args]
+    with watchdog.guard(request.node.nodeid, deadline_for(watchdog_config, tags), interrupt=pytest.fail):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def resource_leases(request):
+    """@pytest.mark.lease / @pytest.mark.account 宣告的資源：測試執行期間持有，依排隊順序取得"""
+    resources = sorted({name for mark in request.node.iter_markers("lease") for name in mark.args})
+    roles = sorted({role for mark in request.node.iter_markers("account") for role in mark.args})
+    if not resources and not roles:
+        yield []
+        return
+    manager = LeaseManager()
+    leases = acquire_all(manager, request.config.getoption("--env"), resources, roles, request.node.nodeid)
+    yield leases
+    release_all(manager, leases)
+
+
+class WorkerSessions:
+    """每個平台一個 session，worker 內共用
+
+    watchdog 刪掉卡住測試的 session 後（COMMANDS.was_deleted），下一個測試取用時重新建立，
+    同一 worker 其餘的測試不會拿到已失效的 session。
+    """
+
+    def __init__(self):
+        self._open = {}  # platform -> (session, session_id, close)
+
+    def get(self, platform, create):
+        entry = self._open.get(platform)
+        if entry is not None and COMMANDS.was_deleted(entry[1]):
+            self._close(entry)
+            entry = None
+        if entry is None:
+            entry = self._open[platform] = create()
+        return entry[0]
+
+    def close_all(self):
+        for entry in self._open.values():
+            self._close(entry)
+        self._open.clear()
+
+    @staticmethod
+    def _close(entry):
+        try:
+            entry[2]()
+        except Exception as e:  # session 已被刪除或節點已離線
+            print(f"[WARN] closing session {entry[1]}: {e}")
+
+
+@pytest.fixture(scope="session")
+def worker_sessions():
+    sessions = WorkerSessions()
+    yield sessions
+    sessions.close_all()
+
+
+@pytest.fixture
+def web_driver(automation_context, worker_sessions):
+    """Selenium Grid 上的瀏覽器 session（worker 內共用）"""
+    from selenium import webdriver
+    from selenium.webdriver.common.options import ArgOptions
+
+    def create():
+        context = automation_context("web")
+        options = ArgOptions()
+        for key, value in context["capabilities"].items():
+            options.set_capability(key, value)
+
+        driver = webdriver.Remote(command_executor=context["remote_url"], options=options)
+        timeouts = context["timeouts"]
+        driver.set_page_load_timeout(timeouts.get("page_load", 30))
+        return driver, driver.session_id, driver.quit
+
+    return worker_sessions.get("web", create)
+
+
+@pytest.fixture
+def mac_driver(automation_context, worker_sessions):
+    """Mac2 Appium session（worker 內共用；有 E2E_DRIVER_DAEMON 時租用預熱的 session）"""
+    from appium import webdriver
+    from appium.options.mac import Mac2Options
+
+    def create():
+        lease = driver_lease.acquire("mac")
+        if lease is not None:
+            return driver_lease.attach_appium(lease), lease.session_id, lambda: driver_lease.release(lease)
+
+        context = automation_context("mac")
+        options = Mac2Options()
+        options.load_capabilities(context["capabilities"])
+
+        driver = webdriver.Remote(context["remote_url"], options=options)
+        return driver, driver.session_id, driver.quit
+
+    return worker_sessions.get("mac", create)
+
+
+class WinAppDriverSession:
+    """Raw-HTTP WinAppDriver session (Selenium 4 client is not compatible with WinAppDriver)"""
+
+    def __init__(self, remote_url, capabilities, max_retries=3):
+        self.remote_url = remote_url.rstrip("/")
+        payload = {"desiredCapabilities": capabilities}
+        last_error = None
+
+        # Calculator window may need time to initialize
+        for attempt in range(max_retries):
+            if attempt > 0:
+                print(f"[INFO] Retrying... (attempt {attempt + 1}/{max_retries})")
+                time.sleep(3)
+            response = requests.post(f"{self.remote_url}/session", json=payload, timeout=30)
+            if response.status_code == 200:
+                data = response.json()
+                self.session_id = data.get("sessionId") or data.get("value", {}).get("sessionId")
+                self.base_url = f"{self.remote_url}/session/{self.session_id}"
+                print(f"[OK] Session created: {self.session_id}")
+                # Additional wait to ensure window is fully loaded
+                time.sleep(2)
+                return
+            last_error = f"Failed to create session: {response.status_code} - {response.text}"
+            print(f"[WARN] Attempt {attempt + 1} failed")
+
+        raise Exception(f"Failed after {max_retries} attempts: {last_error}")
+
+    @classmethod
+    def attach(cls, remote_url, session_id):
+        """Use an existing session (leased from tools/driver_daemon.py)"""
+        session = cls.__new__(cls)
+        session.remote_url = remote_url.rstrip("/")
+        session.session_id = session_id
+        session.base_url = f"{session.remote_url}/session/{session_id}"
+        return session
+
+    def quit(self):
+        requests.delete(self.base_url)
+        print("\n[OK] Session closed")
+
+
+@pytest.fixture
+def windows_session(automation_context, worker_sessions):
+    """WinAppDriver Calculator session（worker 內共用；有 E2E_DRIVER_DAEMON 時租用預熱的 session）"""
+
+    def create():
+        lease = driver_lease.acquire("windows")
+        if lease is not None:
+            session = WinAppDriverSession.attach(lease.remote_url, lease.session_id)
+            return session, lease.session_id, lambda: driver_lease.release(lease)
+
+        context = automation_context("windows")
+        capabilities = {
+            key: value
+            for key, value in context["capabilities"].items()
+            if key in ("app", "platformName", "deviceName")
+        }
+        session = WinAppDriverSession(context["remote_url"], capabilities)
+        return session, session.session_id, session.quit
+
+    return worker_sessions.get("windows", create)
@@ -0,0 +1,58 @@
+"""
+async_driver 的單元測試：對 tools/fake_webdriver.py 執行，不需要 Grid
+"""
+from __future__ import annotations
+
+import asyncio
+
+from resources.libs.async_driver import run_sessions, w3c_capabilities
+
+
+def test_payload_carries_w3c_and_legacy_capabilities():
+    context = {"platform": "windows", "capabilities": {"app": "Calc", "platformName": "Windows"}}
+    payload = w3c_capabilities(context)
+    assert payload["capabilities"]["alwaysMatch"] == {"appium:app": "Calc", "platformName": "Windows"}
+    assert payload["desiredCapabilities"] == {"app": "Calc", "platformName": "Windows"}
+
+
+def test_jobs_run_in_their_own_sessions(fake_webdriver):
+    server = fake_webdriver()
+
+    async def title(session):
+        await session.get("https://example.test/login")
+        return await session.title()
+
+    context = {"remote_url": server.url, "capabilities": {"browserName": "chrome"}}
+    results = asyncio.run(run_sessions(context, [title] * 4, concurrency=2))
+    assert [result.ok for result in results] == [True] * 4
+    assert len({result.session_id for result in results}) == 4
+    assert server.driver.sessions == {}
+
+
+def test_session_created_after_the_timeout_is_still_deleted(fake_webdriver):
+    # newSession 在 create_timeout 之後才回應：shield 讓 POST 繼續，session 建立後仍被刪除
+    server = fake_webdriver(latency={"newSession": 0.3})
+    context = {"remote_url": server.url, "capabilities": {}}
+    results = asyncio.run(run_sessions(context, [lambda session: session.title()] * 2, create_timeout=0.05))
+    assert [result.error for result in results] == ["session creation timed out after 0.05s"] * 2
+    assert all(result.session_id for result in results)
+    assert server.driver.stats["sessions_created"] == 2
+    assert server.driver.sessions == {}
+
+
+def test_overrunning_job_is_cancelled_and_its_session_deleted(fake_webdriver):
+    server = fake_webdriver()
+    cancelled = []
+
+    async def hang(session):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(session.session_id)
+            raise
+
+    context = {"remote_url": server.url, "capabilities": {}}
+    [result] = asyncio.run(run_sessions(context, [hang], session_timeout=0.1))
+    assert result.error == "job timed out after 0.1s"
+    assert cancelled == [result.session_id]
+    assert server.driver.sessions == {}
@@ -0,0 +1,104 @@
+"""
+tools/caching_proxy.py 的單元測試：本機 upstream + proxy，不連外
+"""
+from __future__ import annotations
+
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from caching_proxy import start_proxy  # noqa: E402
+
+
+@pytest.fixture
+def upstream():
+    """回應任何 GET 的本機伺服器，記錄收到的路徑"""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            body = b"console.log(1)"
+            self.send_response(200)
+            self.send_header("Content-Type", "application/javascript")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+
+
+@pytest.fixture
+def proxy_config(tmp_path):
+    config = tmp_path / "proxy.yaml"
+    config.write_text(
+        yaml.safe_dump(
+            {
+                "deny": ["*.tracker.test"],
+                "cache": {"dir": str(tmp_path / "cache"), "extensions": [".js"]},
+            }
+        ),
+        encoding="utf-8",
+    )
+    return config
+
+
+def _get(proxy, url):
+    return requests.get(url, proxies={"http": f"http://127.0.0.1:{proxy.port}"}, timeout=5)
+
+
+def _connect(proxy, target):
+    with socket.create_connection(("127.0.0.1", proxy.port), timeout=5) as sock:
+        sock.sendall(f"CONNECT {target} HTTP/1.1\r\nHost: {target}\r\n\r\n".encode())
+        return sock.recv(1024).split(b"\r\n", 1)[0].decode()
+
+
+def test_listens_on_loopback_by_default(proxy_config):
+    proxy = start_proxy(port=0, config_file=proxy_config)
+    try:
+        assert proxy._server.sockets[0].getsockname()[0] == "127.0.0.1"
+    finally:
+        proxy.stop()
+
+
+def test_static_assets_are_cached_and_replayed(upstream, proxy_config):
+    base, hits = upstream
+    proxy = start_proxy(port=0, config_file=proxy_config)
+    try:
+        assert [_get(proxy, f"{base}/app.js").headers["X-Proxy-Cache"] for _ in range(2)] == ["MISS", "HIT"]
+        assert _get(proxy, "http://cdn.tracker.test/t.js").status_code == 204
+    finally:
+        stats = proxy.stop()
+    assert hits == ["/app.js"]
+    assert (stats["cache_hits"], stats["cache_stores"], stats["blocked_hosts"]) == (1, 1, {"cdn.tracker.test": 1})
+
+    replay = start_proxy("replay", port=0, config_file=proxy_config)
+    try:
+        assert _get(replay, f"{base}/app.js").content == b"console.log(1)"
+        assert _get(replay, f"{base}/other.js").status_code == 504
+    finally:
+        replay.stop()
+    assert hits == ["/app.js"]
+
+
+def test_connect_only_to_allowed_ports(proxy_config):
+    proxy = start_proxy(port=0, config_file=proxy_config)
+    try:
+        assert _connect(proxy, "example.test:22") == "HTTP/1.1 403 Forbidden"
+        assert _connect(proxy, "ads.tracker.test:443") == "HTTP/1.1 403 Forbidden"
+    finally:
+        stats = proxy.stop()
+    assert stats["tunnels"] == 0 and stats["blocked"] == 2
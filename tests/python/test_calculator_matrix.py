@@ -0,0 +1,94 @@
+"""
+calculator_matrix 的單元測試：以模擬的計算機執行整個矩陣，不需要 Appium
+"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from resources.libs import calculator_matrix
+from resources.libs.calculator_matrix import (
+    KEYMAPS,
+    compute_expected,
+    format_expected,
+    load_operations,
+    parse_display,
+    run_matrix,
+)
+
+
+def test_expected_values_and_division_by_zero():
+    table = calculator_matrix._table([1, 6, 3, 8, 1], ["+", "−", "×", "÷", "/"], [2, 4, 5, 2, 0])
+    expected = compute_expected(table)
+    assert expected[:4].tolist() == [3, 2, 15, 4]
+    assert np.isnan(expected[4])
+
+
+@pytest.mark.parametrize(
+    "locale, rendered",
+    [
+        ("en_US", ["1,234,567", "-1,234.5", "0.3333333333333333", "Not a number"]),
+        ("de_DE", ["1.234.567", "-1.234,5", "0,3333333333333333", "Not a number"]),
+    ],
+)
+def test_format_expected_follows_the_locale(locale, rendered):
+    values = np.array([1234567, -1234.5, 1 / 3, np.nan])
+    assert format_expected(values, locale).tolist() == rendered
+
+
+def test_parse_display_reads_back_formatted_values():
+    values = np.array([0, 42, -1234.5, 0.125, 1e9])
+    for locale in calculator_matrix.LOCALES:
+        assert parse_display(list(format_expected(values, locale)), locale).tolist() == values.tolist()
+    parsed = parse_display(["Display is 5", "−3", "", "Cannot divide by zero"])
+    assert parsed[:2].tolist() == [5, -3]
+    assert np.isnan(parsed[2:]).all()
+
+
+def test_generated_table(tmp_path):
+    spec = tmp_path / "ops.yaml"
+    spec.write_text(
+        "cases:\n  - {lhs: 1, op: '+', rhs: 1}\n"
+        "generate: {lhs: [0, 9], rhs: [1, 9], ops: ['*', '/'], count: 500, seed: 3}\n",
+        encoding="utf-8",
+    )
+    table = load_operations(spec)
+    assert len(table) == 501
+    assert set(table.op[1:]) <= {"*", "/"}
+    assert table.rhs[1:].min() >= 1 and table.lhs.max() <= 9
+    assert np.array_equal(load_operations(spec).lhs, table.lhs)  # same seed, same table
+
+
+class FakeCalculator:
+    """依 KEYMAPS 按鍵運算的計算機（只處理非負的輸入），wrong 中的結果故意顯示錯誤"""
+
+    def __init__(self, platform, wrong=()):
+        self.names = {name: key for key, name in KEYMAPS[platform].items()}
+        self.wrong = set(wrong)
+        self.keys = []
+        self.display = "0"
+
+    def press(self, name):
+        key = self.names[name]
+        if key == "clear":
+            self.keys = []
+        elif key == "=":
+            expression = "".join(self.keys)
+            for op in "+-*/":
+                lhs, sep, rhs = expression.partition(op)
+                if sep and lhs:
+                    break
+            value = compute_expected(calculator_matrix._table([lhs], [op], [rhs]))[0]
+            value = value + 1 if value in self.wrong else value
+            self.display = format_expected(np.array([value]))[0]
+        else:
+            self.keys.append(key)
+
+
+def test_run_matrix_reports_only_the_wrong_cases():
+    table = calculator_matrix._table([12, 7, 9, 2.5], ["+", "*", "/", "-"], [30, 5, 0, 4])
+    calculator = FakeCalculator("windows", wrong={42})
+    result = run_matrix(table, calculator.press, lambda: calculator.display, "windows")
+    assert result.passed.tolist() == [False, True, True, True]
+    assert result.failures() == [{"case": 0, "expression": "12 + 30", "expected": "42", "display": "43"}]
+    assert result.summary()["cases"] == 4 and result.summary()["failed"] == 1
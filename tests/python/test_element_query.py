@@ -0,0 +1,56 @@
+"""
+element_query 的單元測試：對 tools/fake_webdriver.py 的網頁執行
+"""
+from __future__ import annotations
+
+import pytest
+from selenium import webdriver
+from selenium.webdriver.common.options import ArgOptions
+
+from resources.libs.element_query import query_elements, split_locator
+
+
+@pytest.mark.parametrize(
+    "locator, expected",
+    [
+        ("css:form#login input", ("css", "form#login input")),
+        ("CSS: h3", ("css", "h3")),
+        ("xpath://button", ("xpath", "//button")),
+        ("(//input)[1]", ("xpath", "(//input)[1]")),
+        ("input[name=q]", ("css", "input[name=q]")),
+    ],
+)
+def test_split_locator(locator, expected):
+    assert split_locator(locator) == expected
+
+
+@pytest.fixture
+def driver(fake_webdriver):
+    server = fake_webdriver()
+    options = ArgOptions()
+    options.set_capability("browserName", "chrome")
+    driver = webdriver.Remote(command_executor=server.url, options=options)
+    driver.get("https://example.test/login")
+    yield server, driver
+    driver.quit()
+
+
+def test_query_is_one_round_trip_for_all_matches(driver):
+    server, driver = driver
+    before = server.driver.stats["commands"]
+    records = query_elements(driver, "css:input", attributes=["name", "type"])
+    assert server.driver.stats["commands"] - before == 1
+    assert [record.attributes for record in records] == [
+        {"name": "email", "type": "email"},
+        {"name": "password", "type": "password"},
+        {"name": "q", "type": "text"},
+        {"name": None, "type": "submit"},
+    ]
+    assert all(record.tag == "input" and record.visible for record in records)
+
+
+def test_xpath_and_limit(driver):
+    _, driver = driver
+    [button] = query_elements(driver, "//button", limit=1)
+    assert (button.tag, button.text) == ("button", "Sign in")
+    assert len(query_elements(driver, "input", limit=3)) == 3
@@ -0,0 +1,27 @@
+"""
+failure_index 的單元測試：訊息正規化與失敗分群（索引寫在 tmp_path）
+"""
+from __future__ import annotations
+
+from resources.libs import failure_index
+
+
+def test_failure_message_normalization():
+    message = (
+        "TimeoutException: element #row-42 not visible after 10.5s at https://example.test/a?b=1 "
+        "(session 3f2504e0-4f89-11d3-9a0c-0305e82c3301, /home/ci/work/tests/web/login.robot)"
+    )
+    assert failure_index.normalize_message(message) == (
+        "TimeoutException: element #row-<n> not visible after <n>s at <url> (session <uuid>, login.robot)"
+    )
+
+
+def test_failure_clusters_group_variants(tmp_path):
+    conn = failure_index.open_index(tmp_path / "failures.sqlite")
+    clusterer = failure_index._Clusterer(conn, failure_index.THRESHOLD)
+    timeout = "TimeoutException: Element css:#login-button did not appear in <n> seconds | login.robot:Open Login Page"
+    first = clusterer.assign(timeout, "TimeoutException")
+    assert clusterer.assign(timeout, "TimeoutException") == first
+    assert clusterer.assign(timeout.replace("Open Login Page", "Open Login Form"), "TimeoutException") == first
+    other = "AssertionError: Expected total '<n>' but got 'NaN' in cart summary | checkout.robot:Verify Cart Total"
+    assert clusterer.assign(other, "AssertionError") != first
@@ -3,28 +3,27 @@ Google 搜尋測試 - Python pytest 版本
 測試在 Google 搜尋 "apple"
 """
 import pytest
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from resources.libs.element_query import query_elements  # conftest.py 已將專案根目錄加入 sys.path
+
+
+pytestmark = pytest.mark.web
+
 
 class TestGoogleSearch:
     """Google 搜尋測試類"""
     
     driver = None
     
-    def setup_method(self):
-        """在每個測試前設置瀏覽器"""
-        # 使用本地 Chrome（也可以配置為使用 Selenium Grid）
-        self.driver = webdriver.Chrome()
+    @pytest.fixture(autouse=True)
+    def _session(self, web_driver):
+        """使用 conftest 的 web_driver（Selenium Grid，worker 內共用）"""
+        self.driver = web_driver
         self.driver.maximize_window()
-        
-    def teardown_method(self):
-        """在每個測試後關閉瀏覽器"""
-        if self.driver:
-            self.driver.quit()
     
     def test_google_search_apple(self):
         """測試在 Google 搜尋 'apple'"""
@@ -66,7 +65,8 @@ class TestGoogleSearch:
             # 8. 嘗試找到搜尋結果區塊
             print("8. 檢查搜尋結果區塊...")
             try:
-                results = self.driver.find_elements(By.CSS_SELECTOR, "h3")
+                # 一次 execute_script 取回所有標題的文字與可見性，不必逐一 .text
+                results = [record for record in query_elements(self.driver, "h3") if record.visible]
                 print(f"   找到 {len(results)} 個搜尋結果標題")
                 if len(results) > 0:
                     print(f"   第一個結果: {results[0].text[:50]}...")
@@ -3,33 +3,26 @@ Google 搜尋簡單測試 - 不觸發 CAPTCHA
 測試基本功能：開啟 Google、輸入搜尋關鍵字
 """
 import pytest
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from resources.libs.element_query import query_elements  # conftest.py 已將專案根目錄加入 sys.path
+
+
+pytestmark = pytest.mark.web
+
 
 class TestGoogleSearchSimple:
     """Google 搜尋簡單測試類"""
     
     driver = None
     
-    def setup_method(self):
-        """在每個測試前設置瀏覽器"""
-        options = webdriver.ChromeOptions()
-        # 添加選項避免被檢測為機器人
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        self.driver = webdriver.Chrome(options=options)
+    @pytest.fixture(autouse=True)
+    def _session(self, web_driver):
+        """使用 conftest 的 web_driver（Selenium Grid，worker 內共用）"""
+        self.driver = web_driver
         self.driver.maximize_window()
-        
-    def teardown_method(self):
-        """在每個測試後關閉瀏覽器"""
-        if self.driver:
-            self.driver.quit()
     
     def test_google_open_and_search_input(self):
         """測試開啟 Google 並輸入搜尋關鍵字（不執行搜尋）"""
@@ -94,8 +87,8 @@ class TestGoogleSearchSimple:
         
         print("4. 檢查搜尋按鈕...")
         # Google 有多個搜尋按鈕，我們只確認至少有一個存在
-        buttons = self.driver.find_elements(By.CSS_SELECTOR, "input[type='submit'], button[type='submit']")
-        print(f"   找到 {len(buttons)} 個提交按鈕")
+        buttons = query_elements(self.driver, "input[type='submit'], button[type='submit']", attributes=["value"])
+        print(f"   找到 {len(buttons)} 個提交按鈕（{sum(button.visible for button in buttons)} 個可見）")
         
         print("\n✅ Google 首頁元素檢查通過！")
 
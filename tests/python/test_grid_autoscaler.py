@@ -0,0 +1,37 @@
+"""
+grid_autoscaler 的單元測試：佇列寫在 tmp_path，以 NoopBackend 取代 docker compose
+"""
+from __future__ import annotations
+
+from resources.libs.grid_autoscaler import Autoscaler, NoopBackend, publish_demand
+
+
+def _autoscaler(tmp_path, **config):
+    services = {"chrome": {"service": "chrome", "slots_per_node": 2, "min": 0, "max": 4}}
+    return Autoscaler({"services": services, **config}, NoopBackend({}), queue_dir=tmp_path)
+
+
+def test_autoscaler_target(tmp_path):
+    scaler = _autoscaler(tmp_path, headroom=1.5)
+    spec = scaler.config["services"]["chrome"]
+    assert scaler.target(spec, busy=0, pending=0) == 0
+    assert scaler.target(spec, busy=1, pending=2) == 3  # ceil(3 * 1.5 / 2)
+    assert scaler.target(spec, busy=10, pending=10) == 4
+    assert scaler.target({**spec, "min": 1}, busy=0, pending=0) == 1
+
+
+def test_autoscaler_step_scales_up_at_once_and_down_after_delay(tmp_path):
+    scaler = _autoscaler(tmp_path, scale_up_cooldown=20, scale_down_after=60)
+    publish_demand("chrome", 3, 0, queue_dir=tmp_path)
+    assert scaler.step(now=0)[0]["action"] == "up 0->2"
+
+    publish_demand("chrome", 8, 0, queue_dir=tmp_path)
+    assert "action" not in scaler.step(now=10)[0]  # cooldown
+    assert scaler.step(now=20)[0]["action"] == "up 2->4"
+
+    publish_demand("chrome", 0, 1, queue_dir=tmp_path)
+    assert "action" not in scaler.step(now=30)[0]  # 仍有 session 執行中
+    publish_demand("chrome", 0, 0, queue_dir=tmp_path)
+    assert "action" not in scaler.step(now=40)[0]
+    assert "action" not in scaler.step(now=90)[0]
+    assert scaler.step(now=100)[0]["action"] == "down 4->0"
@@ -0,0 +1,83 @@
+"""
+http_fixtures 的單元測試：stand-in 對本機 upstream 錄製，再離線重播
+"""
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from resources.libs.http_fixtures import MISS_STATUS, FixtureServers, fixture_mode, request_key
+
+
+@pytest.fixture
+def upstream():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            body = f"hello {self.path}".encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/", hits
+    server.shutdown()
+
+
+def _servers(tmp_path, mode, base_url):
+    config = {"http_fixtures": {"mode": mode, "cassettes": str(tmp_path), "ignore_query": ["ts"]}}
+    return FixtureServers("unit", config, {"base_url": base_url})
+
+
+def test_record_then_replay_offline(tmp_path, upstream):
+    base_url, hits = upstream
+    servers = _servers(tmp_path, "record", base_url)
+    url = servers.environment_variables()["E2E_FIXTURE_BASE_URL"]
+    assert requests.get(f"{url}page?ts=1", timeout=5).text == "hello /page?ts=1"
+    assert servers.stop()["base_url"]["recorded"] == 1
+
+    servers = _servers(tmp_path, "replay", "http://127.0.0.1:9/")
+    url = servers.environment_variables()["E2E_FIXTURE_BASE_URL"]
+    try:
+        assert requests.get(f"{url}page?ts=2", timeout=5).text == "hello /page?ts=1"
+        assert requests.get(f"{url}other", timeout=5).status_code == MISS_STATUS
+    finally:
+        stats = servers.stop()["base_url"]
+    assert (stats["replayed"], stats["misses"]) == (1, 1)
+    assert hits == ["/page?ts=1"]
+
+
+def test_stand_ins_listen_on_loopback_by_default(tmp_path, upstream):
+    servers = _servers(tmp_path, "replay", upstream[0])
+    try:
+        assert servers.listen == "127.0.0.1"
+        assert servers.environment_variables()["E2E_FIXTURE_BASE_URL"].startswith("http://127.0.0.1:")
+    finally:
+        servers.stop()
+
+
+def test_request_key_ignores_query_order_and_listed_parameters():
+    key = request_key("get", "/a?x=1&y=2&ts=5", b"")
+    assert request_key("GET", "/a?y=2&x=1&ts=5", b"") == key
+    assert request_key("GET", "/a?y=2&x=1&ts=9", b"", ["ts"]) == request_key("GET", "/a?x=1&y=2", b"")
+    assert request_key("POST", "/a?x=1&y=2&ts=5", b"{}") != key
+
+
+@pytest.mark.parametrize("value, mode", [(False, "off"), (None, "off"), ("off", "off"), (" Replay ", "replay")])
+def test_fixture_mode(value, mode):
+    assert fixture_mode(value) == mode
+
+
+def test_fixture_mode_rejects_unknown_values():
+    with pytest.raises(ValueError, match="record"):
+        fixture_mode("recording")
@@ -0,0 +1,66 @@
+"""
+journey_orchestrator 的單元測試：以假的 driver 取代 Remote session
+"""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from resources.libs import journey_orchestrator as orchestrator
+
+
+class FakeDriver:
+    def __init__(self, platform):
+        self.platform = platform
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """記錄實際開始建立的 session；web 需要 0.1 秒"""
+    drivers = []
+
+    def create(context):
+        if context["platform"] == "web":
+            time.sleep(0.1)
+        drivers.append(FakeDriver(context["platform"]))
+        return drivers[-1]
+
+    monkeypatch.setattr(
+        orchestrator, "build_context", lambda env, platform, role: {"platform": platform, "remote_url": "-"}
+    )
+    monkeypatch.setattr(orchestrator, "create_remote_driver", create)
+    return drivers
+
+
+def test_close_journey_quits_prewarmed_and_drops_queued_startups(started):
+    journey = orchestrator.journey_orchestrator(max_parallel_startups=1)
+    journey.prewarm_channel("web")
+    journey.prewarm_channel("android")  # 排在 web 之後，尚未開始
+    journey.close_journey()
+    assert [(driver.platform, driver.quit_called) for driver in started] == [("web", True)]
+    assert journey._executor._shutdown
+
+
+def test_prewarm_is_idempotent(started):
+    journey = orchestrator.journey_orchestrator()
+    journey.prewarm_channel("android")
+    first = journey._channels["android"].future
+    journey.prewarm_channel("android")
+    assert journey._channels["android"].future is first
+    journey.close_journey()
+    assert len(started) == 1
+
+
+def test_journey_state():
+    journey = orchestrator.journey_orchestrator()
+    journey.set_journey_state("order", "A-1")
+    assert journey.get_journey_state("order") == "A-1"
+    assert journey.get_journey_state("missing", "fallback") == "fallback"
+    with pytest.raises(AssertionError, match="missing"):
+        journey.get_journey_state("missing")
+    journey.close_journey()
@@ -0,0 +1,50 @@
+"""
+log_policy 的單元測試：preset 參數、log 門檻比對與 payload 摘要
+"""
+from __future__ import annotations
+
+import gzip
+
+import pytest
+
+from resources.libs.log_policy import _PAYLOAD_DEFAULTS, excerpt, level_for, offload, preset_options
+
+
+def test_preset_options():
+    policy = {
+        "presets": {
+            "full": {"loglevel": "DEBUG:INFO", "policy": False},
+            "ci": {"removekeywords": ["passed"], "maxassignlength": 0},
+        }
+    }
+    assert preset_options("full", policy) == (["--loglevel=DEBUG:INFO"], False)
+    assert preset_options("ci", policy) == (["--removekeywords=passed", "--maxassignlength=0"], True)
+    with pytest.raises(ValueError, match="ci, full"):
+        preset_options("tiny", policy)
+
+
+def test_log_level_most_specific_pattern_wins():
+    levels = {"SeleniumLibrary": "INFO", "SeleniumLibrary.Get*": "DEBUG", "seleniumlibrary.get text": "TRACE"}
+    assert level_for(levels, "SeleniumLibrary", "Get Text") == "TRACE"
+    assert level_for(levels, "SeleniumLibrary", "Get Title") == "DEBUG"
+    assert level_for(levels, "SeleniumLibrary", "Click Element") == "INFO"
+    assert level_for(levels, "BuiltIn", "Log") is None
+
+
+def test_excerpt_keeps_head_tail_and_matching_lines(tmp_path):
+    settings = {**_PAYLOAD_DEFAULTS, "head_lines": 2, "tail_lines": 1, "keep_patterns": ["FAILED"]}
+    lines = [f"line {n}" for n in range(100)]
+    lines[50] = "test_login FAILED"
+    short, omitted = excerpt("\n".join(lines), settings)
+    assert short.splitlines() == [
+        "line 0",
+        "line 1",
+        "… 96 lines omitted, 1 matching lines kept:",
+        "test_login FAILED",
+        "…",
+        "line 99",
+    ]
+    assert omitted == 96
+    stored = offload("\n".join(lines), tmp_path, "payloads", "Login Test")
+    assert stored == offload("\n".join(lines), tmp_path, "payloads", "Login Test")
+    assert gzip.open(stored, "rt", encoding="utf-8").read().count("\n") == 99
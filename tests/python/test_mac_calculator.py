@@ -3,32 +3,50 @@
 Mac Calculator E2E Test
 直接使用 Appium Python Client 測試 macOS Calculator
 """
+import os
 import pytest
 import time
-from appium import webdriver
-from appium.options.mac import Mac2Options
+from pathlib import Path
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from resources.libs import calculator_matrix  # conftest.py 已將專案根目錄加入 sys.path
+from resources.libs.ui_tree import UiTree, tree_cache_enabled
+
+
+pytestmark = [pytest.mark.mac, pytest.mark.lease("mac-calculator")]
+
 
 class TestMacCalculator:
     """Mac Calculator 測試類別"""
 
-    def setup_method(self):
-        """在每個測試前設置 Appium session"""
-        options = Mac2Options()
-        options.platform_name = "mac"
-        options.automation_name = "Mac2"
-        options.bundle_id = "com.apple.calculator"
+    CLEAR = '//XCUIElementTypeButton[@title="AC" or @title="C"]'
 
-        self.driver = webdriver.Remote("http://127.0.0.1:4723", options=options)
+    @pytest.fixture(autouse=True)
+    def _session(self, mac_driver):
+        """共用 worker 的 Appium session，每個測試前先清除計算機"""
+        self.driver = mac_driver
         self.wait = WebDriverWait(self.driver, 10)
-
-    def teardown_method(self):
-        """在每個測試後關閉 session"""
-        if self.driver:
-            self.driver.quit()
+        # E2E_TREE_CACHE=1：在快取的 page_source 上本機定位，點擊改用座標
+        self.tree = UiTree.for_appium(self.driver) if tree_cache_enabled() else None
+        self.clear()
+
+    def clear(self):
+        if self.tree is not None:
+            self.tree.click_if_present("xpath", self.CLEAR)
+            return
+        clear = self.driver.find_elements(By.XPATH, self.CLEAR)
+        if clear:
+            clear[0].click()
+
+    def press(self, title):
+        """點擊 title 對應的計算機按鈕"""
+        locator = f'//XCUIElementTypeButton[@title="{title}"]'
+        if self.tree is not None:
+            self.tree.click("xpath", locator)
+        else:
+            self.wait.until(EC.presence_of_element_located((By.XPATH, locator))).click()
 
     def get_calculator_result(self):
         """
@@ -50,6 +68,18 @@ class TestMacCalculator:
             '//XCUIElementTypeWindow[1]//XCUIElementTypeGroup[1]//XCUIElementTypeStaticText[1]',
         ]
         
+        if self.tree is not None:
+            # 一次 page_source，所有策略都在本機評估
+            node = self.tree.first(
+                [("xpath", selector) for selector in selectors],
+                accept=lambda node: (node.get("value") or "").strip(),
+            )
+            if node is not None:
+                return node.get("value")
+            print("⚠️  無法找到結果元素，印出 page source 以供 debug：")
+            print(self.driver.page_source)
+            raise Exception("無法找到計算機結果顯示元素")
+
         for selector in selectors:
             try:
                 result = self.driver.find_element(By.XPATH, selector)
@@ -68,34 +98,14 @@ class TestMacCalculator:
     def test_calculator_addition_1_plus_2(self):
         """測試計算機加法功能：1 + 2 = 3"""
         try:
-            # 點擊按鈕 1 (使用 title 屬性)
-            button_1 = self.wait.until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//XCUIElementTypeButton[@title="1"]')
-                )
-            )
-            button_1.click()
-
-            # 點擊 + 號 (使用 title="+")
-            button_plus = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="+"]'
-            )
-            button_plus.click()
-
-            # 點擊按鈕 2 (使用 title="2")
-            button_2 = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="2"]'
-            )
-            button_2.click()
+            self.press("1")
+            self.press("+")
+            self.press("2")
 
             # 等待一下確保輸入完成
             time.sleep(0.3)
 
-            # 點擊 = 號 (使用 label="等於")
-            button_equals = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="="]'
-            )
-            button_equals.click()
+            self.press("=")
 
             # 等待計算完成
             time.sleep(1)
@@ -117,29 +127,13 @@ class TestMacCalculator:
     def test_calculator_addition_5_plus_5(self):
         """測試計算機加法功能：5 + 5 = 10"""
         try:
-            button_5 = self.wait.until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//XCUIElementTypeButton[@title="5"]')
-                )
-            )
-            button_5.click()
-
-            button_plus = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="+"]'
-            )
-            button_plus.click()
-
-            button_5 = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="5"]'
-            )
-            button_5.click()
+            self.press("5")
+            self.press("+")
+            self.press("5")
 
             time.sleep(0.3)
 
-            button_equals = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="="]'
-            )
-            button_equals.click()
+            self.press("=")
 
             time.sleep(1)
 
@@ -157,29 +151,13 @@ class TestMacCalculator:
     def test_calculator_addition_3_plus_7(self):
         """測試計算機加法功能：3 + 7 = 10"""
         try:
-            button_3 = self.wait.until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//XCUIElementTypeButton[@title="3"]')
-                )
-            )
-            button_3.click()
-
-            button_plus = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="+"]'
-            )
-            button_plus.click()
-
-            button_7 = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="7"]'
-            )
-            button_7.click()
+            self.press("3")
+            self.press("+")
+            self.press("7")
 
             time.sleep(0.3)
 
-            button_equals = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="="]'
-            )
-            button_equals.click()
+            self.press("=")
 
             time.sleep(1)
 
@@ -197,29 +175,13 @@ class TestMacCalculator:
     def test_calculator_multiplication(self):
         """測試計算機乘法功能：4 × 5 = 20"""
         try:
-            button_4 = self.wait.until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//XCUIElementTypeButton[@title="4"]')
-                )
-            )
-            button_4.click()
-
-            button_multiply = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="×"]'
-            )
-            button_multiply.click()
-
-            button_5 = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="5"]'
-            )
-            button_5.click()
+            self.press("4")
+            self.press("×")
+            self.press("5")
 
             time.sleep(0.3)
 
-            button_equals = self.driver.find_element(
-                By.XPATH, '//XCUIElementTypeButton[@title="="]'
-            )
-            button_equals.click()
+            self.press("=")
 
             time.sleep(1)
 
@@ -234,6 +196,42 @@ class TestMacCalculator:
             print(f"✗ 測試失敗：{e}")
             raise
 
+    def test_calculator_operation_matrix(self, tmp_path):
+        """資料驅動：在同一個 session 中執行整張運算表（預設 resources/data/calculator_operations.csv）"""
+        table = calculator_matrix.load_operations(
+            os.getenv("CALC_MATRIX_TABLE", calculator_matrix.DEFAULT_TABLE)
+        )
+        buttons = {}
+
+        def press(title):
+            if self.tree is not None:
+                return self.press(title)
+            # 按鈕元素只查找一次，之後直接點擊（warm session）
+            if title not in buttons:
+                buttons[title] = self.wait.until(
+                    EC.presence_of_element_located(
+                        (By.XPATH, f'//XCUIElementTypeButton[@title="{title}"]')
+                    )
+                )
+            buttons[title].click()
+
+        result = calculator_matrix.run_matrix(
+            table,
+            press=press,
+            read_display=self.get_calculator_result,
+            platform="mac",
+            locale=os.getenv("CALC_LOCALE", "en_US"),
+            reset=self.clear,  # 清除鍵在 "AC" 與 "C" 之間切換
+        )
+        report = result.write_json(
+            Path(os.getenv("CALC_MATRIX_REPORT_DIR") or tmp_path) / "calculator-matrix-mac.json"
+        )
+        summary = result.summary()
+        print(f"✓ {summary['passed']}/{summary['cases']} 通過，"
+              f"{summary['cases_per_second']} cases/s，報告: {report}")
+
+        assert summary["failed"] == 0, f"運算表失敗案例: {result.failures()[:10]}"
+
     def test_calculator_launches(self):
         """簡單測試：確認計算機應用程式成功啟動"""
         # 這個測試只確認 session 建立成功
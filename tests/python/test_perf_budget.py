@@ -0,0 +1,95 @@
+"""
+perf_budget 的單元測試：listener 以 Robot 在程序內對 tools/fake_webdriver.py 執行
+"""
+from __future__ import annotations
+
+import io
+import json
+import sys
+
+import robot
+
+from resources.libs import perf_budget
+from resources.libs.perf_budget import budgets_for, summarize_run
+
+SUITE = """
+*** Settings ***
+Library    SeleniumLibrary
+Suite Teardown    Close All Browsers
+
+*** Test Cases ***
+Login
+    Open Browser    https://example.test/login    chrome    remote_url=${REMOTE}
+    Input Text    name:email    user@example.test
+    FOR    ${i}    IN RANGE    5
+        Click Element    name:password
+    END
+    Click Button    css:button[type=submit]
+"""
+
+
+def test_budgets_for_applies_tag_overrides_and_budget_tags():
+    config = {
+        "keywords": {"Go To": 2, "Login With Credentials": 5},
+        "navigation": {"load": 3},
+        "tags": {"smoke": {"Login With Credentials": 3, "load": 1.5}},
+    }
+    assert budgets_for(config, []) == {"go to": 2, "login with credentials": 5, "nav:load": 3}
+    budgets = budgets_for(config, ["Smoke", "budget:Go To=500ms", "budget:ttfb=0.4s"])
+    assert budgets == {"go to": 0.5, "login with credentials": 3, "nav:load": 1.5, "nav:ttfb": 0.4}
+
+
+def test_listener_reads_navigation_timing_only_after_navigations(fake_webdriver, monkeypatch, tmp_path):
+    server = fake_webdriver(latency={"url": 0.02})
+    module = sys.modules[type(server.driver).__module__]
+    calls = []
+
+    def counting(handler):
+        def wrapped(driver, session, args):
+            if handler.__name__ == "_navigation_timing":
+                calls.append(session.scene.url)
+            return handler(driver, session, args)
+
+        return wrapped
+
+    monkeypatch.setattr(module, "SCRIPT_HANDLERS", [(matches, counting(h)) for matches, h in module.SCRIPT_HANDLERS])
+    suite = tmp_path / "perf.robot"
+    suite.write_text(SUITE, encoding="utf-8")
+    rc = robot.run(
+        str(suite),
+        outputdir=str(tmp_path),
+        output="NONE",
+        log="NONE",
+        report="NONE",
+        variable=[f"REMOTE:{server.url}", "ENV:fake", "PLATFORM:web"],
+        listener=str(perf_budget.BASE_DIR / "resources" / "libs" / "perf_budget.py"),
+        stdout=io.StringIO(),
+    )
+    assert rc == 0
+    # Open Browser 之後一次、測試結束時一次；六次點擊不增加 round trip
+    assert calls == ["https://example.test/login"] * 2
+    run = json.loads((tmp_path / "perf.json").read_text(encoding="utf-8"))
+    [navigation] = run["tests"]["Perf.Login"]["navigation"]
+    assert (navigation["url"], navigation["load"]) == ("https://example.test/login", 20.0)
+
+
+def _write_run(path, started, seconds):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    test = {"keywords": [{"name": "Go To", "seconds": seconds, "budget": 2}], "navigation": [], "violations": []}
+    if seconds > 2:
+        test["violations"].append({"name": "Go To", "seconds": seconds, "budget": 2})
+    run = {"started": started, "environment": "fake", "platform": "web", "tests": {"Suite.Test": test}}
+    path.write_text(json.dumps(run), encoding="utf-8")
+    return path
+
+
+def test_summarize_run_flags_regressions_against_the_median(tmp_path):
+    for day, seconds in enumerate([1.0, 1.1, 0.9, 5.0]):
+        _write_run(tmp_path / f"run{day}" / "perf.json", f"2026-10-0{day + 1}T10:00:00", seconds)
+    latest = _write_run(tmp_path / "latest" / "perf.json", "2026-10-09T10:00:00", 2.5)
+    summary = summarize_run(latest, tmp_path, {"baseline": {"window": 10, "threshold": 0.25, "min_delta": 0.1}})
+    assert summary["baseline_runs"] == 4
+    assert summary["regressions"] == [
+        {"metric": "Suite.Test :: Go To", "seconds": 2.5, "baseline": 1.05, "samples": 4}
+    ]
+    assert [violation["test"] for violation in summary["violations"]] == ["Suite.Test"]
@@ -0,0 +1,62 @@
+"""
+resource_leases 的單元測試：lease 狀態寫在 tmp_path，不需要 Grid / Appium 端點
+"""
+from __future__ import annotations
+
+import os
+import socket
+import time
+
+import pytest
+
+from resources.libs.resource_leases import HELD_ENV, LeaseManager, LeaseTimeout
+
+
+@pytest.fixture
+def leases(tmp_path, monkeypatch):
+    monkeypatch.delenv(HELD_ENV, raising=False)
+    return LeaseManager(tmp_path / "leases", poll=0.01)
+
+
+def _waiter(ticket):
+    return {"ticket": ticket, "pid": os.getpid(), "host": socket.gethostname(), "owner": ticket, "since": time.time()}
+
+
+def test_lease_acquire_and_release(leases):
+    lease = leases.acquire("device", owner="a")
+    assert (lease.slot, leases.status()["device"]["held"]["0"]["owner"]) == ("0", "a")
+    leases.release(lease)
+    assert leases.status()["device"]["held"] == {}
+
+
+def test_lease_waits_behind_earlier_arrivals(leases):
+    # 前面已有一個排隊者：唯一的 slot 空著也要讓它先拿
+    with leases._state("device") as state:
+        state["queue"].append(_waiter("earlier"))
+    with pytest.raises(LeaseTimeout):
+        leases.acquire("device", timeout=0.05)
+    assert [entry["ticket"] for entry in leases.status()["device"]["queue"]] == ["earlier"]
+    # 有兩個空 slot 時，排第二的也能取得
+    assert leases.acquire("device", slots=("0", "1"), timeout=0.05).slot == "0"
+
+
+def test_lease_timeout_names_the_holder(leases):
+    with leases._state("device") as state:
+        state["held"]["0"] = _waiter("holder")
+    with pytest.raises(LeaseTimeout, match="holder"):
+        leases.acquire("device", timeout=0.05)
+    assert leases.status()["device"]["queue"] == []
+
+
+def test_lease_drops_holders_of_dead_processes(leases):
+    with leases._state("device") as state:
+        state["held"]["0"] = {**_waiter("gone"), "pid": 2**22 + 12345}
+    assert leases.acquire("device", timeout=0.05).slot == "0"
+
+
+def test_lease_inherited_from_parent_is_not_released(leases, monkeypatch):
+    monkeypatch.setenv(HELD_ENV, "device=1")
+    lease = leases.acquire("device")
+    assert (lease.slot, lease.ticket) == ("1", None)
+    leases.release(lease)
+    assert os.environ[HELD_ENV] == "device=1"
@@ -0,0 +1,48 @@
+"""
+session_reaper 的單元測試：ledger 寫在 tmp_path，對 tools/fake_webdriver.py 回收 session
+"""
+from __future__ import annotations
+
+import json
+import os
+
+import requests
+
+from resources.libs.session_reaper import SessionLedger, reap, requested_capabilities, session_timeout
+
+DEAD_PID = 2**22 + 12345
+
+
+def _session(server, ledger, pid, capabilities=None):
+    value = requests.post(f"{server.url}/session", json={"desiredCapabilities": capabilities or {}}, timeout=5).json()
+    session_url = f"{server.url}/session/{value['value']['sessionId']}"
+    ledger.opened(session_url, capabilities)
+    path = ledger._path(session_url)
+    path.write_text(json.dumps({**json.loads(path.read_text(encoding="utf-8")), "pid": pid}), encoding="utf-8")
+    return session_url
+
+
+def test_reap_deletes_sessions_of_dead_processes(fake_webdriver, tmp_path):
+    server = fake_webdriver()
+    ledger = SessionLedger(tmp_path)
+    orphan = _session(server, ledger, DEAD_PID, {"appium:newCommandTimeout": 600})
+    gone = _session(server, ledger, DEAD_PID)
+    requests.delete(gone, timeout=5)  # server 已自行結束的 session
+    mine = _session(server, ledger, os.getpid())
+
+    result = reap(ledger)
+    assert (result["checked"], result["expired"]) == (2, 1)
+    [reclaimed] = result["reclaimed"]
+    assert (reclaimed["session_id"], reclaimed["owner_pid"]) == (orphan.rsplit("/", 1)[-1], DEAD_PID)
+    assert 590 < reclaimed["slot_seconds"] <= 600
+    assert list(server.driver.sessions) == [mine.rsplit("/", 1)[-1]]
+    assert [entry["session_url"] for entry in ledger.entries()] == [mine]
+
+
+def test_capabilities_from_new_session_payloads():
+    w3c = {"capabilities": {"alwaysMatch": {"platformName": "mac"}, "firstMatch": [{"appium:newCommandTimeout": 90}]}}
+    assert requested_capabilities(json.dumps(w3c)) == {"platformName": "mac", "appium:newCommandTimeout": 90}
+    assert requested_capabilities({"desiredCapabilities": {"app": "Calc"}}) == {"app": "Calc"}
+    assert requested_capabilities(b"not json") == {}
+    assert session_timeout({"appium:newCommandTimeout": 90}) == 90
+    assert session_timeout({}) == 300
@@ -0,0 +1,90 @@
+"""
+scripts/setup.py --cached 的單元測試：以假的 venv / pip / npm 在 tmp_path 建立與還原快取
+"""
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SPEC = importlib.util.spec_from_file_location(
+    "bootstrap_setup", Path(__file__).resolve().parents[2] / "scripts" / "setup.py"
+)
+setup = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(setup)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """tmp_path 中的專案；記錄 run_command 收到的命令，npm 的結果由 npm_ok 決定"""
+    monkeypatch.chdir(tmp_path)
+    Path("requirements.txt").write_text("robotframework==6.1.1\n")
+    Path("package.json").write_text("{}")
+    commands = []
+    npm_ok = [True]
+
+    def run_command(cmd, shell=False):
+        commands.append(cmd[1:3])
+        if cmd[1:3] == ["-m", "venv"]:
+            Path(".venv", "bin").mkdir(parents=True, exist_ok=True)
+            Path(".venv", "bin", "pip").write_text("pip")
+        elif cmd[1] == "wheel":
+            Path(cmd[-1], "robotframework-6.1.1-py3-none-any.whl").write_bytes(b"wheel")
+        return True
+
+    def install_node_deps():
+        if npm_ok[0]:
+            Path("node_modules", "left-pad").mkdir(parents=True, exist_ok=True)
+        return npm_ok[0]
+
+    monkeypatch.setattr(setup, "run_command", run_command)
+    monkeypatch.setattr(setup, "install_node_deps", install_node_deps)
+    return tmp_path, commands, npm_ok
+
+
+def test_key_follows_the_dependency_files(project):
+    key = setup.bootstrap_key()
+    assert key == setup.bootstrap_key() and len(key) == 24
+    Path("requirements.txt").write_text("robotframework==7.0\n")
+    assert setup.bootstrap_key() != key
+
+
+def test_miss_builds_the_entry_and_hit_restores_without_commands(project):
+    tmp_path, commands, _ = project
+    cache = tmp_path / "cache"
+    assert not setup.setup_cached(cache, offline=True)
+    assert setup.setup_cached(cache)
+    key = setup.bootstrap_key()
+    manifest = setup.verify_entry(cache / key)
+    assert set(manifest["files"]) == {
+        "wheelhouse/robotframework-6.1.1-py3-none-any.whl", "venv.tar.gz", "node_modules.tar.gz"
+    }
+    assert setup.read_stamp(".venv") == key and setup.read_stamp("node_modules") == key
+
+    # 全新的 worker：.venv / node_modules 都不存在，命中後由封存檔還原
+    built = len(commands)
+    for name in (".venv", "node_modules"):
+        setup.shutil.rmtree(name)
+    assert setup.setup_cached(cache, offline=True)
+    assert len(commands) == built
+    assert Path(".venv", "bin", "pip").exists() and Path("node_modules", "left-pad").is_dir()
+    assert setup.read_stamp(".venv") == key
+
+
+def test_corrupted_entry_is_a_miss(project):
+    tmp_path, _, _ = project
+    cache = tmp_path / "cache"
+    assert setup.setup_cached(cache)
+    entry = cache / setup.bootstrap_key()
+    (entry / "venv.tar.gz").write_bytes(b"truncated")
+    assert setup.verify_entry(entry) is None
+    assert not setup.setup_cached(cache, offline=True)
+
+
+def test_failed_npm_install_is_not_cached(project):
+    tmp_path, _, npm_ok = project
+    npm_ok[0] = False
+    cache = tmp_path / "cache"
+    assert not setup.setup_cached(cache)
+    assert list(cache.iterdir()) == []
@@ -0,0 +1,53 @@
+"""
+timeline 的單元測試：worker 狀態切分、critical path 與建議
+"""
+from __future__ import annotations
+
+from resources.libs.timeline import TIMELINE_FILE, Span, analyze, load_spans, record
+
+T0 = 1_760_000_000.0
+
+
+def _span(worker, kind, name, start, end):
+    return Span(worker, kind, name, T0 + start, T0 + end)
+
+
+def test_critical_path_and_states():
+    spans = [
+        _span("w1", "unit", "tests/a.py", 0, 10),
+        _span("w1", "lease", "mac-calculator", 0, 2),
+        _span("w1", "test", "a::one", 2, 10),
+        _span("w1", "unit", "tests/b.py", 10, 30),
+        _span("w1", "session", "POST /session", 10, 13),
+        _span("w1", "test", "b::two", 13, 29),
+        _span("w2", "queue", "waiting for an endpoint slot", 0, 1),
+        _span("w2", "unit", "tests/c.py", 1, 12),
+        _span("w2", "test", "c::three", 1, 12),
+    ]
+    analysis = analyze(spans)
+    assert (analysis["makespan"], analysis["critical_worker"]) == (30.0, "w1")
+    w1, w2 = analysis["workers"]["w1"], analysis["workers"]["w2"]
+    assert [step["name"] for step in w1["critical_path"]] == ["tests/a.py", "tests/b.py"]
+    assert w1["states"] == {"lease": 2.0, "session": 3.0, "test": 24.0, "overhead": 1.0, "queue": 0.0, "idle": 0.0}
+    assert (w2["finish"], w2["tail_idle"], w2["states"]["queue"]) == (12.0, 18.0, 1.0)
+    assert w1["longest"][0] == {"name": "b::two", "seconds": 16.0}
+    assert analysis["waits"] == {"lease": 2.0, "session": 3.0, "queue": 1.0}
+    assert analysis["advice"][0].startswith("With 3 workers the run could take 20.0s at best")
+
+
+def test_one_long_unit_bounds_the_run():
+    spans = [_span("w1", "unit", "tests/slow.py", 0, 100), _span("w2", "unit", "tests/fast.py", 0, 5)]
+    assert analyze(spans)["advice"][0].startswith("Bounded by one unit: tests/slow.py")
+
+
+def test_recorded_spans_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setenv("E2E_TIMELINE", str(tmp_path / TIMELINE_FILE))
+    record("test", "Suite.Login", T0, T0 + 4, worker="robot", status="PASS")
+    record("lease", "account:standard", T0, T0 + 1, worker="robot")
+    with (tmp_path / TIMELINE_FILE).open("a", encoding="utf-8") as handle:
+        handle.write('{"worker": "robot", "kind"')  # 寫到一半被殺掉的 worker
+    spans = load_spans(tmp_path)
+    assert [(span.kind, span.name, span.seconds, span.info) for span in spans] == [
+        ("test", "Suite.Login", 4.0, {"status": "PASS"}),
+        ("lease", "account:standard", 1.0, {}),
+    ]
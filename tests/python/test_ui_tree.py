@@ -0,0 +1,51 @@
+"""
+ui_tree 的單元測試：對 tools/fake_webdriver.py 的 Windows / Mac 計算機
+"""
+from __future__ import annotations
+
+import pytest
+import requests
+from lxml import etree
+from selenium import webdriver
+from selenium.webdriver.common.options import ArgOptions
+
+from resources.libs.ui_tree import UiTree, center, to_xpath
+
+
+def test_to_xpath_and_center():
+    assert to_xpath("name", "One") == '//*[@Name="One" or @name="One"]'
+    assert to_xpath("accessibility id", "x") == '//*[@AutomationId="x" or @identifier="x"]'
+    with pytest.raises(ValueError, match="css selector"):
+        to_xpath("css selector", "button")
+    assert center(etree.Element("Button", x="10", y="20", width="80", height="40")) == (50, 40)
+    assert center(etree.Element("Button")) is None
+
+
+def test_winappdriver_clicks_look_up_each_element_once(fake_webdriver):
+    server = fake_webdriver()
+    created = requests.post(f"{server.url}/session", json={"desiredCapabilities": {"app": "WindowsCalculator"}}).json()
+    base_url = f"{server.url}/session/{created['value']['sessionId']}"
+    tree = UiTree.for_winappdriver(base_url)
+    for key in ("One", "Plus", "Two", "Equals", "Plus", "One", "Equals"):
+        tree.click("name", key)
+    assert tree.attribute(("accessibility id", "CalculatorResults"), "Name") == "Display is 4"
+    assert tree.stats["server_lookups"] == 4  # One / Plus / Two / Equals 各一次
+    assert tree.stats["clicks"] == 7 and tree.stats["source_fetches"] == 8  # 每次點擊後重新讀取
+    requests.delete(base_url)
+
+
+def test_mac_clicks_by_coordinates_without_server_lookups(fake_webdriver):
+    server = fake_webdriver()
+    options = ArgOptions()
+    options.set_capability("platformName", "mac")
+    options.set_capability("appium:bundleId", "com.apple.calculator")
+    driver = webdriver.Remote(command_executor=server.url, options=options)
+    try:
+        tree = UiTree.for_appium(driver)
+        for key in ("7", "×", "6", "="):
+            tree.click("name", key)
+        assert tree.attribute(("name", "main display"), "value") == "42"
+        assert tree.stats["server_lookups"] == 0
+        assert tree.click_if_present("name", "no such key") is False
+    finally:
+        driver.quit()
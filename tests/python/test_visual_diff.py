@@ -0,0 +1,78 @@
+"""
+visual_diff 的單元測試：以 NumPy 產生的畫面比較，不需要瀏覽器
+"""
+from __future__ import annotations
+
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from resources.libs.visual_diff import BaselineCache, compare, compare_to_baseline, parse_regions
+
+
+@pytest.fixture
+def frames():
+    """40x60 的灰色畫面；actual 在 (10,5) 起 20x8 的時鐘區塊與 baseline 不同"""
+    baseline = np.full((40, 60, 3), 128, dtype=np.uint8)
+    actual = baseline.copy()
+    actual[5:13, 10:30] = 255
+    return actual, baseline
+
+
+def _png(pixels):
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_parse_regions_accepts_strings_tuples_and_dicts():
+    assert parse_regions("") == []
+    assert parse_regions("10,5,20,8; 0,0,1,1") == [(10, 5, 20, 8), (0, 0, 1, 1)]
+    assert parse_regions([(1, 2, 3, 4), {"x": 5, "y": 6, "width": 7, "height": 8}]) == [(1, 2, 3, 4), (5, 6, 7, 8)]
+    with pytest.raises(ValueError, match="x,y,width,height"):
+        parse_regions("10,5,20")
+
+
+@pytest.mark.parametrize("mode", ["pixel", "perceptual"])
+def test_ignored_region_is_not_compared(frames, mode):
+    actual, baseline = frames
+    failed = compare(actual, baseline, mode=mode)
+    assert not failed.passed and failed.compared == 40 * 60
+    result = compare(actual, baseline, mode=mode, ignore="10,5,20,8")
+    assert result.passed and result.diff_ratio == 0.0
+    assert result.compared == 40 * 60 - 20 * 8
+    assert int(result.ignored.sum()) == 20 * 8
+    assert (actual[5:13, 10:30] == 255).all()  # 呼叫端的畫面不被覆寫
+
+
+def test_partially_ignored_change_still_fails(frames):
+    actual, baseline = frames
+    result = compare(actual, baseline, ignore=[(10, 5, 10, 8)])
+    assert not result.passed
+    assert result.diff_ratio == pytest.approx(10 * 8 / (40 * 60 - 10 * 8))
+    assert "pixel" in result.describe("clock")
+
+
+def test_tolerance_and_size_mismatch(frames):
+    _, baseline = frames
+    noisy = baseline + 10
+    assert compare(noisy, baseline).passed
+    assert not compare(noisy, baseline, tolerance=5).passed
+    mismatch = compare(baseline[:30], baseline)
+    assert not mismatch.passed and mismatch.describe() == "screenshot: size 60x30 != baseline 60x40"
+    with pytest.raises(ValueError, match="Unknown diff mode"):
+        compare(baseline, baseline, mode="fuzzy")
+
+
+def test_compare_to_baseline_records_then_writes_a_heatmap(frames, tmp_path, monkeypatch):
+    monkeypatch.delenv("E2E_UPDATE_BASELINES", raising=False)
+    actual, baseline = frames
+    cache = BaselineCache(tmp_path / "baselines")
+    assert compare_to_baseline("home", _png(baseline), tmp_path, cache) is None
+    assert (tmp_path / "baselines" / "home.png").exists()
+    assert compare_to_baseline("home", _png(actual), tmp_path, cache, ignore="10,5,20,8").passed
+    result = compare_to_baseline("home", _png(actual), tmp_path, cache)
+    assert not result.passed and result.heatmap == tmp_path / "visual" / "home-diff.png"
+    assert Image.open(result.heatmap).size == (60, 40)
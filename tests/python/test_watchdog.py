@@ -0,0 +1,50 @@
+"""
+watchdog 的單元測試：期限計算、WebDriver 指令記錄，以及逾時時刪除卡住的 session
+"""
+from __future__ import annotations
+
+import requests
+
+from resources.libs.watchdog import CommandLog, Watchdog, deadline_for
+
+
+def test_watchdog_deadline_for():
+    config = {"default": 180, "tags": {"web": 120, "crosschannel": 600}}
+    assert deadline_for(config, []) == 180
+    assert deadline_for(config, ["Web"]) == 120
+    assert deadline_for(config, ["web", "crosschannel"]) == 600
+    assert deadline_for(config, ["crosschannel", "deadline:45s"]) == 45
+    assert deadline_for(config, ["deadline:500ms"]) == 0.5
+
+
+def _open_session(log, remote_url):
+    payload = {"capabilities": {"alwaysMatch": {"browserName": "chrome"}}}
+    entry = log.start("POST", f"{remote_url}/session", payload)
+    value = requests.post(f"{remote_url}/session", json=payload, timeout=5).json()["value"]
+    log.finish(entry, 200, {"value": value})
+    return f"{remote_url}/session/{value['sessionId']}"
+
+
+def test_only_webdriver_traffic_is_logged(fake_webdriver):
+    log = CommandLog()
+    remote_url = fake_webdriver().url
+    assert log.is_webdriver("POST", f"{remote_url}/session", {"capabilities": {"alwaysMatch": {}}}) is False
+    assert log.is_webdriver("POST", f"{remote_url}/session", {"desiredCapabilities": {"app": "x"}})
+    session_url = _open_session(log, remote_url)
+    assert log.is_webdriver("GET", f"{session_url}/title")
+    assert not log.is_webdriver("GET", "https://api.example.test/session/42/cart")
+
+
+def test_expire_deletes_only_the_session_with_a_command_in_flight(fake_webdriver, tmp_path):
+    server = fake_webdriver()
+    log = CommandLog()
+    hung = _open_session(log, server.url)
+    idle = _open_session(log, server.url)
+    log.finish(log.start("GET", f"{idle}/title"), 200)
+    log.start("POST", f"{hung}/element", {"using": "css selector", "value": "#never"})  # 沒有回應
+
+    dump = Watchdog(tmp_path, log).expire("Suite.Hung Test", 45)
+    assert "exceeded its 45s deadline" in dump.read_text(encoding="utf-8")
+    assert f"POST {hung}/element" in dump.read_text(encoding="utf-8")
+    assert list(server.driver.sessions) == [idle.rsplit("/", 1)[-1]]
+    assert log.was_deleted(hung.rsplit("/", 1)[-1]) and not log.was_deleted(idle.rsplit("/", 1)[-1])
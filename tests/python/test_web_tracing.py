@@ -0,0 +1,59 @@
+"""
+web_tracing 的單元測試：以 DevTools performance log 訊息建立 HAR
+"""
+from __future__ import annotations
+
+import json
+
+from resources.libs.web_tracing import build_har, long_tasks, parse_performance_log, summarize
+
+
+def _sent(request_id, url, timestamp, redirect=None):
+    params = {
+        "requestId": request_id,
+        "request": {"method": "GET", "url": url, "headers": {}},
+        "timestamp": timestamp,
+        "wallTime": 1760000000 + timestamp,
+        "type": "Document",
+    }
+    if redirect:
+        params["redirectResponse"] = {"status": 302, "headers": {"location": redirect}, "protocol": "http/1.1"}
+    return {"method": "Network.requestWillBeSent", "params": params}
+
+
+def test_redirect_chain_keeps_every_hop():
+    messages = [
+        _sent("1", "http://example.test/", 10.0),
+        _sent("1", "https://example.test/", 10.1, redirect="https://example.test/"),
+        _sent("1", "https://example.test/login", 10.25, redirect="/login"),
+        {"method": "Network.responseReceived", "params": {"requestId": "1", "response": {"status": 200}}},
+        {"method": "Network.loadingFinished", "params": {"requestId": "1", "timestamp": 10.5, "encodedDataLength": 900}},
+        _sent("2", "https://example.test/app.js", 10.3),
+        {"method": "Network.loadingFailed", "params": {"requestId": "2", "timestamp": 10.4, "errorText": "net::ERR_FAILED"}},
+    ]
+    entries = build_har(messages, "Login")["log"]["entries"]
+    assert [(entry["request"]["url"], entry["response"]["status"]) for entry in entries] == [
+        ("http://example.test/", 302),
+        ("https://example.test/", 302),
+        ("https://example.test/login", 200),
+        ("https://example.test/app.js", 0),
+    ]
+    assert [entry["response"]["redirectURL"] for entry in entries] == ["https://example.test/", "/login", "", ""]
+    assert [round(entry["time"]) for entry in entries] == [100, 150, 250, 100]
+    assert entries[2]["response"]["bodySize"] == 900
+    assert entries[3]["response"]["statusText"] == "net::ERR_FAILED"
+
+
+def test_performance_log_split_and_summary():
+    raw = [
+        {"method": "Network.requestWillBeSent", "params": _sent("1", "https://example.test/", 1.0)["params"]},
+        {"method": "Tracing.dataCollected", "params": {"value": [{"name": "RunTask", "dur": 80_000, "ts": 5}]}},
+        {"method": "Page.loadEventFired", "params": {}},
+    ]
+    entries = [{"message": json.dumps({"message": message})} for message in raw] + [{"message": "not json"}]
+    network, trace = parse_performance_log(entries)
+    assert [message["method"] for message in network] == ["Network.requestWillBeSent"]
+    events = [event for chunk in trace for event in chunk["value"]]
+    assert long_tasks(events) == [{"name": "RunTask", "ts": 5, "duration_ms": 80.0}]
+    summary = summarize(build_har(network), events)
+    assert (summary["requests"], summary["failed_requests"], summary["long_task_ms"]) == (1, 1, 80.0)
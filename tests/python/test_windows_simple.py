@@ -8,80 +8,47 @@ import pytest
 import os
 import time
 import requests
-from dotenv import load_dotenv
+from pathlib import Path
 
-# Load environment
-load_dotenv()
+from resources.libs import calculator_matrix  # project root is put on sys.path by conftest.py
+from resources.libs.ui_tree import UiTree, tree_cache_enabled
 
-REMOTE_URL = os.getenv('WIN_REMOTE_URL', 'http://127.0.0.1:4724')
-APP_ID = os.getenv('WINDOWS_APP_ID', 'Microsoft.WindowsCalculator_8wekyb3d8bbwe!App')
+
+pytestmark = [pytest.mark.windows, pytest.mark.lease("windows-calculator")]
 
 
 class TestWindowsCalculatorSimple:
     """Simple Calculator tests using direct HTTP"""
     
-    def setup_method(self):
-        """Create WinAppDriver session with retry logic"""
-        print(f"\nConnecting to: {REMOTE_URL}")
-        print(f"App: {APP_ID}")
-        
-        # Create session using direct HTTP POST with retry
-        session_url = f"{REMOTE_URL}/session"
-        payload = {
-            "desiredCapabilities": {
-                "app": APP_ID,
-                "platformName": "Windows",
-                "deviceName": "WindowsPC"
-            }
-        }
-        
-        # Retry up to 3 times as Calculator window may need time to initialize
-        max_retries = 3
-        last_error = None
-        
-        for attempt in range(max_retries):
-            if attempt > 0:
-                print(f"[INFO] Retrying... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(3)  # Wait 3 seconds before retry
-            
-            response = requests.post(session_url, json=payload, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.session_id = data.get('sessionId') or data.get('value', {}).get('sessionId')
-                print(f"[OK] Session created: {self.session_id}")
-                self.base_url = f"{REMOTE_URL}/session/{self.session_id}"
-                
-                # Additional wait to ensure window is fully loaded
-                print("[INFO] Waiting for Calculator window to fully load...")
-                time.sleep(2)
-                print("[OK] Calculator ready")
-                return
-            else:
-                last_error = f"Failed to create session: {response.status_code} - {response.text}"
-                print(f"[WARN] Attempt {attempt + 1} failed")
-        
-        raise Exception(f"Failed after {max_retries} attempts: {last_error}")
-    
-    def teardown_method(self):
-        """Close session"""
-        if hasattr(self, 'session_id'):
-            requests.delete(f"{REMOTE_URL}/session/{self.session_id}")
-            print("\n[OK] Session closed")
+    @pytest.fixture(autouse=True)
+    def _session(self, windows_session):
+        """Share the worker's WinAppDriver session (see conftest.windows_session)"""
+        self.session_id = windows_session.session_id
+        self.base_url = windows_session.base_url
+        # E2E_TREE_CACHE=1: evaluate locators on a cached page_source, reuse element ids
+        self.tree = UiTree.for_winappdriver(self.base_url) if tree_cache_enabled() else None
     
-    def _click_element_by_name(self, name):
-        """Click element by name"""
-        # Find element
+    def _find_element_id(self, using, value):
+        """Find element and return its id"""
         find_url = f"{self.base_url}/element"
-        payload = {"using": "name", "value": name}
+        payload = {"using": using, "value": value}
         response = requests.post(find_url, json=payload)
         
         if response.status_code != 200:
-            raise Exception(f"Failed to find element '{name}': {response.text}")
+            raise Exception(f"Failed to find element '{value}': {response.text}")
         
         element_id = response.json().get('value', {}).get('ELEMENT') or response.json().get('value')
         if isinstance(element_id, dict):
             element_id = list(element_id.values())[0]
+        return element_id
+    
+    def _click_element_by_name(self, name):
+        """Click element by name"""
+        if self.tree is not None:
+            self.tree.click("name", name)
+            time.sleep(0.2)
+            return
+        element_id = self._find_element_id("name", name)
         
         # Click element
         click_url = f"{self.base_url}/element/{element_id}/click"
@@ -90,17 +57,10 @@ class TestWindowsCalculatorSimple:
     
     def _get_result_text(self):
         """Get calculator result"""
-        # Find result element
-        find_url = f"{self.base_url}/element"
-        payload = {"using": "accessibility id", "value": "CalculatorResults"}
-        response = requests.post(find_url, json=payload)
-        
-        if response.status_code != 200:
-            raise Exception(f"Failed to find result: {response.text}")
-        
-        element_id = response.json().get('value', {}).get('ELEMENT') or response.json().get('value')
-        if isinstance(element_id, dict):
-            element_id = list(element_id.values())[0]
+        if self.tree is not None:
+            name = self.tree.attribute(("accessibility id", "CalculatorResults"), "Name") or ""
+            return name.replace("Display is", "").strip()
+        element_id = self._find_element_id("accessibility id", "CalculatorResults")
         
         # Get text
         text_url = f"{self.base_url}/element/{element_id}/text"
@@ -111,6 +71,9 @@ class TestWindowsCalculatorSimple:
     
     def _clear_calculator(self):
         """Clear calculator"""
+        if self.tree is not None:
+            self.tree.click_if_present("name", "Clear") or self.tree.click_if_present("name", "Clear entry")
+            return
         try:
             self._click_element_by_name("Clear")
         except:
@@ -188,6 +151,43 @@ class TestWindowsCalculatorSimple:
         assert "20" in result, f"Expected '20', got '{result}'"
         print("[PASS] 4 x 5 = 20")
 
+    
+    def test_calculator_operation_matrix(self, tmp_path):
+        """Data-driven: run the whole operation table through this one session"""
+        table = calculator_matrix.load_operations(
+            os.getenv("CALC_MATRIX_TABLE", calculator_matrix.DEFAULT_TABLE)
+        )
+        http = requests.Session()  # keep-alive across thousands of clicks
+        element_ids = {}
+        
+        def press(name):
+            # Element ids stay valid for the session, so look each button up once
+            if name not in element_ids:
+                element_ids[name] = self._find_element_id("name", name)
+            http.post(f"{self.base_url}/element/{element_ids[name]}/click", json={})
+        
+        def read_display():
+            if "CalculatorResults" not in element_ids:
+                element_ids["CalculatorResults"] = self._find_element_id("accessibility id", "CalculatorResults")
+            response = http.get(f"{self.base_url}/element/{element_ids['CalculatorResults']}/text")
+            return response.json().get('value', '')
+        
+        result = calculator_matrix.run_matrix(
+            table,
+            press=press,
+            read_display=read_display,
+            platform="windows",
+            locale=os.getenv("CALC_LOCALE", "en_US"),
+        )
+        report = result.write_json(
+            Path(os.getenv("CALC_MATRIX_REPORT_DIR") or tmp_path) / "calculator-matrix-windows.json"
+        )
+        summary = result.summary()
+        print(f"[INFO] {summary['passed']}/{summary['cases']} passed, "
+              f"{summary['cases_per_second']} cases/s, report: {report}")
+        
+        assert summary["failed"] == 0, f"Failed cases: {result.failures()[:10]}"
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Recommend per-locator wait timeouts from recorded Robot runs.
+
+Reads the ``waits.json`` files the ``adaptive_waits`` listener leaves in
+report directories (``run_tests.py --record-waits``), computes p50/p99
+appearance time per platform and locator, and prints a recommended timeout
+(p99 x factor + padding, clamped).
+``--write`` stores them in ``config/learned_timeouts.yaml``, which
+``run_tests.py --adaptive-waits`` applies.
+
+    python tools/adaptive_timeouts.py
+    python tools/adaptive_timeouts.py --platform web --write
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.adaptive_waits import LEARNED_FILE, collect_samples, load_learned, recommend  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Learn per-locator wait timeouts from past runs")
+    parser.add_argument("--reports", type=Path, default=ROOT / "reports")
+    parser.add_argument("--platform", "-p", help="Only this platform")
+    parser.add_argument("--last-runs", type=int, default=30, help="Use the newest N runs")
+    parser.add_argument("--min-samples", type=int, default=3, help="Skip locators seen fewer times")
+    parser.add_argument("--factor", type=float, default=1.5)
+    parser.add_argument("--padding", type=float, default=0.5, help="Seconds added after scaling p99")
+    parser.add_argument("--minimum", type=float, default=1.0)
+    parser.add_argument("--maximum", type=float, default=30.0)
+    parser.add_argument("--write", action="store_true", help=f"Merge into {LEARNED_FILE.relative_to(ROOT)}")
+    args = parser.parse_args()
+
+    samples = collect_samples(args.reports, args.last_runs)
+    if args.platform:
+        samples = {args.platform: samples.get(args.platform, {})}
+    samples = {
+        platform: {locator: values for locator, values in locators.items() if len(values) >= args.min_samples}
+        for platform, locators in samples.items()
+    }
+    learned = recommend(samples, args.factor, args.padding, args.minimum, args.maximum)
+    if not any(learned.values()):
+        print(f"No locator has {args.min_samples}+ passing samples under {args.reports}")
+        return 1
+
+    for platform, locators in sorted(learned.items()):
+        print(f"[{platform}]")
+        for locator, data in sorted(locators.items(), key=lambda item: -item[1]["p99"]):
+            print(f"  {data['timeout']:5.1f}s  p99 {data['p99']:6.3f}s  p50 {data['p50']:6.3f}s  n={data['samples']:<4} {locator}")
+
+    if args.write:
+        merged = load_learned()
+        for platform, locators in learned.items():
+            merged.setdefault(platform, {}).update(locators)
+        header = "# 由 tools/adaptive_timeouts.py 產生：各 locator 學習到的等待時間（run_tests.py --adaptive-waits 使用）\n"
+        LEARNED_FILE.write_text(header + yaml.safe_dump(merged, allow_unicode=True, sort_keys=True), encoding="utf-8")
+        print(f"\nWrote {LEARNED_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""Smoke-check many URLs (web) or app launches (Appium) from one process.
+
+Each URL / launch gets its own session; sessions run concurrently on one event
+loop through ``resources/libs/async_driver.py``.
+
+    python tools/async_smoke.py --env dev --platform web --urls urls.txt --concurrency 20
+    python tools/async_smoke.py --env fake --platform android --launches 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.async_driver import AsyncSession, run_sessions  # noqa: E402
+from resources.libs.env_loader import load_context  # noqa: E402
+
+
+def url_check(url: str):
+    async def job(session: AsyncSession) -> dict[str, Any]:
+        started = time.perf_counter()
+        await session.get(url)
+        return {"url": url, "title": await session.title(), "load_seconds": round(time.perf_counter() - started, 3)}
+
+    return job
+
+
+async def launch_check(session: AsyncSession) -> dict[str, Any]:
+    source = await session.page_source()
+    return {"source_bytes": len(source or "")}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent smoke checks over the W3C protocol")
+    parser.add_argument("--env", "-e", default="dev")
+    parser.add_argument("--platform", "-p", default="web", choices=["web", "android", "mac", "windows"])
+    parser.add_argument("--user-role", "-u")
+    parser.add_argument("--urls", type=Path, help="File with one URL per line (web)")
+    parser.add_argument("--launches", type=int, default=0, help="Number of app launches to check (Appium)")
+    parser.add_argument("--concurrency", "-c", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-session timeout in seconds")
+    parser.add_argument("--output", "-o", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    context = load_context(args.env, args.platform, args.user_role)
+    if args.urls:
+        urls = [line.strip() for line in args.urls.read_text(encoding="utf-8").splitlines() if line.strip()]
+        jobs: List[Any] = [url_check(url) for url in urls]
+    else:
+        jobs = [launch_check] * max(args.launches, 1)
+
+    started = time.perf_counter()
+    results = asyncio.run(run_sessions(context, jobs, concurrency=args.concurrency, session_timeout=args.timeout))
+    elapsed = time.perf_counter() - started
+
+    failures = [result for result in results if not result.ok]
+    for result in results:
+        status = "OK  " if result.ok else "FAIL"
+        detail = result.value if result.ok else result.error
+        print(f"[{status}] #{result.index:<4} {result.total_seconds:6.2f}s  {detail}")
+    print(f"\n{len(results) - len(failures)}/{len(results)} passed in {elapsed:.2f}s (concurrency {args.concurrency})")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps([result.__dict__ for result in results], indent=2, default=str), encoding="utf-8")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+"""Local caching / blocking HTTP proxy for web runs.
+
+Third-party analytics, tag managers and web fonts dominate page-load time on
+the grid. This proxy sits between the grid browser and the network:
+
+* hosts on the deny list (or missing from a non-empty allow list) get an
+  immediate empty ``204`` (HTTP) or a refused tunnel (HTTPS ``CONNECT``);
+* static assets (``config/proxy.yaml`` extensions / content types) fetched
+  over plain HTTP are stored on disk, keyed by a hash of method + URL, and
+  served from there on later runs;
+* ``--mode replay`` never touches the network: cached assets are served,
+  everything else gets ``504`` and tunnels are refused, so a run works
+  fully offline against a recorded cache.
+
+HTTPS traffic is tunnelled without TLS interception, so only host-level
+allow/deny applies to it; caching needs plain HTTP (or an HTTP stand-in).
+
+    python tools/caching_proxy.py --port 8899
+    python tools/caching_proxy.py --mode replay --stats reports/proxy-stats.json
+
+``run_tests.py --proxy record|replay`` starts it for the run and enables the
+``proxy`` profile of ``config/drivers/profiles/web.yaml``. It listens on
+127.0.0.1 unless ``listen`` in ``config/proxy.yaml`` is widened for a Docker
+grid, and only tunnels ``CONNECT`` to the ``connect_ports`` (443).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import fnmatch
+import hashlib
+import json
+import signal
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.env_loader import read_config  # noqa: E402
+
+CONFIG_FILE = ROOT / "config" / "proxy.yaml"
+HOP_BY_HOP = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+    "content-encoding",
+    "content-length",
+}
+
+
+@dataclass
+class ProxyStats:
+    requests: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_stores: int = 0
+    blocked: int = 0
+    tunnels: int = 0
+    replay_misses: int = 0
+    errors: int = 0
+    bytes_from_cache: int = 0
+    bytes_from_upstream: int = 0
+    blocked_hosts: Dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        lookups = self.cache_hits + self.cache_misses
+        data["cache_hit_rate"] = round(self.cache_hits / lookups, 3) if lookups else None
+        return data
+
+
+class CachingProxy:
+    def __init__(self, config: Dict[str, Any], mode: str = "record"):
+        cache_cfg = config.get("cache") or {}
+        self.mode = mode
+        self.deny: List[str] = [pattern.lower() for pattern in config.get("deny") or []]
+        self.allow: List[str] = [pattern.lower() for pattern in config.get("allow") or []]
+        self.connect_ports = {int(port) for port in config.get("connect_ports") or [443]}
+        self.cache_dir = Path(cache_cfg.get("dir", ".cache/proxy"))
+        if not self.cache_dir.is_absolute():
+            self.cache_dir = ROOT / self.cache_dir
+        self.extensions = tuple(ext.lower() for ext in cache_cfg.get("extensions") or [])
+        self.content_types = tuple(ctype.lower() for ctype in cache_cfg.get("content_types") or [])
+        self.max_entry_bytes = int(cache_cfg.get("max_entry_bytes", 10 * 1024 * 1024))
+        self.stats = ProxyStats()
+        self.http: aiohttp.ClientSession | None = None
+        self.connections: set[asyncio.StreamWriter] = set()
+
+    # ------------------------------------------------------------------ policy
+
+    def is_blocked(self, host: str) -> bool:
+        host = host.lower()
+        if any(fnmatch.fnmatch(host, pattern) for pattern in self.deny):
+            return True
+        return bool(self.allow) and not any(fnmatch.fnmatch(host, pattern) for pattern in self.allow)
+
+    def _block(self, host: str) -> None:
+        self.stats.blocked += 1
+        self.stats.blocked_hosts[host] = self.stats.blocked_hosts.get(host, 0) + 1
+
+    def is_static(self, url: str, content_type: str = "") -> bool:
+        path = urlsplit(url).path.lower()
+        if self.extensions and path.endswith(self.extensions):
+            return True
+        return bool(content_type) and content_type.lower().startswith(self.content_types)
+
+    # ------------------------------------------------------------------ cache
+
+    def _cache_paths(self, method: str, url: str) -> Tuple[Path, Path]:
+        digest = hashlib.sha256(f"{method} {url}".encode("utf-8")).hexdigest()
+        folder = self.cache_dir / digest[:2]
+        return folder / f"{digest}.body", folder / f"{digest}.json"
+
+    def cache_get(self, method: str, url: str) -> Tuple[Dict[str, Any], bytes] | None:
+        body_path, meta_path = self._cache_paths(method, url)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        return meta, body_path.read_bytes()
+
+    def cache_put(self, method: str, url: str, status: int, headers: List[Tuple[str, str]], body: bytes) -> None:
+        body_path, meta_path = self._cache_paths(method, url)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        body_path.write_bytes(body)
+        meta = {"url": url, "status": status, "headers": headers, "stored": time.time(), "size": len(body)}
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        self.stats.cache_stores += 1
+
+    # ------------------------------------------------------------------ connections
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").strip().split(" ", 2)
+                headers = await _read_headers(reader)
+                body = await _read_body(reader, headers)
+                self.stats.requests += 1
+                if method == "CONNECT":
+                    await self._tunnel(target, reader, writer)
+                    return
+                keep_alive = await self._forward(method, target, headers, body, writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+
+    async def _tunnel(self, target: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        host, _, port = target.rpartition(":")
+        blocked = self.is_blocked(host) or int(port or 443) not in self.connect_ports
+        if blocked or self.mode == "replay":
+            if blocked:
+                self._block(host)
+            else:
+                self.stats.replay_misses += 1
+            writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(host, int(port or 443))
+        except OSError:
+            self.stats.errors += 1
+            writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return
+        self.stats.tunnels += 1
+        writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+        await writer.drain()
+        await asyncio.gather(_pipe(reader, upstream_writer), _pipe(upstream_reader, writer))
+
+    async def _forward(
+        self, method: str, url: str, headers: List[Tuple[str, str]], body: bytes, writer: asyncio.StreamWriter
+    ) -> bool:
+        host = urlsplit(url).hostname or ""
+        keep_alive = _header(headers, "proxy-connection", _header(headers, "connection", "")).lower() != "close"
+        if url == "/__stats" or url.endswith("/__stats"):
+            await _respond(writer, 200, [("Content-Type", "application/json")], json.dumps(self.stats.as_dict()).encode())
+            return keep_alive
+        if self.is_blocked(host):
+            self._block(host)
+            await _respond(writer, 204, [], b"")
+            return keep_alive
+
+        cacheable = method == "GET" and self.is_static(url)
+        cached = self.cache_get(method, url) if method == "GET" else None
+        if cached is not None:
+            meta, payload = cached
+            self.stats.cache_hits += 1
+            self.stats.bytes_from_cache += len(payload)
+            await _respond(writer, meta["status"], [tuple(item) for item in meta["headers"]], payload, [("X-Proxy-Cache", "HIT")])
+            return keep_alive
+        if cacheable:
+            self.stats.cache_misses += 1
+        if self.mode == "replay":
+            self.stats.replay_misses += 1
+            await _respond(writer, 504, [("Content-Type", "text/plain")], b"not in proxy cache (replay mode)")
+            return keep_alive
+
+        forward_headers = [(name, value) for name, value in headers if name.lower() not in HOP_BY_HOP]
+        try:
+            assert self.http is not None
+            async with self.http.request(
+                method, url, headers=forward_headers, data=body or None, allow_redirects=False
+            ) as response:
+                payload = await response.read()
+                response_headers = [(name, value) for name, value in response.headers.items() if name.lower() not in HOP_BY_HOP]
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            self.stats.errors += 1
+            await _respond(writer, 502, [("Content-Type", "text/plain")], str(exc).encode())
+            return keep_alive
+
+        self.stats.bytes_from_upstream += len(payload)
+        content_type = _header(response_headers, "content-type", "")
+        if (
+            method == "GET"
+            and status == 200
+            and len(payload) <= self.max_entry_bytes
+            and (cacheable or self.is_static(url, content_type))
+            and "no-store" not in _header(response_headers, "cache-control", "").lower()
+        ):
+            self.cache_put(method, url, status, response_headers, payload)
+        await _respond(writer, status, response_headers, payload, [("X-Proxy-Cache", "MISS")])
+        return keep_alive
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> List[Tuple[str, str]]:
+    headers = []
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            return headers
+        name, _, value = line.partition(":")
+        headers.append((name.strip(), value.strip()))
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: List[Tuple[str, str]]) -> bytes:
+    length = int(_header(headers, "content-length", "0") or 0)
+    return await reader.readexactly(length) if length else b""
+
+
+def _header(headers: List[Tuple[str, str]], name: str, default: str) -> str:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return default
+
+
+async def _respond(
+    writer: asyncio.StreamWriter,
+    status: int,
+    headers: List[Tuple[str, str]],
+    body: bytes,
+    extra: List[Tuple[str, str]] | None = None,
+) -> None:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}"]
+    lines += [f"{name}: {value}" for name, value in [*headers, *(extra or [])]]
+    lines.append(f"Content-Length: {len(body)}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+_REASONS = {200: "OK", 204: "No Content", 304: "Not Modified", 403: "Forbidden", 404: "Not Found", 502: "Bad Gateway", 504: "Gateway Timeout"}
+
+
+class ProxyHandle:
+    """Proxy running on a background event loop (used by run_tests.py)."""
+
+    def __init__(self, proxy: CachingProxy, host: str, port: int):
+        self.proxy = proxy
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._server: asyncio.base_events.Server | None = None
+        self._thread = threading.Thread(target=self._run, args=(host, port), daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        if self._server is None:
+            raise RuntimeError(f"proxy failed to start on {host}:{port}")
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def _run(self, host: str, port: int) -> None:
+        asyncio.set_event_loop(self.loop)
+
+        async def start() -> None:
+            self.proxy.http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60), auto_decompress=True)
+            self._server = await asyncio.start_server(self.proxy.handle, host, port)
+
+        try:
+            self.loop.run_until_complete(start())
+        finally:
+            self._ready.set()
+        self.loop.run_forever()
+        # Let open keep-alive connections finish their cleanup before closing the loop.
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.close()
+
+    def stop(self) -> Dict[str, Any]:
+        async def shutdown() -> None:
+            if self._server is not None:
+                self._server.close()
+            for writer in list(self.proxy.connections):
+                writer.close()
+            if self.proxy.http is not None:
+                await self.proxy.http.close()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(10)
+        return self.proxy.stats.as_dict()
+
+
+def start_proxy(mode: str = "record", port: int | None = None, config_file: Path = CONFIG_FILE) -> ProxyHandle:
+    config = read_config(config_file)
+    listen_port = int(config.get("port", 8899)) if port is None else port
+    return ProxyHandle(CachingProxy(config, mode), config.get("listen", "127.0.0.1"), listen_port)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Caching / blocking HTTP proxy for grid browsers")
+    parser.add_argument("--mode", choices=["record", "replay"], default="record")
+    parser.add_argument("--port", type=int, help="Default: port from config/proxy.yaml")
+    parser.add_argument("--config", type=Path, default=CONFIG_FILE)
+    parser.add_argument("--stats", type=Path, help="Write statistics as JSON on exit")
+    args = parser.parse_args()
+
+    handle = start_proxy(args.mode, args.port, args.config)
+    print(f"caching proxy ({args.mode}) listening on port {handle.port}; Ctrl+C to stop")
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        while not stop.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        pass
+    stats = handle.stop()
+    print(json.dumps(stats, indent=2))
+    if args.stats:
+        args.stats.parent.mkdir(parents=True, exist_ok=True)
+        args.stats.write_text(json.dumps(stats, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
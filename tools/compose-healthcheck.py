@@ -2,37 +2,63 @@
 from __future__ import annotations
 
 import json
+import os
 import sys
+import time
 from typing import Iterable
 
 import requests
 
+DRIVER_DAEMON = os.getenv("E2E_DRIVER_DAEMON", "").rstrip("/")
+
 SERVICES = {
     "selenium": "http://localhost:4444/wd/hub/status",
     "appium": "http://localhost:4723/wd/hub/status",
+    # tools/driver_daemon.py; checked by default only when E2E_DRIVER_DAEMON is set
+    "driver-daemon": f"{DRIVER_DAEMON or 'http://127.0.0.1:4799'}/status",
 }
+DEFAULT_TARGETS = [name for name in SERVICES if name != "driver-daemon" or DRIVER_DAEMON]
 
 
-def check_service(name: str, url: str) -> tuple[str, bool, str]:
+def check_service(name: str, url: str) -> tuple[str, bool, str, float]:
+    started = time.perf_counter()
     try:
         response = requests.get(url, timeout=5)
         response.raise_for_status()
         payload = response.json()
         ready = payload.get("value", {}).get("ready", False)
-        return name, ready, json.dumps(payload)
+        return name, ready, json.dumps(payload), time.perf_counter() - started
     except Exception as exc:  # noqa: BLE001 - we want the message
-        return name, False, str(exc)
+        return name, False, str(exc), time.perf_counter() - started
+
+
+def describe_pools(info: str) -> list[str]:
+    """One line per driver daemon pool: occupancy and lease / reset latency."""
+    try:
+        pools = json.loads(info)["value"]["pools"]
+    except (ValueError, KeyError, TypeError):
+        return []
+    return [
+        f"    {platform}: {pool['warm']}/{pool['size']} warm, {pool['leased']} leased, {pool['waiting']} waiting;"
+        f" lease wait {pool['lease_wait_ms']} ms, reset {pool['reset_ms']} ms, create {pool['create_ms']} ms;"
+        f" replaced {pool['replaced']}, reclaimed {pool['reclaimed']}"
+        for platform, pool in pools.items()
+    ]
 
 
 def main(targets: Iterable[str] | None = None) -> int:
-    targets = set(targets or SERVICES.keys())
+    targets = set(targets or DEFAULT_TARGETS)
     failures: list[str] = []
     for name, url in SERVICES.items():
         if name not in targets:
             continue
-        service, ready, info = check_service(name, url)
+        service, ready, info, elapsed = check_service(name, url)
         status = "READY" if ready else "NOT_READY"
-        print(f"[{service}] {status} -> {info}")
+        if service == "driver-daemon" and ready:
+            print(f"[{service}] {status} ({1000 * elapsed:.0f} ms)")
+            print("\n".join(describe_pools(info)))
+        else:
+            print(f"[{service}] {status} ({1000 * elapsed:.0f} ms) -> {info}")
         if not ready:
             failures.append(service)
     return 0 if not failures else 1
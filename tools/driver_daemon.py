@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+"""Keep desktop app sessions warm and lease them to test processes.
+
+Creating a Mac2 / WinAppDriver session cold-launches the application, and
+every ``Launch Mac App`` / ``Launch Windows Calculator`` keyword starts a
+fresh pytest process that pays for it again. This daemon opens the sessions
+once (``session_pool`` in ``config/drivers/<platform>.yaml``) and hands them
+out over a local HTTP socket:
+
+* ``POST /lease``   ``{"platform": "windows", "timeout": 120, "owner": "..."}``
+  -> ``{"lease", "session_id", "remote_url", "capabilities"}`` (503 on timeout)
+* ``POST /renew``   ``{"lease": "..."}`` -> heartbeat; ``driver_lease`` sends
+  one every ``renew_every`` seconds (from the lease response) while it holds it
+* ``POST /release`` ``{"lease": "..."}`` -> 202; the app is reset (the
+  ``reset`` clicks) in the background before the session is handed out again
+* ``GET /status``   readiness, pool occupancy and lease / reset latency, in
+  the ``{"value": {"ready": ...}}`` shape ``compose-healthcheck.py`` reads
+
+Idle sessions are pinged (``GET /title``, in place in the warm queue) every
+``keepalive`` seconds so ``newCommandTimeout`` never expires; dead sessions
+are replaced. A lease is only reclaimed when its holder stops renewing it
+for ``max_lease`` seconds (the process died), never for running long. Test processes find the daemon through
+``E2E_DRIVER_DAEMON`` (see ``resources/libs/driver_lease.py``).
+
+    python tools/driver_daemon.py --env dev --platform windows
+    python tools/driver_daemon.py --env dev --platform mac --port 4799
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List
+
+import aiohttp
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.env_loader import DRIVER_DIR, build_context, read_config  # noqa: E402
+
+DEFAULT_PORT = 4799
+
+
+class SessionPool:
+    """Warm sessions for one platform."""
+
+    def __init__(self, platform: str, context: Dict[str, Any], cfg: Dict[str, Any], http: aiohttp.ClientSession):
+        self.platform = platform
+        self.remote_url = context["remote_url"].rstrip("/")
+        capabilities = context["capabilities"]
+        keys = cfg.get("capability_keys")
+        self.capabilities = {key: value for key, value in capabilities.items() if not keys or key in keys}
+        self.protocol = cfg.get("protocol", "w3c")
+        self.size = min(int(cfg.get("size", 1)), context["max_sessions"])
+        self.reset_steps: List[Dict[str, str]] = cfg.get("reset") or []
+        self.keepalive = float(cfg.get("keepalive", 30))
+        self.max_lease = float(cfg.get("max_lease", 900))
+        self.http = http
+        self.warm: asyncio.Queue[str] = asyncio.Queue()
+        self.leases: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"created": 0, "replaced": 0, "leases_total": 0, "reclaimed": 0, "last_error": None}
+        self._lease_wait: Deque[float] = deque(maxlen=100)
+        self._reset: Deque[float] = deque(maxlen=100)
+        self._create: Deque[float] = deque(maxlen=100)
+        self._waiting = 0
+        self._resetting = 0
+
+    async def _command(self, method: str, path: str, payload: Dict[str, Any] | None = None) -> Any:
+        async with self.http.request(method, f"{self.remote_url}{path}", json=payload) as response:
+            body = await response.json(content_type=None)
+            if response.status >= 400:
+                raise RuntimeError(f"{method} {path}: {response.status} {json.dumps(body)[:300]}")
+            return body
+
+    async def create(self) -> str:
+        started = time.perf_counter()
+        if self.protocol == "jsonwp":
+            payload = {"desiredCapabilities": self.capabilities}
+        else:
+            payload = {"capabilities": {"alwaysMatch": self.capabilities, "firstMatch": [{}]}}
+        body = await self._command("POST", "/session", payload)
+        session_id = body.get("sessionId") or body.get("value", {}).get("sessionId")
+        self._create.append(time.perf_counter() - started)
+        self.stats["created"] += 1
+        return session_id
+
+    async def start(self) -> None:
+        for session_id in await asyncio.gather(*(self.create() for _ in range(self.size))):
+            self.warm.put_nowait(session_id)
+
+    async def lease(self, timeout: float, owner: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        self._waiting += 1
+        try:
+            session_id = await asyncio.wait_for(self.warm.get(), timeout)
+        finally:
+            self._waiting -= 1
+        self._lease_wait.append(time.perf_counter() - started)
+        lease_id = uuid.uuid4().hex
+        now = time.time()
+        self.leases[lease_id] = {"session_id": session_id, "owner": owner, "since": now, "renewed": now}
+        self.stats["leases_total"] += 1
+        return {
+            "lease": lease_id,
+            "session_id": session_id,
+            "remote_url": self.remote_url,
+            "capabilities": self.capabilities,
+            "platform": self.platform,
+            "renew_every": self.max_lease / 4,
+        }
+
+    def renew(self, lease_id: str) -> None:
+        self.leases[lease_id]["renewed"] = time.time()
+
+    def release(self, lease_id: str) -> None:
+        """End the lease now; the session rejoins the warm queue once reset."""
+        session_id = self.leases.pop(lease_id)["session_id"]
+        asyncio.create_task(self._give_back(session_id))
+
+    async def _give_back(self, session_id: str) -> None:
+        self._resetting += 1
+        try:
+            self.warm.put_nowait(await self._recycle(session_id))
+        except Exception as exc:  # noqa: BLE001 - replacement failed; maintain() tops the pool up
+            self.stats["last_error"] = str(exc)
+        finally:
+            self._resetting -= 1
+
+    async def _recycle(self, session_id: str) -> str:
+        """Reset the app; a session that no longer answers is replaced."""
+        started = time.perf_counter()
+        try:
+            for step in self.reset_steps:
+                found = await self._command(
+                    "POST", f"/session/{session_id}/elements", {"using": step["using"], "value": step["value"]}
+                )
+                elements = found.get("value") or []
+                if elements:
+                    element = elements[0]
+                    element_id = element.get("ELEMENT") or next(iter(element.values()))
+                    await self._command("POST", f"/session/{session_id}/element/{element_id}/click", {})
+            if not self.reset_steps:
+                await self._command("GET", f"/session/{session_id}/title")
+        except Exception as exc:  # noqa: BLE001 - any failure means the session is unusable
+            self.stats["last_error"] = str(exc)
+            self.stats["replaced"] += 1
+            await self._delete(session_id)
+            return await self.create()
+        self._reset.append(time.perf_counter() - started)
+        return session_id
+
+    async def _delete(self, session_id: str) -> None:
+        try:
+            await self._command("DELETE", f"/session/{session_id}")
+        except Exception:  # noqa: BLE001 - already gone
+            pass
+
+    def _take_idle(self, keep=lambda session_id: True) -> List[str]:
+        """Idle session ids; those ``keep`` accepts go straight back (no await, so no lease sees a gap)."""
+        idle = [self.warm.get_nowait() for _ in range(self.warm.qsize())]
+        for session_id in idle:
+            if keep(session_id):
+                self.warm.put_nowait(session_id)
+        return idle
+
+    async def _ping(self, session_id: str) -> bool:
+        try:
+            await self._command("GET", f"/session/{session_id}/title")
+        except Exception as exc:  # noqa: BLE001 - any failure means the session is unusable
+            self.stats["last_error"] = str(exc)
+            return False
+        return True
+
+    async def maintain(self) -> None:
+        """Keep idle sessions alive and reclaim leases whose holder stopped renewing them."""
+        while True:
+            await asyncio.sleep(self.keepalive)
+            for lease_id, lease in list(self.leases.items()):
+                if time.time() - lease["renewed"] > self.max_lease:
+                    self.stats["reclaimed"] += 1
+                    self.release(lease_id)
+            # Cheap ping while the sessions stay leasable; the reset clicks only run on release.
+            idle = self._take_idle()
+            alive = await asyncio.gather(*(self._ping(session_id) for session_id in idle))
+            dead = {session_id for session_id, ok in zip(idle, alive) if not ok}
+            if dead:
+                self._take_idle(keep=lambda session_id: session_id not in dead)
+                for session_id in dead:
+                    self.stats["replaced"] += 1
+                    await self._delete(session_id)
+            for _ in range(self.size - self.warm.qsize() - len(self.leases) - self._resetting):
+                try:
+                    self.warm.put_nowait(await self.create())
+                except Exception as exc:  # noqa: BLE001 - endpoint still down; retry next round
+                    self.stats["last_error"] = str(exc)
+
+    async def close(self) -> None:
+        sessions = [lease["session_id"] for lease in self.leases.values()]
+        while not self.warm.empty():
+            sessions.append(self.warm.get_nowait())
+        await asyncio.gather(*(self._delete(session_id) for session_id in sessions))
+
+    def status(self) -> Dict[str, Any]:
+        def millis(values: Deque[float]) -> float | None:
+            return round(1000 * statistics.mean(values), 1) if values else None
+
+        return {
+            "size": self.size,
+            "warm": self.warm.qsize(),
+            "leased": len(self.leases),
+            "waiting": self._waiting,
+            "lease_wait_ms": millis(self._lease_wait),
+            "reset_ms": millis(self._reset),
+            "create_ms": millis(self._create),
+            **self.stats,
+        }
+
+
+class DriverDaemon:
+    def __init__(self, environment: str, platforms: List[str]):
+        self.environment = environment
+        self.platforms = platforms
+        self.pools: Dict[str, SessionPool] = {}
+        self.http: aiohttp.ClientSession | None = None
+        self.started = time.time()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self, app: web.Application) -> None:
+        self.http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120))
+        for platform in self.platforms:
+            context = build_context(self.environment, platform)
+            cfg = read_config(DRIVER_DIR / f"{platform}.yaml").get("session_pool") or {}
+            pool = SessionPool(platform, context, cfg, self.http)
+            await pool.start()
+            self.pools[platform] = pool
+            self._tasks.append(asyncio.create_task(pool.maintain()))
+
+    async def stop(self, app: web.Application) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*(pool.close() for pool in self.pools.values()))
+        if self.http is not None:
+            await self.http.close()
+
+    async def handle_lease(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        pool = self.pools.get(body.get("platform", ""))
+        if pool is None:
+            return web.json_response({"error": f"no pool for {body.get('platform')}"}, status=404)
+        try:
+            lease = await pool.lease(float(body.get("timeout", 120)), str(body.get("owner", request.remote)))
+        except asyncio.TimeoutError:
+            return web.json_response({"error": "no warm session became free in time"}, status=503)
+        return web.json_response(lease)
+
+    async def handle_renew(self, request: web.Request) -> web.Response:
+        lease_id = (await request.json()).get("lease", "")
+        for pool in self.pools.values():
+            if lease_id in pool.leases:
+                pool.renew(lease_id)
+                return web.json_response({"renewed": lease_id})
+        return web.json_response({"error": f"unknown lease {lease_id}"}, status=404)
+
+    async def handle_release(self, request: web.Request) -> web.Response:
+        lease_id = (await request.json()).get("lease", "")
+        for pool in self.pools.values():
+            if lease_id in pool.leases:
+                pool.release(lease_id)
+                return web.json_response({"released": lease_id}, status=202)
+        return web.json_response({"error": f"unknown lease {lease_id}"}, status=404)
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        pools = {platform: pool.status() for platform, pool in self.pools.items()}
+        ready = bool(pools) and all(pool["warm"] + pool["leased"] > 0 for pool in pools.values())
+        return web.json_response(
+            {
+                "value": {
+                    "ready": ready,
+                    "message": f"driver daemon ({self.environment}) up {time.time() - self.started:.0f}s",
+                    "pools": pools,
+                }
+            }
+        )
+
+
+def create_app(environment: str, platforms: List[str]) -> web.Application:
+    daemon = DriverDaemon(environment, platforms)
+    app = web.Application()
+    app.router.add_post("/lease", daemon.handle_lease)
+    app.router.add_post("/renew", daemon.handle_renew)
+    app.router.add_post("/release", daemon.handle_release)
+    app.router.add_get("/status", daemon.handle_status)
+    app.on_startup.append(daemon.start)
+    app.on_cleanup.append(daemon.stop)
+    return app
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-warmed desktop driver sessions leased over a local socket")
+    parser.add_argument("--env", default=os.getenv("E2E_ENV", "dev"))
+    parser.add_argument("--platform", action="append", choices=["mac", "windows", "android"], required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    print(f"driver daemon ({args.env}: {', '.join(args.platform)}) on http://{args.host}:{args.port}")
+    print(f"export E2E_DRIVER_DAEMON=http://{args.host}:{args.port}")
+    web.run_app(create_app(args.env, args.platform), host=args.host, port=args.port, print=None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""Index new report directories and list failures grouped by root cause.
+
+Only runs that are new (or whose result files changed) are parsed:
+
+    python tools/failure_clusters.py                       # all runs, biggest clusters first
+    python tools/failure_clusters.py --run reports/fake-web-20240101_120000
+    python tools/failure_clusters.py --cluster 12          # the failures in one cluster
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.failure_index import THRESHOLD, clusters, format_clusters, index_failures, open_index  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cluster test failures across runs by normalized message and trace")
+    parser.add_argument("--reports", type=Path, default=ROOT / "reports")
+    parser.add_argument("--db", type=Path, help="SQLite index (default: <reports>/failures.sqlite)")
+    parser.add_argument("--run", action="append", default=[], help="Only failures of this report directory (repeatable)")
+    parser.add_argument("--cluster", type=int, help="List the failures of one cluster")
+    parser.add_argument("--limit", type=int, default=30, help="Clusters to show")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Similarity for joining a cluster (new failures only)")
+    parser.add_argument("--json", action="store_true", help="Print the rows as JSON")
+    args = parser.parse_args()
+
+    reports = args.reports.resolve()
+    runs = [Path(run).resolve().relative_to(reports).as_posix() for run in args.run]
+    started = time.perf_counter()
+    with open_index(args.db or reports / "failures.sqlite") as conn:
+        indexed = index_failures(conn, reports, args.threshold)
+        indexed_at = time.perf_counter()
+        if args.cluster is not None:
+            members = conn.execute(
+                "SELECT run_path, test, message FROM failures WHERE cluster_id = ? ORDER BY run_path, test", (args.cluster,)
+            ).fetchall()
+            for run_path, test, message in members:
+                print(f"{run_path}  {test}\n    {message.strip().splitlines()[0] if message.strip() else ''}")
+            return 0
+        rows = clusters(conn, runs, args.limit)
+    conn.close()
+    if args.json:
+        print(json.dumps(rows, indent=1, ensure_ascii=False))
+        return 0
+    print("\n".join(format_clusters(rows)))
+    print(
+        f"{sum(row['failures'] for row in rows)} failures in {len(rows)} clusters; "
+        f"indexed {len(indexed)} new run(s) in {1000 * (indexed_at - started):.0f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,706 @@
+#!/usr/bin/env python
+"""Hermetic W3C WebDriver / Appium stand-in.
+
+An asyncio (aiohttp) server that speaks enough of the W3C wire protocol for
+SeleniumLibrary, the Selenium/Appium Python clients and the raw-HTTP Windows
+tests. Each session gets its own scripted scene picked from the requested
+capabilities:
+
+* ``appium:bundleId`` com.apple.calculator -> Mac2 Calculator accessibility tree
+* ``app`` containing ``WindowsCalculator``   -> WinAppDriver Calculator tree
+* ``platformName`` Android                   -> UiAutomator2 login screen
+* anything else                               -> web login/search page
+
+The calculators actually calculate, the web page logs in and searches, so the
+existing suites can run against it unchanged. Latency can be injected per
+command to emulate a remote grid, and there is no practical session limit
+beyond ``--max-sessions``. Scripts sent to ``/execute`` are answered by the
+handlers registered with ``@script_handler``; unknown scripts return null.
+
+    python tools/fake_webdriver.py --port 4499 --latency 0.02 --latency newSession=0.5
+    python scripts/run_tests.py --platform web --env fake
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from aiohttp import web
+from lxml import etree
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# 1x1 transparent PNG returned for every screenshot.
+_BLANK_PNG = base64.b64encode(
+    bytes.fromhex(
+        "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+        "1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082"
+    )
+).decode()
+
+# Attributes a locator value may live in, depending on the platform's tree.
+_ATTRIBUTE_ALIASES = {
+    "id": ("id", "resource-id", "AutomationId"),
+    "name": ("name", "Name"),
+}
+
+_CSS_TAG = re.compile(r"^(?:[A-Za-z][\w-]*|\*)")
+_CSS_ID = re.compile(r"#([\w-]+)")
+_CSS_CLASS = re.compile(r"\.([A-Za-z_][\w-]*)")
+_CSS_ATTRIBUTE = re.compile(r"\[([\w:-]+)(?:=(['\"]?)(.*?)\2)?\]")
+
+_MAC_KEYS = ["AC", "±", "%", "÷", "7", "8", "9", "×", "4", "5", "6", "−", "1", "2", "3", "+", "0", ".", "="]
+_WIN_KEYS = {
+    "Zero": "0", "One": "1", "Two": "2", "Three": "3", "Four": "4", "Five": "5", "Six": "6",
+    "Seven": "7", "Eight": "8", "Nine": "9", "Decimal separator": ".", "Plus": "+", "Minus": "−",
+    "Multiply by": "×", "Divide by": "÷", "Equals": "=", "Clear": "AC", "Clear entry": "CE",
+    "Positive negative": "±",
+}
+
+
+class WebDriverError(Exception):
+    def __init__(self, status: int, error: str, message: str = "") -> None:
+        super().__init__(message or error)
+        self.status = status
+        self.error = error
+        self.message = message or error
+
+
+# --------------------------------------------------------------------------- scenes
+
+
+class CalculatorEngine:
+    """Just enough of a four-function calculator to answer real assertions."""
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self.entry = "0"
+        self.accumulator: float | None = None
+        self.pending: str | None = None
+        self.fresh = True
+        self.error = False
+
+    def press(self, key: str) -> None:
+        if key in ("AC", "C", "CE"):
+            self.clear()
+        elif key.isdigit() or key == ".":
+            if self.fresh or self.error:
+                self.entry, self.fresh, self.error = "0", False, False
+            if key == "." and "." in self.entry:
+                return
+            self.entry = key if self.entry == "0" and key != "." else self.entry + key
+        elif key == "±":
+            self.entry = self.entry[1:] if self.entry.startswith("-") else f"-{self.entry}"
+        elif key in ("+", "−", "×", "÷", "="):
+            self._apply()
+            self.pending = None if key == "=" else key
+            self.fresh = True
+
+    def _apply(self) -> None:
+        value = float(self.entry)
+        if self.pending is None or self.accumulator is None:
+            self.accumulator = value
+            return
+        left = self.accumulator
+        if self.pending == "÷" and value == 0:
+            self.error = True
+            self.accumulator = None
+            self.entry = "Not a number"
+            return
+        result = {"+": left + value, "−": left - value, "×": left * value, "÷": left / value if value else 0.0}[self.pending]
+        self.accumulator = result
+        self.entry = f"{result:.15g}"
+
+    @property
+    def display(self) -> str:
+        return self.entry
+
+
+@dataclass
+class Scene:
+    kind: str
+    root: etree._Element
+    title: str = ""
+    url: str = "about:blank"
+    calculator: CalculatorEngine | None = None
+    loaded_at: float = field(default_factory=time.time)
+
+    def source(self) -> str:
+        return etree.tostring(self.root, encoding="unicode", pretty_print=True)
+
+    def on_click(self, node: etree._Element) -> None:
+        if self.calculator is not None:
+            key = node.get("title") or _WIN_KEYS.get(node.get("Name", ""), "")
+            if key:
+                self.calculator.press(key)
+                self._render_display()
+            return
+        if self.kind == "android" and node.get("resource-id", "").endswith("button_login"):
+            if not self.root.xpath('//*[@resource-id="com.example.dev:id/home_header"]'):
+                etree.SubElement(self.root, "android.widget.TextView", {
+                    "resource-id": "com.example.dev:id/home_header", "text": "Home", "displayed": "true",
+                })
+            return
+        if self.kind == "web" and node.tag == "button" and node.get("type") == "submit":
+            body = self.root.find("body")
+            if not body.xpath('./h1[@data-test="dashboard-title"]'):
+                header = etree.SubElement(body, "h1", {"data-test": "dashboard-title"})
+                header.text = "Dashboard"
+            self.title = "Dashboard"
+
+    def on_keys(self, node: etree._Element, text: str) -> None:
+        submit = "\ue006" in text or "\ue007" in text
+        typed = text.replace("\ue006", "").replace("\ue007", "")
+        attribute = "text" if self.kind == "android" else "value"
+        node.set(attribute, node.get(attribute, "") + typed)
+        if submit and self.kind == "web" and node.get("name") == "q":
+            query = node.get("value", "")
+            self.title = f"{query} - Google Search"
+            results = etree.SubElement(self.root.find("body"), "div", {"id": "search"})
+            for index in range(3):
+                heading = etree.SubElement(results, "h3")
+                heading.text = f"{query.capitalize()} result {index + 1}"
+
+    def _render_display(self) -> None:
+        assert self.calculator is not None
+        if self.kind == "mac":
+            self.root.xpath('//XCUIElementTypeStaticText[@name="main display"]')[0].set("value", self.calculator.display)
+        else:
+            result = self.root.xpath('//*[@AutomationId="CalculatorResults"]')[0]
+            result.set("Name", f"Display is {self.calculator.display}")
+            result.set("name", result.get("Name"))
+
+
+def _mac_calculator() -> Scene:
+    app = etree.Element("XCUIElementTypeApplication", title="Calculator", bundleId="com.apple.calculator")
+    window = etree.SubElement(app, "XCUIElementTypeWindow", title="Calculator", name="Calculator")
+    display = etree.SubElement(window, "XCUIElementTypeGroup", identifier="_NS:11")
+    etree.SubElement(display, "XCUIElementTypeStaticText", {
+        "name": "main display", "value": "0", "enabled": "true", "x": "20", "y": "40", "width": "200", "height": "60",
+    })
+    keypad = etree.SubElement(window, "XCUIElementTypeGroup")
+    for index, key in enumerate(_MAC_KEYS):
+        etree.SubElement(keypad, "XCUIElementTypeButton", {
+            "title": key, "name": key, "label": key, "enabled": "true",
+            "x": str(20 + (index % 4) * 50), "y": str(110 + (index // 4) * 50), "width": "48", "height": "48",
+        })
+    return Scene("mac", app, title="Calculator", calculator=CalculatorEngine())
+
+
+def _windows_calculator() -> Scene:
+    window = etree.Element("Window", Name="Calculator", name="Calculator", ClassName="ApplicationFrameWindow")
+    etree.SubElement(window, "Text", {
+        "Name": "Display is 0", "name": "Display is 0", "AutomationId": "CalculatorResults",
+        "x": "10", "y": "80", "width": "320", "height": "70",
+    })
+    for index, name in enumerate(_WIN_KEYS):
+        etree.SubElement(window, "Button", {
+            "Name": name, "name": name, "AutomationId": f"button{index}",
+            "x": str(10 + (index % 4) * 80), "y": str(200 + (index // 4) * 60), "width": "78", "height": "58",
+        })
+    return Scene("windows", window, title="Calculator", calculator=CalculatorEngine())
+
+
+def _android_login() -> Scene:
+    root = etree.Element("hierarchy", rotation="0")
+    for field_id in ("input_email", "input_password"):
+        etree.SubElement(root, "android.widget.EditText", {
+            "resource-id": f"com.example.dev:id/{field_id}", "text": "", "displayed": "true",
+        })
+    etree.SubElement(root, "android.widget.Button", {
+        "resource-id": "com.example.dev:id/button_login", "text": "Login", "displayed": "true",
+    })
+    return Scene("android", root, title="LoginActivity")
+
+
+def _web_page() -> Scene:
+    html = etree.fromstring(
+        """<html><head><title>Google</title></head><body>
+        <form id="login">
+          <input name="email" type="email" value=""/>
+          <input name="password" type="password" value=""/>
+          <button type="submit">Sign in</button>
+        </form>
+        <form id="search">
+          <input name="q" type="text" value="" title="Search"/>
+          <input type="submit" value="Google Search"/>
+        </form>
+        </body></html>"""
+    )
+    return Scene("web", html, title="Google")
+
+
+def build_scene(capabilities: Dict[str, Any]) -> Scene:
+    platform = str(capabilities.get("platformName", "")).lower()
+    bundle = str(capabilities.get("appium:bundleId", capabilities.get("bundleId", "")))
+    app = str(capabilities.get("app", capabilities.get("appium:app", "")))
+    if "calculator" in bundle.lower() or platform == "mac":
+        return _mac_calculator()
+    if "windowscalculator" in app.lower() or platform == "windows":
+        return _windows_calculator()
+    if platform == "android":
+        return _android_login()
+    return _web_page()
+
+
+# --------------------------------------------------------------------------- locators
+
+
+def _css_to_xpath(selector: str) -> str:
+    """Translate the simple selectors used in this repo (tag, #id, .class, [attr="v"], lists)."""
+    parts = []
+    for chunk in selector.split(","):
+        chunk = chunk.strip()
+        bare = _CSS_ATTRIBUTE.sub("", chunk)
+        tag_match = _CSS_TAG.match(bare)
+        tag = tag_match.group(0) if tag_match else "*"
+        conditions = [_attribute_condition("id", value) for value in _CSS_ID.findall(bare)]
+        conditions += [
+            f"contains(concat(' ', normalize-space(@class), ' '), ' {value} ')" for value in _CSS_CLASS.findall(bare)
+        ]
+        for name, _quote, value in _CSS_ATTRIBUTE.findall(chunk):
+            conditions.append(_attribute_condition(name, value) if _quote or value else f"@{name}")
+        parts.append(f".//{tag}" + "".join(f"[{condition}]" for condition in conditions))
+    return " | ".join(parts)
+
+
+def _attribute_condition(name: str, value: str) -> str:
+    literal = json.dumps(value)
+    return " or ".join(f"@{alias}={literal}" for alias in _ATTRIBUTE_ALIASES.get(name, (name,)))
+
+
+def _to_xpath(using: str, value: str) -> str:
+    if using == "xpath":
+        return value
+    if using == "css selector":
+        return _css_to_xpath(value)
+    if using in ("name", "id"):
+        return f".//*[{_attribute_condition(using, value)}]"
+    if using == "accessibility id":
+        literal = json.dumps(value)
+        return f".//*[@AutomationId={literal} or @identifier={literal} or @content-desc={literal} or @name={literal}]"
+    if using == "link text":
+        return f".//a[normalize-space(.)={json.dumps(value)}]"
+    if using == "partial link text":
+        return f".//a[contains(., {json.dumps(value)})]"
+    if using == "tag name":
+        return f".//{value}"
+    if using == "class name":
+        return f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')] | .//{value}"
+    raise WebDriverError(400, "invalid argument", f"Unsupported locator strategy: {using}")
+
+
+# --------------------------------------------------------------------------- sessions
+
+
+@dataclass
+class Session:
+    session_id: str
+    capabilities: Dict[str, Any]
+    scene: Scene
+    elements: Dict[str, etree._Element] = field(default_factory=dict)
+    ids: Dict[int, str] = field(default_factory=dict)
+    timeouts: Dict[str, int] = field(default_factory=lambda: {"implicit": 0, "pageLoad": 300000, "script": 30000})
+    performance_log: List[Dict[str, Any]] = field(default_factory=list)
+
+    def log_navigation(self, url: str, load_seconds: float) -> None:
+        """Chrome-style performance log entries (network + trace) for one document load."""
+        if self.capabilities.get("goog:loggingPrefs", {}).get("performance") is None:
+            return
+        now = time.time()
+        request_id = uuid.uuid4().hex[:8]
+        size = len(self.scene.source())
+        request = {"url": url, "method": "GET", "headers": {}}
+        response = {
+            "url": url,
+            "status": 200,
+            "statusText": "OK",
+            "mimeType": "text/html",
+            "protocol": "http/1.1",
+            "headers": {"Content-Type": "text/html"},
+            "timing": {"sendStart": 0.1, "sendEnd": 0.2, "receiveHeadersEnd": load_seconds * 600},
+        }
+        task = {"name": "RunTask", "cat": "devtools.timeline", "ph": "X", "pid": 1, "tid": 1}
+        messages = [
+            ("Network.requestWillBeSent", {"requestId": request_id, "timestamp": now, "wallTime": now, "type": "Document", "request": request}),
+            ("Network.responseReceived", {"requestId": request_id, "timestamp": now + load_seconds * 0.6, "response": response}),
+            ("Network.loadingFinished", {"requestId": request_id, "timestamp": now + load_seconds, "encodedDataLength": size}),
+            ("Tracing.dataCollected", {"value": [{**task, "ts": int(now * 1e6), "dur": int(load_seconds * 1e6)}]}),
+        ]
+        for method, params in messages:
+            message = json.dumps({"message": {"method": method, "params": params}, "webview": self.session_id})
+            self.performance_log.append({"level": "INFO", "message": message, "timestamp": int(now * 1000)})
+
+    def reference(self, node: etree._Element) -> Dict[str, str]:
+        key = id(node)
+        if key not in self.ids:
+            element_id = uuid.uuid4().hex[:16]
+            self.ids[key] = element_id
+            self.elements[element_id] = node
+        return {ELEMENT_KEY: self.ids[key]}
+
+    def element(self, element_id: str) -> etree._Element:
+        node = self.elements.get(element_id)
+        if node is None or node.getroottree().getroot() is not self.scene.root:
+            raise WebDriverError(404, "stale element reference", element_id)
+        return node
+
+    def find(self, scope: etree._Element, using: str, value: str) -> List[etree._Element]:
+        xpath = _to_xpath(using, value)
+        if scope is self.scene.root and using != "xpath":
+            # A search from the session root also matches the root window itself.
+            xpath = xpath.replace(".//", "descendant-or-self::")
+        try:
+            matches = scope.xpath(xpath)
+        except etree.XPathError as exc:
+            raise WebDriverError(400, "invalid selector", str(exc)) from exc
+        return [node for node in matches if isinstance(node, etree._Element)]
+
+
+@dataclass
+class FakeWebDriver:
+    latency: Dict[str, float] = field(default_factory=dict)
+    jitter: float = 0.0
+    max_sessions: int = 0
+    sessions: Dict[str, Session] = field(default_factory=dict)
+    stats: Dict[str, int] = field(default_factory=lambda: {"sessions_created": 0, "commands": 0})
+
+    async def delay(self, command: str) -> None:
+        seconds = self.latency.get(command, self.latency.get("*", 0.0))
+        if self.jitter:
+            seconds += random.uniform(0, self.jitter)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def dispatch(self, method: str, parts: List[str], body: Dict[str, Any]) -> Any:
+        self.stats["commands"] += 1
+        if parts == ["status"]:
+            await self.delay("status")
+            return {
+                "ready": not self.max_sessions or len(self.sessions) < self.max_sessions,
+                "message": "fake webdriver ready",
+                "sessions": len(self.sessions),
+                "maxSessions": self.max_sessions or None,
+            }
+        if parts == ["session"] and method == "POST":
+            await self.delay("newSession")
+            return self._new_session(body)
+        if parts == ["sessions"]:
+            return [{"id": sid, "capabilities": session.capabilities} for sid, session in self.sessions.items()]
+        if len(parts) < 2 or parts[0] != "session":
+            raise WebDriverError(404, "unknown command", "/".join(parts))
+
+        session = self.sessions.get(parts[1])
+        if session is None:
+            raise WebDriverError(404, "invalid session id", parts[1])
+        command = parts[2:]
+        await self.delay(command[0] if command else "deleteSession")
+        return self._session_command(session, method, command, body)
+
+    def _new_session(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if self.max_sessions and len(self.sessions) >= self.max_sessions:
+            raise WebDriverError(500, "session not created", f"All {self.max_sessions} slots are busy")
+        requested = body.get("capabilities", {})
+        caps = {**(requested.get("alwaysMatch") or {}), **((requested.get("firstMatch") or [{}])[0])}
+        caps = caps or body.get("desiredCapabilities", {})
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = Session(session_id, caps, build_scene(caps))
+        self.stats["sessions_created"] += 1
+        return {"sessionId": session_id, "capabilities": {"browserName": "fake", **caps}}
+
+    def _session_command(self, session: Session, method: str, command: List[str], body: Dict[str, Any]) -> Any:
+        scene = session.scene
+        if not command:
+            if method == "DELETE":
+                self.sessions.pop(session.session_id, None)
+                return None
+            return session.capabilities
+        head = command[0]
+        if head == "url":
+            if method == "POST":
+                scene.url = body.get("url", "")
+                scene.loaded_at = time.time()
+                session.log_navigation(scene.url, self.latency.get("url", self.latency.get("*", 0.0)))
+                if "google" in scene.url:
+                    scene.title = "Google"
+                return None
+            return scene.url
+        if head == "title":
+            return scene.title
+        if head == "se" and command[1:] == ["log"]:
+            if body.get("type") != "performance":
+                return []
+            entries, session.performance_log = session.performance_log, []
+            return entries
+        if head == "source":
+            return scene.source()
+        if head == "timeouts":
+            if method == "POST":
+                session.timeouts.update({key: value for key, value in body.items() if isinstance(value, int)})
+            return None if method == "POST" else session.timeouts
+        if head == "screenshot":
+            return _BLANK_PNG
+        if head == "window":
+            rect = {"x": 0, "y": 0, "width": 1440, "height": 900}
+            if command[1:] == ["handles"]:
+                return ["main"]
+            return rect if len(command) > 1 else "main"
+        if head == "execute":
+            return self._execute(session, body)
+        if head in ("back", "forward", "refresh", "appium", "actions"):
+            return None
+        if head in ("element", "elements") and len(command) == 1:
+            return self._find(session, scene.root, head, body)
+        if head == "element" and len(command) >= 3:
+            node = session.element(command[1])
+            return self._element_command(session, node, command[2:], method, body)
+        raise WebDriverError(404, "unknown command", "/".join(command))
+
+    def _execute(self, session: Session, body: Dict[str, Any]) -> Any:
+        """Answer a script with the first matching ``SCRIPT_HANDLERS`` entry; anything else returns null."""
+        script = body.get("script", "")
+        args = body.get("args", [])
+        for matches, handler in SCRIPT_HANDLERS:
+            if matches(script, args):
+                return handler(self, session, args)
+        return None
+
+    def _find(self, session: Session, scope: etree._Element, head: str, body: Dict[str, Any]) -> Any:
+        matches = session.find(scope, body.get("using", ""), body.get("value", ""))
+        if head == "elements":
+            return [session.reference(node) for node in matches]
+        if not matches:
+            raise WebDriverError(404, "no such element", f"{body.get('using')}={body.get('value')}")
+        return session.reference(matches[0])
+
+    def _element_command(
+        self, session: Session, node: etree._Element, command: List[str], method: str, body: Dict[str, Any]
+    ) -> Any:
+        scene = session.scene
+        action = command[0]
+        if action in ("element", "elements"):
+            return self._find(session, node, action, body)
+        if action == "click":
+            scene.on_click(node)
+            return None
+        if action == "value":
+            scene.on_keys(node, body.get("text") or "".join(body.get("value", [])))
+            return None
+        if action == "clear":
+            node.set("text" if scene.kind == "android" else "value", "")
+            return None
+        if action == "text":
+            return _node_text(node)
+        if action in ("attribute", "property") and len(command) > 1:
+            return node.get(command[1]) if command[1] != "innerText" else _node_text(node)
+        if action == "displayed":
+            return node.get("hidden") is None and node.get("displayed", "true") != "false"
+        if action in ("enabled", "selected"):
+            return action == "enabled" and node.get("enabled", "true") != "false"
+        if action == "name":
+            return node.tag
+        if action == "rect":
+            return {key: int(node.get(key, 0)) for key in ("x", "y", "width", "height")}
+        raise WebDriverError(404, "unknown command", action)
+
+
+def _node_text(node: etree._Element) -> str:
+    for attribute in ("Name", "text", "value"):
+        if node.get(attribute) is not None and node.tag not in ("input",):
+            return node.get(attribute)
+    return " ".join("".join(node.itertext()).split())
+
+
+# --------------------------------------------------------------------------- scripts
+
+# (matches(script, args), handler(driver, session, args)), tried in registration order.
+SCRIPT_HANDLERS: List[Tuple[Callable[[str, List[Any]], bool], Callable[..., Any]]] = []
+
+
+def script_handler(matches: Callable[[str, List[Any]], bool]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Register a handler for the scripts ``matches`` accepts."""
+
+    def register(handler: Callable[..., Any]) -> Callable[..., Any]:
+        SCRIPT_HANDLERS.append((matches, handler))
+        return handler
+
+    return register
+
+
+def _is_element(arg: Any) -> bool:
+    return isinstance(arg, dict) and ELEMENT_KEY in arg
+
+
+def _element_args(session: Session, args: List[Any]) -> List[etree._Element]:
+    return [session.element(arg[ELEMENT_KEY]) for arg in args if _is_element(arg)]
+
+
+# The Selenium atoms behind is_displayed() and get_attribute().
+@script_handler(lambda script, args: "isDisplayed" in script and any(map(_is_element, args)))
+def _is_displayed(driver: FakeWebDriver, session: Session, args: List[Any]) -> Any:
+    return driver._element_command(session, _element_args(session, args)[0], ["displayed"], "GET", {})
+
+
+@script_handler(lambda script, args: "getAttribute" in script and len(args) > 1 and any(map(_is_element, args)))
+def _get_attribute(driver: FakeWebDriver, session: Session, args: List[Any]) -> Any:
+    return _element_args(session, args)[0].get(args[1])
+
+
+@script_handler(lambda script, args: "document.readyState" in script)
+def _ready_state(driver: FakeWebDriver, session: Session, args: List[Any]) -> Any:
+    return "complete"
+
+
+@script_handler(lambda script, args: "document.title" in script)
+def _document_title(driver: FakeWebDriver, session: Session, args: List[Any]) -> Any:
+    return session.scene.title
+
+
+# resources/libs/perf_budget.py: Navigation Timing shaped like a real page load taking the "url" latency.
+@script_handler(lambda script, args: "getEntriesByType" in script)
+def _navigation_timing(driver: FakeWebDriver, session: Session, args: List[Any]) -> Any:
+    load_ms = 1000 * driver.latency.get("url", driver.latency.get("*", 0.0))
+    return {
+        "url": session.scene.url,
+        "timeOrigin": 1000 * session.scene.loaded_at,
+        "ttfb": round(load_ms * 0.3, 1),
+        "domContentLoaded": round(load_ms * 0.8, 1),
+        "load": round(load_ms, 1),
+        "firstContentfulPaint": round(load_ms * 0.6, 1),
+        "transferSize": len(etree.tostring(session.scene.root)),
+        "resourceCount": 0,
+    }
+
+
+# resources/libs/element_query.py: one row per match, like the in-page script returns.
+@script_handler(lambda script, args: "e2e:query-elements" in script)
+def _query_elements(driver: FakeWebDriver, session: Session, args: List[Any]) -> Any:
+    strategy, selector, attributes, limit = args
+    matches = session.find(session.scene.root, "xpath" if strategy == "xpath" else "css selector", selector)
+    rows = []
+    for node in matches[: limit or None]:
+        visible = node.get("hidden") is None and node.get("displayed", "true") != "false"
+        rect = [int(node.get(key, 0)) for key in ("x", "y", "width", "height")]
+        rows.append([node.tag.lower(), _node_text(node), visible, *rect, [node.get(name) for name in attributes]])
+    return rows
+
+
+# Mac2 coordinate click (resources/libs/ui_tree.py): hit-test the innermost element containing the point.
+@script_handler(lambda script, args: script == "macos: click" and bool(args) and "x" in args[0])
+def _macos_click(driver: FakeWebDriver, session: Session, args: List[Any]) -> Any:
+    x, y = args[0]["x"], args[0]["y"]
+    hits = [
+        node for node in session.scene.root.iter()
+        if node.get("width") is not None
+        and int(node.get("x", 0)) <= x < int(node.get("x", 0)) + int(node.get("width", 0))
+        and int(node.get("y", 0)) <= y < int(node.get("y", 0)) + int(node.get("height", 0))
+    ]
+    if hits:
+        session.scene.on_click(hits[-1])
+    return None
+
+
+# --------------------------------------------------------------------------- http
+
+
+def create_app(driver: FakeWebDriver) -> web.Application:
+    async def handle(request: web.Request) -> web.Response:
+        path = request.match_info["tail"]
+        if path.startswith("wd/hub"):
+            path = path[len("wd/hub"):]
+        parts = [part for part in path.split("/") if part]
+        body: Dict[str, Any] = {}
+        if request.can_read_body:
+            raw = await request.read()
+            body = json.loads(raw) if raw.strip() else {}
+        try:
+            value = await driver.dispatch(request.method, parts, body)
+            return web.json_response({"value": value})
+        except WebDriverError as exc:
+            return web.json_response(
+                {"value": {"error": exc.error, "message": exc.message, "stacktrace": ""}}, status=exc.status
+            )
+
+    app = web.Application(client_max_size=32 * 1024 * 1024)
+    app.router.add_route("*", "/{tail:.*}", handle)
+    return app
+
+
+class ServerHandle:
+    """A fake server running on its own event loop thread (for benchmarks and fixtures)."""
+
+    def __init__(self, driver: FakeWebDriver, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.driver = driver
+        self.loop = asyncio.new_event_loop()
+        self._runner: web.AppRunner | None = None
+        self._ready = threading.Event()
+        self.host, self.port = host, port
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._ready.wait(timeout=10)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/wd/hub"
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self._runner = web.AppRunner(create_app(self.driver), access_log=None)
+        self.loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port)
+        self.loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self._ready.set()
+        self.loop.run_forever()
+
+    def stop(self) -> None:
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=10)
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, **kwargs: Any) -> ServerHandle:
+    return ServerHandle(FakeWebDriver(latency={"*": latency}, **kwargs), host, port)
+
+
+def _parse_latency(values: List[str]) -> Dict[str, float]:
+    latency: Dict[str, float] = {}
+    for value in values:
+        command, _, seconds = value.rpartition("=")
+        latency[command or "*"] = float(seconds)
+    return latency
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hermetic fake W3C WebDriver / Appium server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4499)
+    parser.add_argument(
+        "--latency",
+        action="append",
+        default=[],
+        help="Seconds per command, e.g. 0.02 or newSession=1.5 / element=0.05 (repeatable)",
+    )
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency (0..jitter seconds)")
+    parser.add_argument("--max-sessions", type=int, default=0, help="Reject new sessions beyond this (0 = unlimited)")
+    args = parser.parse_args()
+
+    driver = FakeWebDriver(latency=_parse_latency(args.latency), jitter=args.jitter, max_sessions=args.max_sessions)
+    print(f"Fake WebDriver listening on http://{args.host}:{args.port}/wd/hub")
+    web.run_app(create_app(driver), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Scale the grid's browser nodes with the runners' queue depth.
+
+Run next to a grid started with ``docker compose --profile grid up -d``:
+
+    python tools/grid_autoscaler.py                  # loop, backend from config/autoscaler.yaml
+    python tools/grid_autoscaler.py --once --backend noop   # print one round of decisions
+    python tools/grid_autoscaler.py --backend local  # fake WebDriver processes as "nodes"
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.grid_autoscaler import CONFIG_FILE, Autoscaler  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Queue-depth driven autoscaler for Selenium Grid nodes")
+    parser.add_argument("--config", type=Path, default=CONFIG_FILE, help="Autoscaler config (default: config/autoscaler.yaml)")
+    parser.add_argument("--backend", help="Override the backend: compose, local or noop")
+    parser.add_argument("--interval", type=float, help="Seconds between rounds (default: interval in the config)")
+    parser.add_argument("--once", action="store_true", help="Run a single round and print every service")
+    args = parser.parse_args()
+
+    scaler = Autoscaler.from_config(args.config, args.backend)
+    interval = args.interval or float(scaler.config.get("interval", 5))
+    try:
+        while True:
+            stamp = time.strftime("%H:%M:%S")
+            for record in scaler.step():
+                if "error" in record:
+                    print(f"{stamp} {record['error']}")
+                elif args.once or "action" in record:
+                    print(
+                        f"{stamp} {record['service']}: {record.get('action', 'hold')} "
+                        f"(busy {record['busy']}, queued {record['pending']}, target {record['target']})"
+                    )
+            if args.once:
+                return 0
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        if hasattr(scaler.backend, "close"):
+            scaler.backend.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
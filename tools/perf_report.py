@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""Latency budget / regression summary for a Robot report directory.
+
+Reads ``perf.json`` written by the ``resources/libs/perf_budget.py`` listener
+and compares it with the rolling baseline of earlier runs (same environment
+and platform) found under ``--reports``:
+
+    python tools/perf_report.py reports/dev-web-20240101_120000
+    python tools/perf_report.py --latest --fail-on-regression
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.perf_budget import format_summary, load_runs, summarize_run  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check latency budgets and regressions of a Robot run")
+    parser.add_argument("run_dir", nargs="?", type=Path, help="Report directory containing perf.json")
+    parser.add_argument("--latest", action="store_true", help="Use the most recent run under --reports")
+    parser.add_argument("--reports", type=Path, default=ROOT / "reports", help="Where earlier runs live")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 on regressions or violations")
+    args = parser.parse_args()
+
+    if args.latest:
+        runs = load_runs(args.reports)
+        if not runs:
+            parser.error(f"no perf.json under {args.reports}")
+        perf_file = Path(runs[-1]["path"])
+    elif args.run_dir:
+        perf_file = args.run_dir / "perf.json"
+    else:
+        parser.error("give a run directory or --latest")
+
+    summary = summarize_run(perf_file, args.reports)
+    (perf_file.parent / "perf-summary.json").write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+    print("\n".join(format_summary(summary)))
+    if args.fail_on_regression and (summary["violations"] or summary["regressions"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""Merge report directories into the results store and render the trend dashboard.
+
+Only runs that are new (or whose result files changed) are parsed; the
+dashboard itself is rendered from SQLite:
+
+    python tools/results_dashboard.py
+    python tools/results_dashboard.py --runs 100 --output reports/trends.html
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.results_store import index_reports, open_store, write_dashboard  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Index report directories and write the trend dashboard")
+    parser.add_argument("--reports", type=Path, default=ROOT / "reports")
+    parser.add_argument("--db", type=Path, help="SQLite store (default: <reports>/results.sqlite)")
+    parser.add_argument("--output", type=Path, help="Dashboard HTML (default: <reports>/trends.html)")
+    parser.add_argument("--runs", type=int, default=50, help="Runs per environment/platform in the graphs")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with open_store(args.db or args.reports / "results.sqlite") as conn:
+        indexed = index_reports(conn, args.reports)
+        total = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        indexed_at = time.perf_counter()
+        output = write_dashboard(conn, args.output or args.reports / "trends.html", args.runs)
+    conn.close()
+    done = time.perf_counter()
+    print(f"Indexed {indexed} new run(s), {total} in store ({1000 * (indexed_at - started):.0f} ms)")
+    print(f"Dashboard: {output} ({1000 * (done - indexed_at):.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
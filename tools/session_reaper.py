@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Delete WebDriver sessions left open by test processes that crashed.
+
+``run_tests.py`` already reaps after every worker and Robot run. Use this
+for runs started some other way (IDE, plain ``robot`` / ``pytest``), or keep
+it running next to the grid:
+
+    python tools/session_reaper.py            # reap once
+    python tools/session_reaper.py --list     # show the ledger
+    python tools/session_reaper.py --watch 60 # reap every minute
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.resource_leases import process_alive  # noqa: E402
+from resources.libs.session_reaper import SessionLedger, reap  # noqa: E402
+
+
+def print_summary(summary) -> None:
+    for item in summary["reclaimed"]:
+        print(
+            f"reclaimed {item['session_id']} on {item['remote_url']} (pid {item['owner_pid']} gone, "
+            f"idle {item['idle_seconds']:.0f}s, {item['slot_seconds']:.0f} slot-seconds freed)"
+        )
+    print(
+        f"{summary['checked']} orphaned ledger entries: {len(summary['reclaimed'])} deleted, "
+        f"{summary['expired']} already gone; {summary['slot_seconds']:.0f} slot-seconds reclaimed"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reap sessions whose owner process has exited")
+    parser.add_argument("--ledger", type=Path, help="Ledger directory (default: .cache/sessions or E2E_SESSION_LEDGER)")
+    parser.add_argument("--list", action="store_true", help="Print the open sessions in the ledger and exit")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="Reap repeatedly at this interval")
+    args = parser.parse_args()
+
+    ledger = SessionLedger(args.ledger) if args.ledger else SessionLedger()
+    if args.list:
+        now = time.time()
+        for entry in ledger.entries():
+            state = "alive" if process_alive(entry["pid"]) else "ORPHANED"
+            print(
+                f"{entry['session_url']}  pid {entry['pid']} ({state})  "
+                f"age {now - entry['created']:.0f}s  idle {now - entry['last_activity']:.0f}s"
+            )
+        return 0
+
+    while True:
+        print_summary(reap(ledger))
+        if not args.watch:
+            return 0
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""Worker utilization timeline (Gantt HTML) for report directories.
+
+``run_tests.py`` writes ``timeline.html`` after every run; use this for older
+report directories (test times from ``output.xml`` / JUnit) or to re-render:
+
+    python tools/timeline_report.py reports/fake-pytest-20240101_120000
+    python tools/timeline_report.py --latest
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from resources.libs.timeline import analyze, format_summary, load_spans, write_timeline  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write timeline.html (utilization, waits, critical path) per run")
+    parser.add_argument("report_dirs", nargs="*", type=Path, help="Report directories (reports/<env>-<platform>-<ts>)")
+    parser.add_argument("--latest", action="store_true", help="Use the most recent report directory")
+    args = parser.parse_args()
+
+    report_dirs = list(args.report_dirs)
+    if args.latest:
+        runs = [path for path in (ROOT / "reports").iterdir() if path.is_dir() and "-" in path.name]
+        report_dirs.append(max(runs, key=lambda path: path.stat().st_mtime))
+    if not report_dirs:
+        parser.error("give report directories or --latest")
+
+    for report_dir in report_dirs:
+        spans = load_spans(report_dir)
+        if not spans:
+            print(f"{report_dir}: no timeline or test results")
+            continue
+        analysis = analyze(spans)
+        print(f"{write_timeline(analysis, report_dir)}")
+        print("\n".join(format_summary(analysis)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())